@@ -1,6 +1,8 @@
 # coding: utf-8
 """Configurations for py.test runner"""
+import os
 import pytest
+import uuid
 
 
 @pytest.fixture(scope="session")
@@ -11,3 +13,96 @@ def worker_id(request):
         return request.config.slaveinput['slaveid']
     else:
         return 'master'
+
+
+def pytest_configure(config):
+    """Share the session objects of the object cache only between the
+    xdist workers of this test run.
+    """
+    from robottelo.decorators import OBJECT_CACHE
+    if hasattr(config, 'slaveinput'):
+        OBJECT_CACHE.namespace = config.slaveinput['object_cache_namespace']
+    else:
+        OBJECT_CACHE.namespace = uuid.uuid4().hex
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Pass the object cache namespace of the run to an xdist worker."""
+    from robottelo.decorators import OBJECT_CACHE
+    node.slaveinput['object_cache_namespace'] = OBJECT_CACHE.namespace
+
+
+def _remove_cached_objects():
+    """Remove the session objects shared by the workers of the run."""
+    from robottelo.config import settings
+    from robottelo.config.base import ImproperlyConfigured
+    from robottelo.decorators import OBJECT_CACHE
+    if not settings.configured:
+        # The xdist master runs no test so it did not read the settings
+        try:
+            settings.configure()
+        except ImproperlyConfigured:
+            return
+    OBJECT_CACHE.remove_files()
+
+
+def _module_name(item):
+    """Return the name of the test module of ``item`` or ``None``."""
+    module = getattr(item, 'module', None)
+    return getattr(module, '__name__', None)
+
+
+def pytest_runtest_setup(item):
+    """Keep the objects cached with the ``module`` scope for the module of
+    the test.
+    """
+    from robottelo.decorators import OBJECT_CACHE
+    if OBJECT_CACHE.module != _module_name(item):
+        OBJECT_CACHE.end_module(_module_name(item))
+
+
+def pytest_runtest_teardown(item, nextitem):
+    """Drop the hammer results cached by the test when the ``hammer_cache``
+    setting is ``test`` and the objects cached with the ``module`` scope when
+    the test module ends.
+    """
+    from robottelo.config import settings
+    from robottelo.decorators import OBJECT_CACHE
+    if settings.configured and settings.hammer_cache == 'test':
+        from robottelo.cli.cache import cli_cache
+        cli_cache.clear()
+    if nextitem is None or _module_name(nextitem) != _module_name(item):
+        OBJECT_CACHE.end_module()
+
+
+def pytest_sessionfinish(session):
+    """Log the hammer and object caches hit ratios and sessions time saved
+    and dump the ssh metrics if the ``ssh_metrics_file`` setting is set.
+
+    The session objects shared through the ``object_cache_dir`` setting are
+    removed by the master process once every worker is done.
+    """
+    from robottelo.config import settings
+    if not hasattr(session.config, 'slaveinput'):
+        _remove_cached_objects()
+    if not settings.configured:
+        return
+    # Imported here to not load the CLI modules when collecting the tests
+    from robottelo.cli.cache import cli_cache
+    from robottelo.cli.hammer_session import hammer_sessions
+    from robottelo.decorators import OBJECT_CACHE
+    from robottelo.ssh_metrics import metrics as ssh_metrics
+    if cli_cache.active:
+        cli_cache.log_stats()
+    OBJECT_CACHE.log_stats()
+    if settings.hammer_sessions:
+        hammer_sessions.log_stats()
+    if not settings.ssh_metrics_file:
+        return
+    path = settings.ssh_metrics_file
+    if hasattr(session.config, 'slaveinput'):
+        root, ext = os.path.splitext(path)
+        path = '{0}-{1}{2}'.format(
+            root, session.config.slaveinput['slaveid'], ext)
+    ssh_metrics.dump(path)
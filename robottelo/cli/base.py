@@ -2,12 +2,35 @@
 """Generic base class for cli hammer commands."""
 import logging
 import re
+import six
+import time
+import uuid
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from robottelo import ssh
 from robottelo.cli import hammer
+from robottelo.cli.cache import READ_SUBCOMMANDS, cli_cache
+from robottelo.cli.hammer_session import hammer_sessions
+from robottelo.cli.hammer_shell import shell_pool
+from robottelo.cli.rest import (
+    RESTUnsupportedError,
+    fast_setup_enabled,
+    rest_client,
+)
+from robottelo.cli.task_waiter import task_waiter
 from robottelo.config import settings
 
 
+# Task UUID printed by hammer for commands run with ``--async``
+_TASK_ID_REGEX = re.compile(
+    r'\btask\s+([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})',
+    re.IGNORECASE,
+)
+
+# Workers starting the asynchronous commands, see Base.execute_async
+_async_executor = ThreadPoolExecutor(max_workers=8)
+
+
 class CLIError(Exception):
     """Indicates that a CLI command could not be run."""
 
@@ -61,6 +84,131 @@ class CLIDataBaseError(CLIBaseError):
     """
 
 
+class CLIBulkResult(list):
+    """List of results returned by :func:`run_many`, in the same order as the
+    arguments given.
+
+    Besides the results it holds ``errors``, a dictionary mapping the index of
+    each item which failed to the exception raised. The result of those items
+    is ``None``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(CLIBulkResult, self).__init__(*args, **kwargs)
+        self.errors = {}
+
+    @property
+    def failed(self):
+        """List the indexes of the items which failed."""
+        return sorted(self.errors)
+
+    @property
+    def succeeded(self):
+        """List the indexes of the items which succeeded."""
+        return [
+            index for index in range(len(self)) if index not in self.errors]
+
+
+def run_many(func, args_list, concurrency=4):
+    """Call ``func`` with each item of ``args_list`` concurrently.
+
+    The calls are run by a pool of at most ``concurrency`` threads. A failing
+    call does not interrupt the others::
+
+        results = run_many(Org.create, [{'name': 'a'}, {'name': 'b'}])
+        for index in results.failed:
+            print(index, results.errors[index])
+
+    :param func: The callable to call with each item.
+    :param list args_list: The argument of each call.
+    :param int concurrency: Maximum number of calls run at the same time.
+    :return: The results ordered as ``args_list``.
+    :rtype: CLIBulkResult
+    """
+    args_list = list(args_list)
+    results = CLIBulkResult()
+    if not args_list:
+        return results
+
+    def call(args):
+        """Call ``func`` returning its result and the error raised."""
+        try:
+            return func(args), None
+        except Exception as err:
+            logging.getLogger('robottelo').warning(
+                'Failed to run %s with %r: %r',
+                getattr(func, '__name__', func), args, err)
+            return None, err
+
+    with ThreadPoolExecutor(
+            max_workers=min(concurrency, len(args_list))) as executor:
+        futures = [executor.submit(call, args) for args in args_list]
+        for index, future in enumerate(futures):
+            result, error = future.result()
+            results.append(result)
+            if error is not None:
+                results.errors[index] = error
+    return results
+
+
+class HammerCommand(six.text_type):
+    """A hammer command line built for a single call.
+
+    It is the command line string, as passed to :meth:`Base.execute`, which
+    also keeps the base command and subcommand it was built from. Being
+    immutable and created on every call, commands built concurrently from
+    the same class never interfere.
+
+    :param str base: The base command, like ``repository``.
+    :param str sub: The subcommand, like ``synchronize``.
+    :param dict options: The command options. ``None`` and ``False`` values
+        are omitted, ``True`` values are passed as flags and lists are joined
+        by commas.
+    """
+
+    def __new__(cls, base, sub, options=None):
+        tail = u''
+        passed = []
+
+        if options is None:
+            options = {}
+
+        for key, val in options.items():
+            if val is None:
+                continue
+            if val is True:
+                tail += u' --{0}'.format(key)
+                passed.append((u'{0}'.format(key), True))
+            elif val is not False:
+                if isinstance(val, list):
+                    val = ','.join(str(el) for el in val)
+                tail += u' --{0}="{1}"'.format(key, val)
+                passed.append((u'{0}'.format(key), u'{0}'.format(val)))
+        command = super(HammerCommand, cls).__new__(
+            cls, u'{0} {1} {2}'.format(base, sub, tail.strip()))
+        command._base = base
+        command._sub = sub
+        command._options = tuple(sorted(passed, key=lambda item: item[0]))
+        return command
+
+    @property
+    def base(self):
+        """The base command."""
+        return self._base
+
+    @property
+    def sub(self):
+        """The subcommand."""
+        return self._sub
+
+    @property
+    def options(self):
+        """The options passed, as a tuple of ``(name, value)`` sorted by
+        name, ``value`` being ``True`` for flags.
+        """
+        return self._options
+
+
 class Base(object):
     """
     @param command_base: base command of hammer.
@@ -124,7 +272,7 @@ class Base(object):
     @since: 27.Nov.2013
     """
     command_base = None  # each inherited instance should define this
-    command_sub = None  # specific to instance, like: create, update, etc
+    command_sub = None  # default subcommand, each method passes its own
     command_requires_org = False  # True when command requires organization-id
 
     logger = logging.getLogger('robottelo')
@@ -133,7 +281,7 @@ class Base(object):
     )
 
     @classmethod
-    def _handle_response(cls, response, ignore_stderr=None):
+    def _handle_response(cls, response, ignore_stderr=None, command=None):
         """Verify ``return_code`` of the CLI command.
 
         Check for a non-zero return code or any stderr contents.
@@ -142,16 +290,22 @@ class Base(object):
             :mod:`robottelo.ssh.command`.
         :param ignore_stderr: indicates whether to throw a warning in logs if
             ``stderr`` is not empty.
+        :param command: the :class:`HammerCommand` run, used to describe the
+            failed command.
         :returns: contents of ``stdout``.
         :raises robottelo.cli.base.CLIReturnCodeError: If return code is
             different from zero.
         """
         if response.return_code != 0:
+            if isinstance(command, HammerCommand):
+                command_base, command_sub = command.base, command.sub
+            else:
+                command_base, command_sub = cls.command_base, cls.command_sub
             full_msg = (
                 u'Command "{0} {1}" finished with return_code {2}\n'
                 'stderr contains following message:\n{3}'.format(
-                    cls.command_base,
-                    cls.command_sub,
+                    command_base,
+                    command_sub,
                     response.return_code,
                     response.stderr
                 )
@@ -174,25 +328,43 @@ class Base(object):
         Adds OS to record.
         """
 
-        cls.command_sub = 'add-operatingsystem'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, 'add-operatingsystem'))
 
         return result
 
     @classmethod
-    def create(cls, options=None):
+    def create(cls, options=None, single_round_trip=False):
         """
         Creates a new record using the arguments passed via dictionary.
-        """
 
-        cls.command_sub = 'create'
+        The new record is read back with ``info``. When ``single_round_trip``
+        is ``True`` the ``create`` and ``info`` hammer commands are chained
+        on a single ssh round trip, see :meth:`_create_and_info`.
+
+        In fast setup mode the record is created through the server API when
+        the options allow it, see :mod:`robottelo.cli.rest`, and still read
+        back with ``info`` as the API record has another structure.
+        """
 
         if options is None:
             options = {}
 
-        result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+        result = None
+        if fast_setup_enabled():
+            result = cls._rest_call(rest_client.create, options)
+
+        new_obj = None
+        if result is not None:
+            result = [result]
+        elif single_round_trip and (
+                not cls.command_requires_org or 'organization-id' in options):
+            result, new_obj = cls._create_and_info(options)
+        else:
+            result = cls.execute(
+                cls._construct_command(options, 'create'),
+                output_format='csv'
+            )
 
         # Extract new object ID if it was successfully created
         if len(result) > 0 and 'id' in result[0]:
@@ -207,19 +379,122 @@ class Base(object):
                     raise CLIError(tmpl.format(cls.__name__))
                 info_options[u'organization-id'] = options[u'organization-id']
 
-            new_obj = cls.info(info_options)
+            if new_obj is None:
+                new_obj = cls.info(info_options)
             # stdout should be a dictionary containing the object
             if len(new_obj) > 0:
                 result = new_obj
 
         return result
 
+    @classmethod
+    def create_many(cls, options_list, concurrency=4,
+                    single_round_trip=False):
+        """Create several records in parallel.
+
+        Each record is created by :meth:`create` on a pool of at most
+        ``concurrency`` threads. A record failing to be created does not
+        interrupt the others::
+
+            products = Product.create_many(
+                [{'name': name, 'organization-id': org['id']}
+                 for name in names],
+                concurrency=8,
+            )
+            if products.failed:
+                ...
+
+        :param list options_list: The ``create`` options of each record.
+        :param int concurrency: Maximum number of records created at the same
+            time.
+        :param bool single_round_trip: See :meth:`create`.
+        :return: The created records ordered as ``options_list``.
+        :rtype: CLIBulkResult
+        """
+        if single_round_trip:
+            def create(options):
+                """Create a record on a single round trip."""
+                return cls.create(options, single_round_trip=True)
+        else:
+            create = cls.create
+        return run_many(create, options_list, concurrency)
+
+    @classmethod
+    def _create_and_info(cls, options):
+        """Create a record and read it with a single ssh round trip.
+
+        The ``create`` output is kept on a temporary file on the server, where
+        the new record id is extracted from and passed to ``info``.
+
+        :param dict options: The ``create`` options.
+        :return: A tuple with the ``create`` output and the parsed ``info``
+            output, the latter being ``None`` if ``info`` failed and needs to
+            be run again.
+        :raises robottelo.cli.base.CLIReturnCodeError: If ``create`` fails.
+        """
+        create_command = cls._construct_command(options, 'create')
+        info_options = {u'id': u'$create_id'}
+        if cls.command_requires_org:
+            info_options[u'organization-id'] = options[u'organization-id']
+        info_command = cls._construct_command(info_options, 'info')
+        output_file = u'/tmp/robottelo-create-{0}'.format(uuid.uuid4().hex)
+        cmds = [
+            u'{0} > {1}; create_rc=$?; cat {1}; '
+            u'[ $create_rc -eq 0 ] || rm -f {1}; exit $create_rc'.format(
+                cls._hammer_cmd(cls._hammer_args(create_command, 'csv')),
+                output_file,
+            ),
+            u"create_id=$(awk -F, 'NR == 1 {{for (i = 1; i <= NF; i++) "
+            u'if ($i == "Id") column = i}} NR == 2 && column '
+            u"{{print $column}}' {1}); rm -f {1}; "
+            u'[ -n "$create_id" ] || exit 1; {0}'.format(
+                cls._hammer_cmd(cls._hammer_args(info_command)),
+                output_file,
+            ),
+        ]
+        try:
+            results = ssh.command_batch(cmds, stop_on_failure=True)
+        finally:
+            # create does not go through execute, which invalidates the cache
+            if cli_cache.active:
+                cli_cache.invalidate(cls.command_base)
+        # Results are parsed when first accessed, only create outputs CSV
+        results[0].output_format = 'csv'
+        result = cls._handle_response(results[0], command=create_command)
+        if len(results) < 2 or results[1].return_code != 0:
+            return result, None
+        return result, hammer.parse_info(
+            cls._handle_response(results[1], command=info_command))
+
+    @classmethod
+    def _rest_call(cls, method, options):
+        """Run ``method`` of :data:`robottelo.cli.rest.rest_client` with
+        ``options``.
+
+        :return: The record returned or ``None`` if the options can't be sent
+            to the API and hammer has to run instead.
+        """
+        try:
+            return method(cls.command_base, options)
+        except RESTUnsupportedError as err:
+            cls.logger.debug('Running hammer %s: %s', cls.command_base, err)
+            return None
+        finally:
+            if cli_cache.active:
+                cli_cache.invalidate(cls.command_base)
+
     @classmethod
     def delete(cls, options=None):
-        """Deletes existing record."""
-        cls.command_sub = 'delete'
+        """Deletes existing record.
+
+        In fast setup mode records found by id are deleted through the server
+        API, see :mod:`robottelo.cli.rest`.
+        """
+        if fast_setup_enabled() and cls._rest_call(
+                rest_client.delete, options) is not None:
+            return []
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, 'delete'),
             ignore_stderr=True,
         )
 
@@ -229,9 +504,8 @@ class Base(object):
         Deletes parameter from record.
         """
 
-        cls.command_sub = 'delete-parameter'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, 'delete-parameter'))
 
         return result
 
@@ -241,9 +515,7 @@ class Base(object):
         Displays the content for existing partition table.
         """
 
-        cls.command_sub = 'dump'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(cls._construct_command(options, 'dump'))
 
         return result
 
@@ -276,33 +548,257 @@ class Base(object):
     @classmethod
     def execute(cls, command, user=None, password=None, output_format=None,
                 timeout=None, ignore_stderr=None, return_raw_response=None):
-        """Executes the cli ``command`` on the server via ssh"""
-        user, password = cls._get_username_password(user, password)
+        """Executes the cli ``command`` on the server via ssh
+
+        When the ``hammer_shell`` setting is enabled the command is run by a
+        resident hammer interpreter, see :mod:`robottelo.cli.hammer_shell`,
+        unless hammer is being timed or the command needs a real shell.
+
+        When the ``hammer_sessions`` setting is enabled the other commands
+        run on a hammer session of the user instead of passing the
+        credentials, see :mod:`robottelo.cli.hammer_session`.
+
+        When the cache is active, see :mod:`robottelo.cli.cache`, the results
+        of the ``info`` and ``list`` :class:`HammerCommand` are cached and the
+        other subcommands invalidate the results of their base command.
+        """
+        kwargs = {
+            'user': user,
+            'password': password,
+            'output_format': output_format,
+            'timeout': timeout,
+            'ignore_stderr': ignore_stderr,
+            'return_raw_response': return_raw_response,
+        }
+        if not isinstance(command, HammerCommand) or not cli_cache.active:
+            return cls._execute(command, **kwargs)
+        if command.sub not in READ_SUBCOMMANDS:
+            try:
+                return cls._execute(command, **kwargs)
+            finally:
+                cli_cache.invalidate(command.base)
+        if return_raw_response:
+            return cls._execute(command, **kwargs)
+        key = (
+            command.base,
+            command.sub,
+            command.options,
+            output_format,
+            cls._get_username_password(user, password)[0],
+        )
+        hit, result = cli_cache.get(key)
+        if not hit:
+            generation = cli_cache.generation(command.base)
+            result = cls._execute(command, **kwargs)
+            cli_cache.set(key, result, generation)
+        return result
+
+    @classmethod
+    def _execute(cls, command, user=None, password=None, output_format=None,
+                 timeout=None, ignore_stderr=None, return_raw_response=None):
+        """Executes the cli ``command``, see :meth:`execute`."""
         time_hammer = False
         if settings.performance:
             time_hammer = settings.performance.time_hammer
 
-        # add time to measure hammer performance
-        cmd = u'LANG={0} {1} hammer -v -u {2} -p {3} {4} {5}'.format(
-            settings.locale,
-            u'time -p' if time_hammer else '',
-            user,
-            password,
-            u'--output={0}'.format(output_format) if output_format else u'',
-            command,
-        )
-        response = ssh.command(
-            cmd.encode('utf-8'),
-            output_format=output_format,
-            timeout=timeout,
-        )
+        user, password = cls._get_username_password(user, password)
+        args = cls._hammer_args(command, output_format, user, password)
+        response = None
+        if settings.hammer_shell and not time_hammer:
+            response = shell_pool.run(
+                args, output_format=output_format, timeout=timeout)
+        family = None
+        if response is None and settings.hammer_sessions:
+            if isinstance(command, HammerCommand):
+                family = u'{0} {1}'.format(command.base, command.sub)
+            else:
+                family = command.split(u' ', 1)[0]
+            response = hammer_sessions.run(
+                cls._hammer_args(command, output_format, credentials=False),
+                user,
+                password,
+                family,
+                output_format=output_format,
+                timeout=timeout,
+                time_hammer=time_hammer,
+            )
+        if response is None:
+            start = time.time()
+            response = ssh.command(
+                cls._hammer_cmd(args, time_hammer).encode('utf-8'),
+                output_format=output_format,
+                timeout=timeout,
+            )
+            if family is not None:
+                hammer_sessions.record(
+                    family, 'credentials', time.time() - start)
         if return_raw_response:
             return response
         else:
             return cls._handle_response(
                 response,
                 ignore_stderr=ignore_stderr,
+                command=command,
+            )
+
+    @classmethod
+    def _without_org(cls):
+        """Return a subclass which does not require ``organization-id``.
+
+        Subcommands not requiring the organization can run through it without
+        changing ``command_requires_org``, which would affect concurrent
+        calls.
+        """
+        return type(cls.__name__, (cls,), {'command_requires_org': False})
+
+    @classmethod
+    def _hammer_args(cls, command, output_format=None, user=None,
+                     password=None, credentials=True):
+        """Return the hammer arguments running ``command`` with the
+        credentials found by :meth:`_get_username_password`, unless
+        ``credentials`` is ``False``.
+        """
+        output = u''
+        if output_format:
+            output = u'--output={0}'.format(output_format)
+        if not credentials:
+            return u'-v {0} {1}'.format(output, command)
+        user, password = cls._get_username_password(user, password)
+        return u'-v -u {0} -p {1} {2} {3}'.format(
+            user,
+            password,
+            output,
+            command,
+        )
+
+    @staticmethod
+    def _hammer_cmd(args, time_hammer=False):
+        """Return the shell command running hammer with ``args``."""
+        # add time to measure hammer performance
+        return u'LANG={0} {1} hammer {2}'.format(
+            settings.locale,
+            u'time -p' if time_hammer else '',
+            args,
+        )
+
+    @classmethod
+    def execute_stream(cls, command, user=None, password=None, timeout=None,
+                       records=False, ignore_stderr=None):
+        """Executes the cli ``command`` on the server via ssh and yields the
+        rows of its CSV output as they are received.
+
+        The output is read from the channel with
+        :func:`robottelo.ssh.stream_command` and parsed line by line with
+        :func:`robottelo.cli.hammer.iter_csv`, so the whole output is never
+        kept in memory. Use it for commands returning many rows::
+
+            command = Host._construct_command({'per-page': 100000}, 'list')
+            for host in Host.execute_stream(command, records=True):
+                ...
+
+        :param bool records: Yield :class:`robottelo.cli.hammer.CSVRecord`
+            tuples instead of dictionaries.
+        :return: A generator of the rows.
+        :raises robottelo.cli.base.CLIReturnCodeError: Once the output is
+            consumed if the return code is different from zero.
+        """
+        args = cls._hammer_args(command, 'csv', user, password)
+        kwargs = {} if timeout is None else {'timeout': timeout}
+        stream = ssh.stream_command(
+            cls._hammer_cmd(args).encode('utf-8'), **kwargs)
+
+        def clean(lines):
+            """Clean up the lines the same way ``ssh.command`` does."""
+            for line in lines:
+                line = line.replace(u'""', u'')
+                if not line.startswith(u'['):
+                    yield line
+
+        try:
+            for row in hammer.iter_csv(clean(stream), records=records):
+                yield row
+        finally:
+            stream.close()
+        cls._handle_response(
+            ssh.SSHCommandResult(
+                stderr=stream.stderr, return_code=stream.return_code),
+            ignore_stderr=ignore_stderr,
+            command=command,
+        )
+
+    @classmethod
+    def execute_async(cls, command, user=None, password=None, timeout=None,
+                      task_timeout=3600):
+        """Executes the cli ``command`` with ``--async`` and returns a future
+        without waiting for the Foreman task it starts.
+
+        The command is run on a pool of worker threads. Once hammer prints
+        the task id the task is watched by
+        :data:`robottelo.cli.task_waiter.task_waiter`, which polls all the
+        pending tasks together::
+
+            futures = [
+                Repository.synchronize_async({'id': repo_id})
+                for repo_id in repo_ids
+            ]
+            tasks = [future.result() for future in futures]
+
+        When the cache is active, see :mod:`robottelo.cli.cache`, the results
+        of the base command are invalidated again once the task finishes.
+
+        :param int task_timeout: Seconds to wait for the task to finish.
+        :return: A future whose result is the finished task, as returned by
+            the API, or the command output if hammer printed no task id.
+        :rtype: concurrent.futures.Future
+        :raises robottelo.cli.base.CLIReturnCodeError: From the future, if
+            the command fails.
+        :raises robottelo.cli.task_waiter.TaskFailedError: From the future,
+            if the task does not succeed.
+        """
+        if isinstance(command, HammerCommand):
+            command = HammerCommand(
+                command.base,
+                command.sub,
+                dict(command.options, **{'async': True}),
             )
+        else:
+            command = u'{0} --async'.format(command)
+        future = Future()
+
+        def finish(task_future):
+            """Pass the task outcome to ``future``."""
+            if isinstance(command, HammerCommand) and cli_cache.active:
+                cli_cache.invalidate(command.base)
+            error = task_future.exception()
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(task_future.result())
+
+        def start():
+            """Run the command and watch the task it starts."""
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                output = cls.execute(
+                    command,
+                    user=user,
+                    password=password,
+                    timeout=timeout,
+                    ignore_stderr=True,
+                )
+                match = _TASK_ID_REGEX.search(u'\n'.join(output or []))
+            except Exception as err:
+                future.set_exception(err)
+                return
+            if match is None:
+                future.set_result(output)
+                return
+            task_waiter.wait(
+                match.group(1), timeout=task_timeout).add_done_callback(finish)
+
+        _async_executor.submit(start)
+        return future
 
     @classmethod
     def exists(cls, options=None, search=None):
@@ -332,9 +828,14 @@ class Base(object):
 
     @classmethod
     def info(cls, options=None, output_format=None):
-        """Reads the entity information."""
-        cls.command_sub = 'info'
+        """Reads the entity information.
 
+        The plain output is parsed with :func:`robottelo.cli.hammer.parse_info`
+        unless ``output_format`` is ``json``. The JSON output has the
+        structure of the API record, which differs from the parsed info one,
+        so it is only read when asked for and the ``hammer_output_format``
+        setting does not apply.
+        """
         if options is None:
             options = {}
 
@@ -346,7 +847,7 @@ class Base(object):
             )
 
         result = cls.execute(
-            command=cls._construct_command(options),
+            command=cls._construct_command(options, 'info'),
             output_format=output_format
         )
         if output_format != 'json':
@@ -354,13 +855,18 @@ class Base(object):
         return result
 
     @classmethod
-    def list(cls, options=None, per_page=True):
+    def list(cls, options=None, per_page=True, output_format=None):
         """
         List information.
         @param options: ID (sometimes name works as well) to retrieve info.
-        """
 
-        cls.command_sub = 'list'
+        Unless ``per_page`` is ``False`` or ``options`` ask for a specific
+        ``per-page``, up to 10000 records are read. Use :meth:`list_iter` to
+        read every page.
+
+        The records are read as ``output_format``, ``csv`` or ``json``,
+        defaulting to the ``hammer_output_format`` setting.
+        """
 
         if options is None:
             options = {}
@@ -368,6 +874,123 @@ class Base(object):
         if 'per-page' not in options and per_page:
             options[u'per-page'] = 10000
 
+        cls._check_list_options(options)
+        result = cls.execute(
+            cls._construct_command(options, 'list'),
+            output_format=output_format or cls._output_format()
+        )
+
+        return result
+
+    @classmethod
+    def list_iter(cls, options=None, page_size=1000, prefetch=False,
+                  output_format=None, max_pages=None):
+        """Iterate over the listed records, reading them page by page.
+
+        Pages are requested with ``--page`` and ``--per-page`` only when the
+        iteration reaches them, and the iteration stops after the first page
+        having less than ``page_size`` records::
+
+            for host in Host.list_iter({'search': 'name ~ perf'}):
+                ...
+
+        The iteration also stops when a page starts with the same record as
+        the previous one, as commands ignoring ``--page`` return the first
+        page again and again.
+
+        :param dict options: The ``list`` options, ``page`` and ``per-page``
+            are overridden.
+        :param int page_size: Number of records read per page.
+        :param bool prefetch: Read the next page on a background thread
+            while the records of the current one are consumed.
+        :param str output_format: ``csv`` or ``json``, defaults to the
+            ``hammer_output_format`` setting.
+        :param int max_pages: Maximum number of pages read, ``None`` for no
+            limit.
+        :return: A generator of the records, as dictionaries or
+            :class:`robottelo.cli.hammer.JSONMapping`.
+        """
+        options = dict(options or {})
+        cls._check_list_options(options)
+        options[u'per-page'] = page_size
+        output_format = output_format or cls._output_format()
+
+        def read_page(page):
+            """Return the records of ``page``."""
+            page_options = dict(options, page=page)
+            return cls.execute(
+                cls._construct_command(page_options, 'list'),
+                output_format=output_format
+            ) or []
+
+        def last_page(page, records):
+            """Return whether no page is read after ``page``."""
+            return (
+                len(records) < page_size or
+                max_pages is not None and page >= max_pages
+            )
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            page = 1
+            records = read_page(page)
+            while True:
+                next_page = None
+                if executor is not None and not last_page(page, records):
+                    next_page = executor.submit(read_page, page + 1)
+                for record in records:
+                    yield record
+                if last_page(page, records):
+                    break
+                first_record = records[0]
+                page += 1
+                if next_page is not None:
+                    records = next_page.result()
+                else:
+                    records = read_page(page)
+                if records and records[0] == first_record:
+                    cls.logger.warning(
+                        u'Page %s of %s list repeats the previous page, the '
+                        u'command ignores --page', page, cls.command_base)
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    @classmethod
+    def list_stream(cls, options=None, records=False):
+        """List information reading the records while hammer outputs them.
+
+        Unlike :meth:`list_iter` a single ``list`` command is run, see
+        :meth:`execute_stream`.
+
+        :param dict options: The ``list`` options.
+        :param bool records: Yield :class:`robottelo.cli.hammer.CSVRecord`
+            tuples instead of dictionaries.
+        :return: A generator of the records.
+        """
+        options = options or {}
+        cls._check_list_options(options)
+        return cls.execute_stream(
+            cls._construct_command(options, 'list'), records=records)
+
+    @staticmethod
+    def _output_format():
+        """Return the output format of the list and info commands, as
+        configured by the ``hammer_output_format`` setting.
+        """
+        if settings.hammer_output_format == 'json':
+            return 'json'
+        return 'csv'
+
+    @classmethod
+    def _check_list_options(cls, options):
+        """Make sure ``options`` has the organization when ``list`` requires
+        it.
+
+        :raises robottelo.cli.base.CLIError: If the organization is required
+            and missing.
+        """
         if cls.command_requires_org and 'organization-id' not in options:
             raise CLIError(
                 'organization-id option is required for {0}.list'.format(
@@ -375,21 +998,15 @@ class Base(object):
                 )
             )
 
-        result = cls.execute(
-            cls._construct_command(options), output_format='csv')
-
-        return result
-
     @classmethod
     def puppetclasses(cls, options=None):
         """
         Lists all puppet classes.
         """
 
-        cls.command_sub = 'puppet-classes'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'puppet-classes'),
+            output_format='csv')
 
         return result
 
@@ -399,9 +1016,8 @@ class Base(object):
         Removes OS from record.
         """
 
-        cls.command_sub = 'remove-operatingsystem'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(
+            cls._construct_command(options, 'remove-operatingsystem'))
 
         return result
 
@@ -411,10 +1027,8 @@ class Base(object):
         Lists all smart class parameters.
         """
 
-        cls.command_sub = 'sc-params'
-
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'sc-params'), output_format='csv')
 
         return result
 
@@ -424,9 +1038,7 @@ class Base(object):
         Creates or updates parameter for a record.
         """
 
-        cls.command_sub = 'set-parameter'
-
-        result = cls.execute(cls._construct_command(options))
+        result = cls.execute(cls._construct_command(options, 'set-parameter'))
 
         return result
 
@@ -436,10 +1048,8 @@ class Base(object):
         Updates existing record.
         """
 
-        cls.command_sub = 'update'
-
         result = cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, 'update'),
             output_format='csv'
         )
 
@@ -464,26 +1074,15 @@ class Base(object):
         return Wrapper
 
     @classmethod
-    def _construct_command(cls, options=None):
-        """Build a hammer cli command based on the options passed"""
-        tail = u''
+    def _construct_command(cls, options=None, command_sub=None):
+        """Build a hammer cli command based on the options passed
 
-        if options is None:
-            options = {}
-
-        for key, val in options.items():
-            if val is None:
-                continue
-            if val is True:
-                tail += u' --{0}'.format(key)
-            elif val is not False:
-                if isinstance(val, list):
-                    val = ','.join(str(el) for el in val)
-                tail += u' --{0}="{1}"'.format(key, val)
-        cmd = u'{0} {1} {2}'.format(
+        :param dict options: The command options.
+        :param str command_sub: The subcommand, ``command_sub`` by default.
+        :rtype: HammerCommand
+        """
+        return HammerCommand(
             cls.command_base,
-            cls.command_sub,
-            tail.strip()
+            command_sub if command_sub is not None else cls.command_sub,
+            options,
         )
-
-        return cmd
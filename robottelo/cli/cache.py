@@ -0,0 +1,197 @@
+# -*- encoding: utf-8 -*-
+"""Read-through cache of the hammer ``info`` and ``list`` results.
+
+Tests and factories read the same entities over and over, every read being a
+``hammer`` call. When the cache is active
+:meth:`robottelo.cli.base.Base.execute` keeps the result of the read
+subcommands, keyed by the base command, the subcommand, the options, the
+output format and the user, and returns a copy of it on the next identical
+read.
+
+Any other subcommand, like ``create``, ``update``, ``delete``, ``add-*`` or
+``remove-*`` but also ``publish`` or ``synchronize``, invalidates the results
+of its base command. Changes made outside of the CLI classes, like API calls,
+are not seen, call :meth:`CLICache.invalidate` after them.
+
+The cache is enabled by the ``hammer_cache`` setting of the ``[robottelo]``
+section, ``session`` keeps the results until the end of the pytest session
+and ``test`` until the end of each test, or for a block of code with
+:meth:`CLICache.scope`::
+
+    from robottelo.cli.cache import cli_cache
+
+    with cli_cache.scope():
+        ContentView.info({'id': cv['id']})
+        ...
+    print(cli_cache.stats()['total']['hit-ratio'])
+
+"""
+import copy
+import logging
+import threading
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from robottelo.config import settings
+
+logger = logging.getLogger(__name__)
+
+#: Subcommands whose results are cached, any other one invalidates the cached
+#: results of its base command.
+READ_SUBCOMMANDS = ('info', 'list')
+
+#: Values of the ``hammer_cache`` setting enabling the cache.
+SCOPES = ('session', 'test')
+
+# Returned by CLICache.get on a miss
+_MISSING = object()
+
+
+class CLICache(object):
+    """Thread-safe cache of the hammer read commands results.
+
+    :param int max_entries: Maximum number of results kept, the least
+        recently used ones are dropped first.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        #: Force the cache on, whatever the ``hammer_cache`` setting
+        self.enabled = False
+        self._entries = OrderedDict()
+        self._epoch = 0
+        self._generations = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        """Whether the results are cached."""
+        return self.enabled or settings.hammer_cache in SCOPES
+
+    def _count(self, command_base, index):
+        """Increment the statistic ``index`` of ``command_base``, the caller
+        holds the lock.
+        """
+        stats = self._stats.setdefault(command_base, [0, 0, 0])
+        stats[index] += 1
+
+    def get(self, key):
+        """Look up the result cached for ``key``, counting a hit or a miss.
+
+        :param tuple key: The cache key, its first item being the base
+            command.
+        :return: A tuple ``(hit, result)``, ``result`` being a copy of the
+            cached one or ``None`` on a miss.
+        """
+        with self._lock:
+            result = self._entries.get(key, _MISSING)
+            if result is _MISSING:
+                self._count(key[0], 1)
+                return False, None
+            self._count(key[0], 0)
+            # Keep the most recently used results
+            self._entries[key] = self._entries.pop(key)
+        # Callers are free to change the results they get
+        return True, copy.deepcopy(result)
+
+    def generation(self, command_base):
+        """Return the generation of the results of ``command_base``, which
+        changes on every invalidation. Read it before running a command to
+        give it to :meth:`set`.
+        """
+        with self._lock:
+            return self._epoch, self._generations.get(command_base, 0)
+
+    def set(self, key, result, generation):
+        """Cache ``result`` for ``key``.
+
+        The result is dropped if the base command was invalidated since
+        ``generation``, as it may have been read before the change.
+        """
+        result = copy.deepcopy(result)
+        with self._lock:
+            if (self._epoch,
+                    self._generations.get(key[0], 0)) != generation:
+                return
+            self._entries[key] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, command_base=None):
+        """Drop the cached results of ``command_base`` or all of them."""
+        with self._lock:
+            if command_base is None:
+                bases = set(key[0] for key in self._entries)
+                bases.update(self._generations)
+            else:
+                bases = (command_base,)
+            for base in bases:
+                self._generations[base] = self._generations.get(base, 0) + 1
+                self._count(base, 2)
+            for key in list(self._entries):
+                if command_base is None or key[0] == command_base:
+                    del self._entries[key]
+
+    def clear(self):
+        """Drop all the cached results, keeping the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+    def reset(self):
+        """Drop all the cached results and the statistics."""
+        self.clear()
+        with self._lock:
+            self._stats.clear()
+
+    def stats(self):
+        """Return the hits, misses, invalidations and hit ratio of each base
+        command and of all of them under the ``total`` key.
+
+        :rtype: dict
+        """
+        with self._lock:
+            stats = dict(
+                (base, list(values)) for base, values in self._stats.items())
+        total = [sum(values) for values in zip([0, 0, 0], *stats.values())]
+        stats['total'] = total
+        report = {}
+        for base, (hits, misses, invalidations) in stats.items():
+            reads = hits + misses
+            report[base] = {
+                'hits': hits,
+                'misses': misses,
+                'invalidations': invalidations,
+                'hit-ratio': float(hits) / reads if reads else None,
+            }
+        return report
+
+    def log_stats(self):
+        """Log the statistics of each base command."""
+        stats = self.stats()
+        for base in sorted(stats, key=lambda base: (base == 'total', base)):
+            values = stats[base]
+            if not values['hits'] + values['misses']:
+                continue
+            logger.info(
+                'hammer cache %s: %d hits, %d misses, %d invalidations, '
+                '%.1f%% hit ratio', base, values['hits'], values['misses'],
+                values['invalidations'], values['hit-ratio'] * 100)
+
+    @contextmanager
+    def scope(self):
+        """Cache the results while the ``with`` block runs and drop them at
+        its end.
+        """
+        enabled = self.enabled
+        self.enabled = True
+        try:
+            yield self
+        finally:
+            self.enabled = enabled
+            self.clear()
+
+
+#: The :class:`CLICache` used by :meth:`robottelo.cli.base.Base.execute`.
+cli_cache = CLICache()
@@ -71,6 +71,5 @@ class ContentHost(Base):
     @classmethod
     def tasks(cls, options=None):
         """Lists async tasks for a content host."""
-        cls.command_sub = 'tasks'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'tasks'), output_format='csv')
@@ -54,9 +54,8 @@ class ContentViewFilterRule(Base):
                 'Could not find content_view_filter, please set one of options'
                 ' "content-view-filter" or "content-view-filter-id".'
             )
-        cls.command_sub = 'create'
         result = cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'create'), output_format='csv')
 
         # Extract new CV filter rule ID if it was successfully created
         if len(result) > 0 and 'id' in result[0]:
@@ -93,106 +92,114 @@ class ContentView(Base):
     @classmethod
     def add_repository(cls, options):
         """Associate repository to a selected CV."""
-        cls.command_sub = 'add-repository'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'add-repository'),
+            output_format='csv')
 
     @classmethod
     def add_version(cls, options):
         """Associate version to a selected CV."""
-        cls.command_sub = 'add-version'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'add-version'),
+            output_format='csv')
 
     @classmethod
     def copy(cls, options):
         """Copy existing content-view to a new one"""
-        cls.command_sub = 'copy'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'copy'), output_format='csv')
 
     @classmethod
     def publish(cls, options, timeout=None):
         """Publishes a new version of content-view."""
-        cls.command_sub = 'publish'
         # Publishing can take a while so try to wait a bit longer
         if timeout is None:
             timeout = 120
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, 'publish'),
             ignore_stderr=True,
             timeout=timeout,
         )
 
+    @classmethod
+    def publish_async(cls, options):
+        """Starts publishing a new version of content-view and returns a
+        future of its task, see :meth:`robottelo.cli.base.Base.execute_async`.
+        """
+        return cls.execute_async(cls._construct_command(options, 'publish'))
+
     @classmethod
     def version_info(cls, options):
         """Provides version info related to content-view's version."""
-        cls.command_sub = 'version info'
-
         if options is None:
             options = {}
 
-        return hammer.parse_info(cls.execute(cls._construct_command(options)))
+        return hammer.parse_info(cls.execute(
+            cls._construct_command(options, 'version info')))
 
     @classmethod
     def version_incremental_update(cls, options):
         """Performs incremental update of the content-view's version"""
-        cls.command_sub = 'version incremental-update'
         if options is None:
             options = {}
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'version incremental-update'),
+            output_format='csv')
 
     @classmethod
     def puppet_module_add(cls, options):
         """Associate puppet_module to selected CV"""
-        cls.command_sub = 'puppet-module add'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'puppet-module add'),
+            output_format='csv')
 
     @classmethod
     def puppet_module_info(cls, options):
         """Provides puppet-module info related to content-view's version."""
-        cls.command_sub = 'puppet-module info'
-
         if options is None:
             options = {}
 
-        return hammer.parse_info(cls.execute(cls._construct_command(options)))
+        return hammer.parse_info(cls.execute(
+            cls._construct_command(options, 'puppet-module info')))
 
     @classmethod
     def version_list(cls, options):
         """Lists content-view's versions."""
-        cls.command_sub = 'version list'
         if options is None:
             options = {}
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'version list'),
+            output_format='csv')
 
     @classmethod
     def version_promote(cls, options):
         """Promotes content-view version to next env."""
-        cls.command_sub = 'version promote'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, 'version promote'),
             ignore_stderr=True,
         )
 
+    @classmethod
+    def version_promote_async(cls, options):
+        """Starts promoting content-view version to next env and returns a
+        future of its task, see :meth:`robottelo.cli.base.Base.execute_async`.
+        """
+        return cls.execute_async(
+            cls._construct_command(options, 'version promote'))
+
     @classmethod
     def version_delete(cls, options):
         """Removes content-view version."""
-        cls.command_sub = 'version delete'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, 'version delete'),
             ignore_stderr=True,
         )
 
     @classmethod
     def remove_from_environment(cls, options=None):
         """Remove content-view from an environment"""
-        cls.command_sub = 'remove-from-environment'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, 'remove-from-environment'),
             ignore_stderr=True,
         )
 
@@ -202,8 +209,7 @@ class ContentView(Base):
         reassign content hosts and keys
 
         """
-        cls.command_sub = 'remove'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, 'remove'),
             ignore_stderr=True,
         )
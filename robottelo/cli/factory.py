@@ -21,7 +21,7 @@ from os import chmod
 from robottelo import manifests, ssh
 from robottelo.cli.activationkey import ActivationKey
 from robottelo.cli.architecture import Architecture
-from robottelo.cli.base import CLIReturnCodeError
+from robottelo.cli.base import CLIReturnCodeError, run_many
 from robottelo.cli.computeresource import ComputeResource
 from robottelo.cli.contenthost import ContentHost
 from robottelo.cli.contentview import (
@@ -34,6 +34,7 @@ from robottelo.cli.docker import DockerContainer, DockerRegistry
 from robottelo.cli.domain import Domain
 from robottelo.cli.environment import Environment
 from robottelo.cli.filter import Filter
+from robottelo.cli.hammer import hammer_commands
 from robottelo.cli.gpgkey import GPGKey
 from robottelo.cli.host import Host
 from robottelo.cli.hostcollection import HostCollection
@@ -51,6 +52,7 @@ from robottelo.cli.product import Product
 from robottelo.cli.proxy import CapsuleTunnelError, Proxy
 from robottelo.cli.repository import Repository
 from robottelo.cli.repository_set import RepositorySet
+from robottelo.cli.rest import fast_setup as rest_fast_setup
 from robottelo.cli.role import Role
 from robottelo.cli.subnet import Subnet
 from robottelo.cli.subscription import Subscription
@@ -87,7 +89,8 @@ class CLIFactoryError(Exception):
     """Indicates an error occurred while creating an entity using hammer"""
 
 
-def create_object(cli_object, options, values):
+def create_object(cli_object, options, values, single_round_trip=False,
+                  fast_setup=None):
     """
     Creates <object> with dictionary of arguments.
 
@@ -95,6 +98,13 @@ def create_object(cli_object, options, values):
     :param dict options: The default options accepted by the cli_object
         create
     :param dict values: Custom values to override default ones.
+    :param bool single_round_trip: Create the object and read it back with a
+        single ssh round trip. Only for CLI objects using
+        :meth:`robottelo.cli.base.Base.create`.
+    :param bool fast_setup: Create the object through the server API, when
+        its options allow it, or through hammer if ``False``. ``None`` follows
+        the ``cli_fast_setup`` setting or the enclosing
+        :func:`robottelo.cli.rest.fast_setup` block.
     :raise robottelo.cli.factory.CLIFactoryError: Raise an exception if object
         cannot be created.
     :rtype: dict
@@ -102,15 +112,14 @@ def create_object(cli_object, options, values):
 
     """
     if values:
-        diff = set(values.keys()).difference(set(options.keys()))
-        if diff:
-            logger.debug(
-                "Option(s) {0} not supported by CLI factory. Please check for "
-                "a typo or update default options".format(diff)
-            )
+        _check_options(cli_object, values)
     update_dictionary(options, values)
     try:
-        result = cli_object.create(options)
+        if fast_setup is None:
+            result = _create(cli_object, options, single_round_trip)
+        else:
+            with rest_fast_setup(fast_setup):
+                result = _create(cli_object, options, single_round_trip)
     except CLIReturnCodeError as err:
         # If the object is not created, raise exception, stop the show.
         raise CLIFactoryError(
@@ -129,6 +138,76 @@ def create_object(cli_object, options, values):
     return result
 
 
+def _check_options(cli_object, values):
+    """Warn about the ``values`` which are not options of the hammer create
+    command of ``cli_object``, according to
+    :data:`robottelo.cli.hammer.hammer_commands`.
+    """
+    command = u'hammer {0} create'.format(cli_object.command_base)
+    if command not in hammer_commands:
+        return
+    unknown = hammer_commands.unknown_options(command, values)
+    if unknown:
+        logger.warning(
+            'Option(s) %s not accepted by %s. Please check for a typo or '
+            'update hammer_commands.json', ', '.join(unknown), command)
+
+
+def _still_exists(cli_object):
+    """Return a function checking that an object made by a
+    :func:`robottelo.decorators.cacheable` factory of ``cli_object`` was not
+    deleted, reading it by id.
+    """
+    def validate(obj, options):
+        """Return whether ``obj``, made with ``options``, still exists."""
+        info_options = {u'id': obj[u'id']}
+        if cli_object.command_requires_org:
+            if u'organization-id' not in (options or {}):
+                return True
+            info_options[u'organization-id'] = options[u'organization-id']
+        try:
+            cli_object.info(info_options)
+        except CLIReturnCodeError:
+            return False
+        return True
+    return validate
+
+
+def _create(cli_object, options, single_round_trip=False):
+    """Create <object> with ``options``, see :func:`create_object`."""
+    if single_round_trip:
+        return cli_object.create(options, single_round_trip=True)
+    return cli_object.create(options)
+
+
+def make_many(make_fn, count, options=None, concurrency=4):
+    """Make several entities in parallel with a factory function.
+
+    Usage::
+
+        hosts = make_many(make_fake_host, 100, {u'organization-id': org_id})
+        for index in hosts.failed:
+            logger.warning(hosts.errors[index])
+
+    :param make_fn: A factory function like :func:`make_org`.
+    :param int count: How many entities to make.
+    :param options: The options passed to each ``make_fn`` call or a list with
+        the options of each call, ``count`` long.
+    :param int concurrency: Maximum number of entities made at the same time.
+    :return: The entities made, in order. Entities which failed to be made
+        are ``None`` and their errors are found by index on ``errors``.
+    :rtype: robottelo.cli.base.CLIBulkResult
+    """
+    if isinstance(options, list):
+        if len(options) != count:
+            raise CLIFactoryError(
+                u'Expected {0} options, got {1}'.format(count, len(options)))
+        options_list = [dict(item) for item in options]
+    else:
+        options_list = [dict(options or {}) for _ in range(count)]
+    return run_many(make_fn, options_list, concurrency)
+
+
 @cacheable
 def make_activation_key(options=None):
     """
@@ -175,7 +254,7 @@ def make_activation_key(options=None):
         u'unlimited-hosts': None,
     }
 
-    return create_object(ActivationKey, args, options)
+    return create_object(ActivationKey, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -196,7 +275,7 @@ def make_architecture(options=None):
         u'operatingsystem-ids': None,
     }
 
-    return create_object(Architecture, args, options)
+    return create_object(Architecture, args, options, single_round_trip=True)
 
 
 def make_container(options=None):
@@ -281,7 +360,7 @@ def make_container(options=None):
     return create_object(DockerContainer, args, options)
 
 
-@cacheable
+@cacheable(validate=_still_exists(ContentView))
 def make_content_view(options=None):
     """
     Usage::
@@ -321,7 +400,7 @@ def make_content_view(options=None):
         u'repository-ids': None
     }
 
-    return create_object(ContentView, args, options)
+    return create_object(ContentView, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -554,7 +633,7 @@ def make_gpg_key(options=None):
     return create_object(GPGKey, args, options)
 
 
-@cacheable
+@cacheable(validate=_still_exists(Location))
 def make_location(options=None):
     """Location CLI factory
 
@@ -647,7 +726,7 @@ def make_location(options=None):
         u'users': None,
     }
 
-    return create_object(Location, args, options)
+    return create_object(Location, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -671,7 +750,7 @@ def make_model(options=None):
         u'vendor-class': None,
     }
 
-    return create_object(Model, args, options)
+    return create_object(Model, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -718,10 +797,10 @@ def make_partition_table(options=None):
     # Upload file to server
     ssh.upload_file(local_file=layout, remote_file=args['file'])
 
-    return create_object(PartitionTable, args, options)
+    return create_object(PartitionTable, args, options, single_round_trip=True)
 
 
-@cacheable
+@cacheable(validate=_still_exists(Product))
 def make_product(options=None):
     """
     Usage::
@@ -759,7 +838,7 @@ def make_product(options=None):
         u'sync-plan-id': None,
     }
 
-    return create_object(Product, args, options)
+    return create_object(Product, args, options, single_round_trip=True)
 
 
 def make_product_wait(options=None, wait_for=5):
@@ -917,7 +996,7 @@ def make_repository(options=None):
         u'url': FAKE_1_YUM_REPO,
     }
 
-    return create_object(Repository, args, options)
+    return create_object(Repository, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -933,7 +1012,7 @@ def make_role(options=None):
     # Assigning default values for attributes
     args = {u'name': gen_alphanumeric(6)}
 
-    return create_object(Role, args, options)
+    return create_object(Role, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -1043,7 +1122,7 @@ def make_subnet(options=None):
         u'vlanid': None,
     }
 
-    return create_object(Subnet, args, options)
+    return create_object(Subnet, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -1090,7 +1169,7 @@ def make_sync_plan(options=None):
         u'sync-date': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
     }
 
-    return create_object(SyncPlan, args, options)
+    return create_object(SyncPlan, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -1335,7 +1414,7 @@ def make_host_collection(options=None):
         u'unlimited-hosts': None,
     }
 
-    return create_object(HostCollection, args, options)
+    return create_object(HostCollection, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -1512,7 +1591,7 @@ def make_user(options=None):
         .format(args['login'], args['password'])
     )
 
-    return create_object(User, args, options)
+    return create_object(User, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -1541,7 +1620,7 @@ def make_usergroup(options=None):
         u'users': None,
     }
 
-    return create_object(UserGroup, args, options)
+    return create_object(UserGroup, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -1638,7 +1717,7 @@ def make_compute_resource(options=None):
     return create_object(ComputeResource, args, options)
 
 
-@cacheable
+@cacheable(validate=_still_exists(Org))
 def make_org(options=None):
     """
     Usage::
@@ -1736,7 +1815,7 @@ def make_org(options=None):
         u'users': None,
     }
 
-    return create_object(Org, args, options)
+    return create_object(Org, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -1799,7 +1878,7 @@ def make_os(options=None):
         u'release-name': None,
     }
 
-    return create_object(OperatingSys, args, options)
+    return create_object(OperatingSys, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -1831,7 +1910,7 @@ def make_domain(options=None):
         u'organization-ids': None,
     }
 
-    return create_object(Domain, args, options)
+    return create_object(Domain, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -1921,7 +2000,7 @@ def make_hostgroup(options=None):
         u'subnet-id': None,
     }
 
-    return create_object(HostGroup, args, options)
+    return create_object(HostGroup, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -1973,7 +2052,7 @@ def make_medium(options=None):
         u'path': 'http://{0}'.format((gen_string('alpha', 6))),
     }
 
-    return create_object(Medium, args, options)
+    return create_object(Medium, args, options, single_round_trip=True)
 
 
 @cacheable
@@ -2001,10 +2080,10 @@ def make_environment(options=None):
         u'organization-ids': None,
     }
 
-    return create_object(Environment, args, options)
+    return create_object(Environment, args, options, single_round_trip=True)
 
 
-@cacheable
+@cacheable(validate=_still_exists(LifecycleEnvironment))
 def make_lifecycle_environment(options=None):
     """
     Usage::
@@ -2048,7 +2127,8 @@ def make_lifecycle_environment(options=None):
         u'prior': None,
     }
 
-    return create_object(LifecycleEnvironment, args, options)
+    return create_object(
+        LifecycleEnvironment, args, options, single_round_trip=True)
 
 
 @cacheable
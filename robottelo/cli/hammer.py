@@ -1,13 +1,19 @@
 """Helpers to interact with hammer command line utility."""
 import csv
 import json
-
+import operator
 import re
+import threading
+
 import six
 from six import text_type
-from six.moves import cStringIO as StringIO
 from six.moves import zip
 
+if six.PY2:
+    from collections import MutableMapping
+else:
+    from collections.abc import MutableMapping
+
 
 def _csv_reader(output):
     """An unicode CSV reader which processes unicode strings and return unicode
@@ -23,17 +29,22 @@ def _csv_reader(output):
     On Python 3 this generator is not needed because the default string type is
     unicode.
 
+    The lines are fed to the CSV reader one by one as they are consumed, the
+    output is never joined back into a single string, so ``output`` can be a
+    stream of lines still being read.
+
     :param output: can be any object which supports the iterator protocol and
     returns a unicode string each time its next() method is called.
     :return: generator that will yield a list of unicode string values.
 
     """
-    data = '\n'.join(output)
+    # The line terminator keeps the new lines of multi-line quoted values
     if six.PY2:
-        data = data.encode('utf8')
-    handler = StringIO(data)
+        lines = ((line + u'\n').encode('utf8') for line in output)
+    else:
+        lines = (line + u'\n' for line in output)
 
-    for row in csv.reader(handler):
+    for row in csv.reader(lines):
         if six.PY2:
             yield [value.decode('utf8') for value in row]
         else:
@@ -46,12 +57,18 @@ def _normalize(header):
     return header.replace(' ', '-').lower()
 
 
-def parse_json(stdout):
+def parse_json(stdout, lazy=True):
     """Parse JSON output from Hammer CLI and convert it to python dictionary
     while normalizing keys.
+
+    Unless ``lazy`` is ``False`` the objects are returned as
+    :class:`JSONMapping`, which only normalize the keys and convert the values
+    of an object when it is first read.
     """
     parsed = json.loads(stdout)
-    return _normalize_obj(parsed)
+    if not lazy:
+        return _normalize_obj(parsed)
+    return _json_value(parsed)
 
 
 def _normalize_obj(obj):
@@ -68,13 +85,246 @@ def _normalize_obj(obj):
     return obj
 
 
-def parse_csv(output):
-    """Parse CSV output from Hammer CLI and convert it to python dictionary."""
+#: Maximum number of normalized keys kept by :func:`_json_key`
+JSON_KEYS_CACHE_SIZE = 1024
+_json_keys = {}
+
+
+def _json_key(key):
+    """Return the normalized JSON object ``key``, the same keys are found on
+    every object of a list so they are cached.
+    """
+    try:
+        return _json_keys[key]
+    except KeyError:
+        if len(_json_keys) >= JSON_KEYS_CACHE_SIZE:
+            _json_keys.clear()
+        normalized = _json_keys[key] = _normalize(key)
+        return normalized
+
+
+class JSONList(list):
+    """List of the values of a JSON array, its objects are
+    :class:`JSONMapping`.
+    """
+
+    __slots__ = ()
+
+
+def _json_value(value):
+    """Return the parsed JSON ``value`` as returned by :class:`JSONMapping`.
+
+    Objects are wrapped, not converted, so this is cheap even for arrays.
+    """
+    value_type = type(value)
+    if value_type is dict:
+        return JSONMapping(value)
+    if value_type is list:
+        return JSONList(_json_value(item) for item in value)
+    # doing this to conform to csv parser
+    if isinstance(value, int) and value_type is not bool:
+        return text_type(value)
+    return value
+
+
+def _plain_value(value):
+    """Return ``value`` with the :class:`JSONMapping` converted to dict."""
+    if isinstance(value, JSONMapping):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain_value(item) for item in value]
+    return value
+
+
+class JSONMapping(MutableMapping):
+    """Mapping over a parsed JSON object normalizing its keys lazily.
+
+    The keys are normalized, as :func:`parse_json` does, when the object is
+    first read and a value is converted, integers to strings and objects to
+    :class:`JSONMapping`, when it is first accessed. Reading a field of a big
+    entity doesn't convert the rest of it::
+
+        host = Host.info({'id': 1}, output_format='json')
+        host['operating-system']
+
+    It behaves like a dictionary and compares equal to the dictionary
+    :func:`parse_json` would return with ``lazy=False``, but it is not a
+    ``dict`` instance, use :meth:`to_dict` when one is needed, for example to
+    serialize it.
+    """
+
+    __slots__ = ('_raw', '_data', '_values')
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._data = None
+        self._values = {}
+
+    @property
+    def _keys(self):
+        """Map the normalized keys to the raw values."""
+        if self._data is None:
+            json_key = _json_key
+            self._data = {
+                json_key(key): value for key, value in self._raw.items()}
+            self._raw = None
+        return self._data
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            value = self._values[key] = _json_value(self._keys[key])
+            return value
+
+    def __setitem__(self, key, value):
+        self._keys[key] = value
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        del self._keys[key]
+        self._values.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return u'JSONMapping({0!r})'.format(self.to_dict())
+
+    def copy(self):
+        """Return a shallow copy as dictionary."""
+        return dict(self.items())
+
+    def to_dict(self):
+        """Return the object as dictionary, converting all its values."""
+        return {key: _plain_value(value) for key, value in self.items()}
+
+
+class CSVRecord(tuple):
+    """Base class of the records yielded by :func:`iter_csv`.
+
+    A record is a tuple of the row values which can also be read by the
+    normalized column names, as item or as attribute when the name is a valid
+    identifier once the dashes are replaced by underscores::
+
+        record['content-view'] == record.content_view == record[1]
+
+    Records don't have a ``__dict__``, use :meth:`_asdict` to get the
+    dictionary :func:`parse_csv` would return.
+    """
+
+    __slots__ = ()
+
+    #: The normalized column names
+    _fields = ()
+    #: Map the column names to their index
+    _index = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, six.string_types):
+            try:
+                key = self._index[key]
+            except KeyError:
+                raise KeyError(key)
+        return tuple.__getitem__(self, key)
+
+    def __repr__(self):
+        return u'{0}({1})'.format(
+            type(self).__name__,
+            u', '.join(
+                u'{0}={1!r}'.format(key, value)
+                for key, value in zip(self._fields, self)
+            )
+        )
+
+    def get(self, key, default=None):
+        """Return the value of column ``key`` or ``default``."""
+        index = self._index.get(key)
+        if index is None:
+            return default
+        return tuple.__getitem__(self, index)
+
+    def keys(self):
+        """Return the normalized column names."""
+        return list(self._fields)
+
+    def _asdict(self):
+        """Return a dictionary mapping the column names to the values."""
+        return dict(zip(self._fields, self))
+
+
+_IDENTIFIER = re.compile(r'^[a-z][a-z0-9_]*$')
+_csv_record_types = {}
+
+
+def csv_record_type(keys):
+    """Return the :class:`CSVRecord` subclass for the normalized column
+    names ``keys``.
+
+    Record types are cached, so all the outputs having the same columns share
+    the same type.
+    """
+    keys = tuple(keys)
+    try:
+        return _csv_record_types[keys]
+    except KeyError:
+        pass
+    attrs = {
+        '__slots__': (),
+        '_fields': keys,
+        '_index': {key: index for index, key in enumerate(keys)},
+    }
+    for index, key in enumerate(keys):
+        name = key.replace('-', '_')
+        if (_IDENTIFIER.match(name) and name not in attrs and
+                not hasattr(CSVRecord, name)):
+            attrs[str(name)] = property(operator.itemgetter(index))
+    record_type = _csv_record_types[keys] = type(
+        'CSVRecord', (CSVRecord,), attrs)
+    return record_type
+
+
+def iter_csv(output, records=False):
+    """Parse CSV output from Hammer CLI yielding each row as it is read.
+
+    ``output`` can be any iterable of lines, like the
+    :class:`robottelo.ssh.SSHCommandStream` of a hammer command run with
+    ``--output=csv``, rows are yielded while the next lines are still being
+    received.
+
+    :param output: Iterable of the output lines, the first being the header.
+    :param bool records: Yield :class:`CSVRecord` tuples instead of
+        dictionaries. They share the column names, so they are cheaper to
+        build and keep for big outputs.
+    :return: A generator of the rows, empty rows are skipped.
+    """
     reader = _csv_reader(output)
+    try:
+        headers = next(reader)
+    except StopIteration:
+        return
     # Generate the key names, spaces will be converted to dashes "-"
-    keys = [_normalize(header) for header in next(reader)]
-    # For each entry, create a dict mapping each key with each value
-    return [dict(zip(keys, values)) for values in reader if len(values) > 0]
+    keys = [_normalize(header) for header in headers]
+    if records:
+        record_type = csv_record_type(keys)
+        for values in reader:
+            if values:
+                yield tuple.__new__(record_type, values)
+    else:
+        for values in reader:
+            if values:
+                yield dict(zip(keys, values))
+
+
+def parse_csv(output):
+    """Parse CSV output from Hammer CLI and convert it to python dictionary."""
+    return list(iter_csv(output))
 
 
 def parse_help(output):
@@ -141,82 +391,206 @@ def parse_help(output):
     return contents
 
 
+class HammerCommandIndex(object):
+    """Index of the hammer commands metadata generated by
+    ``scripts/hammer_command_tree.py``.
+
+    The data file is only read the first time a command is looked up. The
+    commands are then indexed by their full path, like ``hammer repository
+    synchronize``, and the options of each command by name when they are
+    first asked for::
+
+        >>> hammer_commands['hammer repository synchronize']['description']
+        'Sync a repository'
+        >>> hammer_commands.unknown_options(
+        ...     'hammer repository create', ['name', 'nmae'])
+        ['nmae']
+
+    :param str filename: The data file, found by
+        :func:`robottelo.helpers.get_data_file`.
+    """
+
+    def __init__(self, filename='hammer_commands.json'):
+        self.filename = filename
+        self._commands = None
+        self._options = {}
+        self._lock = threading.Lock()
+
+    @property
+    def commands(self):
+        """The nodes of the commands tree keyed by command path."""
+        if self._commands is None:
+            with self._lock:
+                if self._commands is None:
+                    self._commands = self._load()
+        return self._commands
+
+    def _load(self):
+        """Read the data file and index its commands by path."""
+        # helpers imports the CLI classes
+        from robottelo.helpers import get_data_file
+        with open(get_data_file(self.filename)) as handler:
+            tree = json.load(handler)
+        commands = {}
+        nodes = [(u'hammer', tree)]
+        while nodes:
+            path, node = nodes.pop()
+            commands[path] = node
+            nodes.extend(
+                (u'{0} {1}'.format(path, subcommand['name']), subcommand)
+                for subcommand in node.get('subcommands') or []
+            )
+        return commands
+
+    def __contains__(self, path):
+        return path in self.commands
+
+    def __getitem__(self, path):
+        return self.commands[path]
+
+    def get(self, path, default=None):
+        """Return the node of the command ``path`` or ``default``."""
+        return self.commands.get(path, default)
+
+    def options(self, path):
+        """Return the options of the command ``path`` keyed by name.
+
+        :raises KeyError: If the command is not known.
+        """
+        try:
+            return self._options[path]
+        except KeyError:
+            options = self._options[path] = {
+                option['name']: option
+                for option in self.commands[path].get('options') or []
+            }
+            return options
+
+    def unknown_options(self, path, names):
+        """Return the ``names`` which are not options of the command
+        ``path``, sorted.
+
+        :raises KeyError: If the command is not known.
+        """
+        options = self.options(path)
+        return sorted(name for name in names if name not in options)
+
+    def clear(self):
+        """Forget the index, the data file is read again when needed."""
+        with self._lock:
+            self._commands = None
+            self._options = {}
+
+
+#: The :class:`HammerCommandIndex` of ``hammer_commands.json``.
+hammer_commands = HammerCommandIndex()
+
+
+# parse_info patterns
+_INFO_NUMBERED_KEY = re.compile(r'(\d+)\)')
+_INFO_NUMBERS = re.compile(r'\d+\)')
+_INFO_NUMBERED_VALUE = re.compile(r'\d+\)\s+(.+)$')
+
+#: Maximum number of normalized keys kept by :func:`_info_key`
+INFO_KEYS_CACHE_SIZE = 1024
+_info_keys = {}
+
+
+def _info_key(key):
+    """Return the normalized ``key`` of an info output, stripping the
+    leading spaces, replacing the others with '-' and lowering all chars.
+
+    Info outputs repeat the same keys over and over, so the normalized keys
+    are cached.
+    """
+    try:
+        return _info_keys[key]
+    except KeyError:
+        if len(_info_keys) >= INFO_KEYS_CACHE_SIZE:
+            # Keys of user data, like parameters names, are cached too
+            _info_keys.clear()
+        normalized = _info_keys[key] = key.lstrip().replace(' ', '-').lower()
+        return normalized
+
+
 def parse_info(output):
-    """Parse the info output and returns a dict mapping the values."""
+    """Parse the info output and returns a dict mapping the values.
+
+    The output lines are read in a single pass, see
+    ``scripts/benchmark_hammer_parsers.py`` to measure it.
+    """
     # info dictionary
     contents = {}
     sub_prop = None  # stores name of the last group of sub-properties
     sub_num = None  # is not None when list of properties
+    info_key = _info_key
 
     for line in output:
         # skip empty lines
-        if line == '':
+        if not line:
             continue
-        if line.startswith(' '):  # sub-properties are indented
-            # values are separated by ':' or '=>', but not by '::' which can be
-            # entity name like 'test::params::keys'
-            if line.find(':') != -1 and not line.find('::') != -1:
-                key, value = line.lstrip().split(":", 1)
-            elif line.find('=>') != -1:
-                key, value = line.lstrip().split(" =>", 1)
-            else:
-                key = value = None
-
-            if key is None and value is None:
-                # Parse single attribute collection properties
-                # Template
-                #  1) template1
-                #  2) template2
-                #
-                # or
-                # Template
-                #  template1
-                #  template2
-                match = re.match(r'\d+\)\s+(.+)$', line.lstrip())
-
-                if match is None:
-                    match = re.match(r'(.*)$', line.lstrip())
-
-                value = match.group(1)
-
-                if isinstance(contents[sub_prop], dict):
-                    contents[sub_prop] = []
-
-                contents[sub_prop].append(value)
-            else:
-                # some properties have many numbered values
-                # Example:
-                # Content:
-                #  1) Repo Name: repo1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                #  2) Repo Name: puppet1
-                #     URL:       /custom/4f84fc90-9ffa-...
-                starts_with_number = re.match(r'(\d+)\)', key)
-                if starts_with_number:
-                    sub_num = int(starts_with_number.group(1))
-                    # no. 1) we need to change dict() to list()
-                    if sub_num == 1:
-                        contents[sub_prop] = []
-                    # remove number from key
-                    key = re.sub(r'\d+\)', '', key)
-                    # append empty dict to array
-                    contents[sub_prop].append({})
-
-                key = key.lstrip().replace(' ', '-').lower()
-
-                # add value to dictionary
-                if sub_num is not None:
-                    contents[sub_prop][-1][key] = value.lstrip()
-                else:
-                    contents[sub_prop][key] = value.lstrip()
-        else:
+        if line[0] != ' ':
             sub_num = None  # new property implies no sub property
-            key, value = line.lstrip().split(":", 1)
-            key = key.lstrip().replace(' ', '-').lower()
-            if value.lstrip() == '':  # 'key:' no value, new sub-property
+            key, value = line.split(':', 1)
+            key = info_key(key)
+            value = value.lstrip()
+            if not value:  # 'key:' no value, new sub-property
                 sub_prop = key
                 contents[sub_prop] = {}
             else:  # 'key: value' line
-                contents[key] = value.lstrip()
+                contents[key] = value
+            continue
+
+        # sub-properties are indented
+        stripped = line.lstrip()
+        # values are separated by ':' or '=>', but not by '::' which can be
+        # entity name like 'test::params::keys'
+        if ':' in line and '::' not in line:
+            key, value = stripped.split(':', 1)
+        elif '=>' in line:
+            key, value = stripped.split(' =>', 1)
+        else:
+            # Parse single attribute collection properties
+            # Template
+            #  1) template1
+            #  2) template2
+            #
+            # or
+            # Template
+            #  template1
+            #  template2
+            match = _INFO_NUMBERED_VALUE.match(stripped)
+            if match is not None:
+                stripped = match.group(1)
+            values = contents[sub_prop]
+            if isinstance(values, dict):
+                values = contents[sub_prop] = []
+            values.append(stripped)
+            continue
+
+        # some properties have many numbered values
+        # Example:
+        # Content:
+        #  1) Repo Name: repo1
+        #     URL:       /custom/4f84fc90-9ffa-...
+        #  2) Repo Name: puppet1
+        #     URL:       /custom/4f84fc90-9ffa-...
+        if key[:1].isdigit():
+            starts_with_number = _INFO_NUMBERED_KEY.match(key)
+            if starts_with_number:
+                sub_num = int(starts_with_number.group(1))
+                # no. 1) we need to change dict() to list()
+                if sub_num == 1:
+                    contents[sub_prop] = []
+                # remove number from key
+                key = _INFO_NUMBERS.sub('', key)
+                # append empty dict to array
+                contents[sub_prop].append({})
+
+        # add value to dictionary
+        if sub_num is not None:
+            contents[sub_prop][-1][info_key(key)] = value.lstrip()
+        else:
+            contents[sub_prop][info_key(key)] = value.lstrip()
 
     return contents
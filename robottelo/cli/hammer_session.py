@@ -0,0 +1,310 @@
+# -*- encoding: utf-8 -*-
+"""Hammer session authentication shared by the commands of each user.
+
+Passing ``-u`` and ``-p`` to every hammer command makes hammer authenticate
+against the server API on each call. With sessions enabled hammer logs in
+once, keeps a session cookie under ``~/.hammer/sessions`` and reuses it for
+the following commands.
+
+:class:`HammerSessions` logs in each user once per worker, the first time a
+command is run for it, with ``hammer auth login basic``. Every user gets its
+own ``HOME`` directory on the server, so users run by the same worker, like
+the ones of :meth:`robottelo.cli.base.Base.with_user`, or by different
+workers never share a session. Sessions are also kept per password, so a
+command run with another password than the one a user logged in with never
+runs on that session and fails to authenticate as it would without
+sessions. When a command fails because the session expired the user is
+logged in again and the command is run once more.
+
+A session outlives a change of its user password on the server, so the old
+password would keep working on it until it expires. Passwords changed by
+:meth:`robottelo.cli.user.User.update` drop the sessions, other changes need
+to call :meth:`HammerSessions.forget`.
+
+The mode is enabled by the ``hammer_sessions`` setting of the
+``[robottelo]`` section and used by :meth:`robottelo.cli.base.Base.execute`
+through :data:`hammer_sessions`. Commands run by the resident hammer
+interpreter, see :mod:`robottelo.cli.hammer_shell`, keep passing the
+credentials.
+
+Every ``baseline_every`` command of each family still passes the
+credentials, so the time saved per command can be reported by
+:meth:`HammerSessions.stats`.
+
+"""
+import atexit
+import hashlib
+import logging
+import re
+import threading
+import time
+import uuid
+
+from robottelo import ssh
+from robottelo.config import settings
+from robottelo.ssh_metrics import Histogram
+from six.moves import shlex_quote
+
+logger = logging.getLogger(__name__)
+
+# Messages hammer prints when the session is no longer valid
+_EXPIRED_REGEX = re.compile(r'[Ss]ession (has )?expired')
+
+# Hammer configuration enabling the sessions
+_CONFIG = u':foreman:\n  :use_sessions: true\n'
+
+
+class HammerSessionError(Exception):
+    """Indicates that a user could not log in hammer."""
+
+
+class HammerSessions(object):
+    """Thread-safe hammer sessions of the users of a worker.
+
+    :param int baseline_every: Run every n-th command of each family passing
+        the credentials, to measure the time saved. ``0`` disables it.
+    """
+
+    def __init__(self, baseline_every=20):
+        self.baseline_every = baseline_every
+        #: Directory on the server holding the ``HOME`` of each session
+        self.root = u'/tmp/robottelo-hammer-sessions-{0}'.format(
+            uuid.uuid4().hex)
+        self._homes = {}
+        self._unsupported = set()
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._user_locks = {}
+        self.reset()
+
+    def reset(self):
+        """Forget the recorded metrics."""
+        with self._lock:
+            self.logins = Histogram()
+            self.relogins = 0
+            self.commands = {}
+
+    @staticmethod
+    def _key(hostname, user, password):
+        """Return the key of the ``user`` session logged in with
+        ``password``.
+        """
+        return (
+            hostname,
+            user,
+            hashlib.sha1(u'{0}'.format(password).encode('utf-8')).hexdigest(),
+        )
+
+    def _home(self, hostname, user, password):
+        """Return the ``HOME`` directory of the ``user`` session logged in
+        with ``password``.
+        """
+        digest = hashlib.sha1(
+            u'{0}\n{1}\n{2}'.format(hostname, user, password).encode(
+                'utf-8')).hexdigest()
+        return u'{0}/{1}'.format(self.root, digest[:16])
+
+    def login(self, user, password, hostname=None):
+        """Log ``user`` in hammer, creating its session.
+
+        :return: The ``HOME`` directory of the session.
+        :raises robottelo.cli.hammer_session.HammerSessionError: If the login
+            fails.
+        """
+        hostname = hostname or settings.server.hostname
+        home = self._home(hostname, user, password)
+        cmd = (
+            u'umask 077 && mkdir -p {home}/.hammer && '
+            u'printf {config} > {home}/.hammer/cli_config.yml && '
+            u'LANG={locale} HOME={home} hammer auth login basic '
+            u'--username {user} --password {password}'.format(
+                home=home,
+                config=shlex_quote(_CONFIG.replace(u'\n', u'\\n')),
+                locale=settings.locale,
+                user=shlex_quote(user),
+                password=shlex_quote(password),
+            )
+        )
+        start = time.time()
+        result = ssh.command(cmd.encode('utf-8'), hostname=hostname)
+        elapsed = time.time() - start
+        if result.return_code != 0:
+            raise HammerSessionError(
+                u'Could not log {0} in hammer: {1}'.format(
+                    user, result.stderr))
+        with self._lock:
+            self.logins.add(elapsed)
+            self._homes[self._key(hostname, user, password)] = home
+        return home
+
+    def _session(self, hostname, user, password, expired=None):
+        """Return the ``HOME`` of the ``user`` session, logging it in if
+        there is none or if it is ``expired``.
+        """
+        key = self._key(hostname, user, password)
+        with self._lock:
+            user_lock = self._user_locks.setdefault(key, threading.Lock())
+        # Concurrent commands of a user wait for a single login
+        with user_lock:
+            with self._lock:
+                home = self._homes.get(key)
+            if home is None or home == expired:
+                home = self.login(user, password, hostname)
+            return home
+
+    def forget(self, user=None, hostname=None):
+        """Forget the sessions of ``user``, or of every user if ``None``, so
+        the next commands log in again.
+
+        :param str hostname: Only forget the sessions on this host.
+        """
+        def matches(key):
+            return (
+                (user is None or key[1] == user) and
+                (hostname is None or key[0] == hostname)
+            )
+        with self._lock:
+            for key in [key for key in self._homes if matches(key)]:
+                del self._homes[key]
+            self._unsupported = set(
+                key for key in self._unsupported if not matches(key))
+
+    def record(self, family, mode, elapsed):
+        """Record the duration of a command run with the ``session`` or
+        passing the ``credentials``.
+        """
+        with self._lock:
+            stats = self.commands.setdefault(family, {})
+            histogram = stats.get(mode)
+            if histogram is None:
+                histogram = stats[mode] = Histogram()
+            histogram.add(elapsed)
+
+    def run(self, args, user, password, family, output_format=None,
+            timeout=None, time_hammer=False):
+        """Run hammer with ``args`` on the ``user`` session.
+
+        :param str args: The hammer arguments, without the credentials.
+        :param str user: The user running the command.
+        :param str password: The user password, used to log in. Each
+            password gets its own session.
+        :param str family: The command family, like ``host create``, whose
+            durations are recorded.
+        :return: The command result or ``None`` when the command should pass
+            the credentials instead, because it is a baseline command or
+            because the user could not log in.
+        :rtype: robottelo.ssh.SSHCommandResult
+        """
+        hostname = settings.server.hostname
+        key = self._key(hostname, user, password)
+        with self._lock:
+            count = self._counts[family] = self._counts.get(family, 0) + 1
+            if key in self._unsupported:
+                return None
+        if self.baseline_every and count % self.baseline_every == 0:
+            return None
+        try:
+            home = self._session(hostname, user, password)
+        except HammerSessionError as err:
+            logger.warning(
+                'Hammer sessions not available for %s, passing the '
+                'credentials: %s', user, err)
+            with self._lock:
+                self._unsupported.add(key)
+            return None
+        start = time.time()
+        result = self._command(home, args, output_format, timeout, time_hammer)
+        if result.return_code != 0 and _EXPIRED_REGEX.search(
+                result.stderr or u''):
+            logger.debug('Hammer session of %s expired, logging in', user)
+            with self._lock:
+                self.relogins += 1
+            try:
+                home = self._session(hostname, user, password, expired=home)
+            except HammerSessionError:
+                return result
+            start = time.time()
+            result = self._command(
+                home, args, output_format, timeout, time_hammer)
+        self.record(family, 'session', time.time() - start)
+        return result
+
+    @staticmethod
+    def _command(home, args, output_format, timeout, time_hammer):
+        """Run hammer with ``args`` using the session of ``home``."""
+        return ssh.command(
+            u'LANG={0} HOME={1} {2} hammer {3}'.format(
+                settings.locale,
+                home,
+                u'time -p' if time_hammer else u'',
+                args,
+            ).encode('utf-8'),
+            output_format=output_format,
+            timeout=timeout,
+        )
+
+    def stats(self):
+        """Return the logins and, for each command family, the mean duration
+        with the session and passing the credentials, and the time saved per
+        command when both are known.
+
+        :rtype: dict
+        """
+        with self._lock:
+            commands = {}
+            saved = 0.0
+            for family, modes in self.commands.items():
+                session = modes.get('session')
+                credentials = modes.get('credentials')
+                family_saved = None
+                if session is not None and credentials is not None:
+                    family_saved = credentials.mean - session.mean
+                    saved += family_saved * session.count
+                commands[family] = {
+                    'session': session.to_dict() if session else None,
+                    'credentials': (
+                        credentials.to_dict() if credentials else None),
+                    'saved_per_command': family_saved,
+                }
+            return {
+                'logins': self.logins.to_dict(),
+                'relogins': self.relogins,
+                'commands': commands,
+                'saved': saved - self.logins.total,
+            }
+
+    def log_stats(self):
+        """Log the logins and the time saved per command of each family."""
+        stats = self.stats()
+        logger.info(
+            'hammer sessions: %d logins, %d expired, %.1fs saved',
+            stats['logins']['count'], stats['relogins'], stats['saved'])
+        for family in sorted(stats['commands']):
+            saved = stats['commands'][family]['saved_per_command']
+            if saved is not None:
+                logger.info(
+                    'hammer sessions %s: %.3fs saved per command',
+                    family, saved)
+
+    def clear(self):
+        """Forget the sessions and remove them from the server."""
+        with self._lock:
+            hostnames = set(key[0] for key in self._homes)
+            self._homes.clear()
+            self._unsupported.clear()
+        for hostname in hostnames:
+            try:
+                ssh.command(
+                    u'rm -rf {0}'.format(self.root).encode('utf-8'),
+                    hostname=hostname,
+                )
+            except Exception as err:
+                logger.warning(
+                    'Could not remove the hammer sessions from %s: %s',
+                    hostname, err)
+
+
+#: The :class:`HammerSessions` used by
+#: :meth:`robottelo.cli.base.Base.execute`.
+hammer_sessions = HammerSessions()
+atexit.register(hammer_sessions.clear)
@@ -0,0 +1,383 @@
+# -*- encoding: utf-8 -*-
+"""Resident hammer interpreter to run many hammer commands in one process.
+
+Starting Ruby and loading hammer and its plugins takes more than a second on
+every ``hammer`` call. A :class:`HammerShell` starts a small Ruby driver on
+the server, over a single ssh channel, which loads hammer once and then runs
+every command it receives on the same process.
+
+The arguments of each command are split the way a shell would and sent as a
+base64 encoded JSON list on a single line. The command exit code, stdout and
+stderr are sent back on a single line starting with a random marker, so the
+outputs are framed reliably whatever they contain.
+
+The mode is enabled by the ``hammer_shell`` setting of the ``[robottelo]``
+section and used by :meth:`robottelo.cli.base.Base.execute` through
+:data:`shell_pool`.
+
+"""
+import atexit
+import base64
+import json
+import logging
+import paramiko
+import shlex
+import six
+import socket
+import threading
+import time
+import uuid
+
+from robottelo import ssh
+from robottelo.config import settings
+from robottelo.ssh_metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Ruby driver run on the server. It receives the marker as argument and, for
+# each command line received, runs hammer again on the same process capturing
+# its output. Hammer finishes calling exit so SystemExit gives the exit code.
+_DRIVER = b'''
+require 'base64'
+require 'json'
+require 'stringio'
+marker = ARGV.shift
+hammer = Gem.bin_path('hammer_cli', 'hammer')
+output = $stdout
+output.sync = true
+run = lambda do |args|
+  out, err = StringIO.new, StringIO.new
+  $stdout, $stderr = out, err
+  status = 0
+  begin
+    ARGV.replace(args)
+    load hammer
+  rescue SystemExit => e
+    status = e.status
+  rescue Exception => e
+    err.puts("#{e.class}: #{e.message}")
+    status = 70
+  ensure
+    $stdout, $stderr = output, STDERR
+  end
+  output.puts([
+    marker, status, Base64.strict_encode64(out.string),
+    Base64.strict_encode64(err.string)].join(' '))
+end
+run.call(['--version'])
+while (line = $stdin.gets)
+  run.call(JSON.parse(Base64.decode64(line).force_encoding('UTF-8')))
+end
+'''
+
+# Characters having a special meaning for the shell outside single quotes and
+# the ones having it also inside double quotes
+_SHELL_METACHARACTERS = set('|&;<>()`$\n*?')
+_DOUBLE_QUOTED_METACHARACTERS = set('`$')
+
+
+class HammerShellError(Exception):
+    """Indicates that the hammer shell died or could not be started.
+
+    :param bool command_sent: Whether the shell died after receiving the
+        command, which may then have run.
+    """
+
+    def __init__(self, msg=None, command_sent=False):
+        super(HammerShellError, self).__init__(msg)
+        self.command_sent = command_sent
+
+
+def is_supported(args):
+    """Return whether the hammer ``args`` can be run by a shell.
+
+    Arguments using shell features, like variables, pipes or redirections,
+    need to be run by a real shell and are not supported.
+
+    :param str args: The hammer arguments as they would be passed to a shell.
+    :rtype: bool
+    """
+    quote = None
+    escaped = False
+    for char in args:
+        if escaped:
+            escaped = False
+        elif quote == u"'":
+            if char == u"'":
+                quote = None
+        elif char == u'\\':
+            escaped = True
+        elif quote == u'"':
+            if char == u'"':
+                quote = None
+            elif char in _DOUBLE_QUOTED_METACHARACTERS:
+                return False
+        elif char in (u'"', u"'"):
+            quote = char
+        elif char in _SHELL_METACHARACTERS:
+            return False
+    return quote is None and not escaped
+
+
+def split_args(args):
+    """Split the hammer ``args`` the way a shell would.
+
+    :param str args: The hammer arguments as they would be passed to a shell.
+    :return: The arguments list.
+    :rtype: list
+    """
+    if six.PY2:  # pragma: no cover
+        # shlex doesn't support unicode on Python 2
+        return [
+            arg.decode('utf-8') for arg in shlex.split(args.encode('utf-8'))]
+    return shlex.split(args)
+
+
+class HammerShell(object):
+    """A resident hammer interpreter running on a remote host.
+
+    A shell runs one command at a time. It is started on the first command
+    and restarted on the next command if it dies.
+
+    :param str hostname: The host to run hammer on. If ``None`` the
+        ``server.hostname`` from the configuration is used.
+    :param str lang: The value of ``LANG`` for hammer.
+    :param str ruby: The command starting the Ruby interpreter hammer uses,
+        for example ``scl enable tfm -- ruby``.
+    :param int timeout: Seconds to wait for a command output.
+    """
+
+    def __init__(self, hostname=None, lang=None, ruby=u'ruby', timeout=None):
+        self.hostname = hostname
+        self.lang = lang
+        self.ruby = ruby
+        self.timeout = timeout
+        self.marker = None
+        self._connection = None
+        self._channel = None
+        self._stdin = None
+        self._stdout = None
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self):
+        """Whether the driver is running."""
+        return (
+            self._channel is not None and
+            not self._channel.closed and
+            not self._channel.exit_status_ready()
+        )
+
+    def start(self):
+        """Start the driver on the remote host.
+
+        :raises HammerShellError: If hammer can't be run.
+        """
+        self.close()
+        self.marker = u'ROBOTTELO-HAMMER-{0}'.format(uuid.uuid4().hex)
+        self._connection = ssh._connect(hostname=self.hostname)
+        self._channel = self._connection.get_transport().open_session()
+        self._channel.settimeout(self.timeout)
+        self._channel.exec_command(
+            u"LANG={0} {1} -rbase64 -e 'eval(Base64.decode64(ARGV.shift))' "
+            u'{2} {3}'.format(
+                self.lang or settings.locale,
+                self.ruby,
+                base64.b64encode(_DRIVER).decode('ascii'),
+                self.marker,
+            )
+        )
+        self._stdin = self._channel.makefile('wb')
+        self._stdout = self._channel.makefile('rb')
+        # The driver runs hammer --version when starting which also makes sure
+        # hammer can be run
+        return_code, _, stderr = self._read_response()
+        if return_code != 0:
+            self.close()
+            raise HammerShellError(
+                u'Unable to start the hammer shell: {0}'.format(
+                    ssh.decode_to_utf8(stderr)))
+        logger.debug('Started hammer shell %s', self.marker)
+
+    def _read_response(self):
+        """Read the response of a command.
+
+        :return: A tuple ``(return_code, stdout, stderr)``, the outputs as
+            bytes.
+        :raises HammerShellError: If the driver dies or times out.
+        """
+        marker = self.marker.encode('ascii')
+        extra_stdout = []
+        try:
+            while True:
+                line = self._stdout.readline()
+                if not line:
+                    raise HammerShellError(
+                        u'The hammer shell exited with status {0}'.format(
+                            self._channel.recv_exit_status()))
+                if line.startswith(marker + b' '):
+                    break
+                # Written straight to STDOUT, bypassing the capture
+                extra_stdout.append(line)
+        except socket.timeout:
+            self.close()
+            raise HammerShellError(u'Timed out waiting for hammer output')
+        except HammerShellError:
+            self.close()
+            raise
+        _, return_code, stdout, stderr = line.rstrip(b'\n').split(b' ')
+        stderr = base64.b64decode(stderr)
+        # Drain what was written straight to STDERR
+        while self._channel.recv_stderr_ready():
+            stderr += self._channel.recv_stderr(32768)
+        return (
+            int(return_code),
+            b''.join(extra_stdout) + base64.b64decode(stdout),
+            stderr,
+        )
+
+    def run(self, args, output_format=None):
+        """Run hammer with ``args``.
+
+        :param str args: The hammer arguments as they would be passed to a
+            shell. Check them with :func:`is_supported` first.
+        :param str output_format: json, csv or None
+        :return: The command result.
+        :rtype: robottelo.ssh.SSHCommandResult
+        :raises HammerShellError: If the shell can't be started or dies while
+            running the command. It is restarted on the next command.
+        """
+        with self._lock:
+            if not self.alive:
+                self.start()
+            self._channel.settimeout(self.timeout)
+            logger.debug('>>> hammer %s', args)
+            start = time.time()
+            try:
+                self._stdin.write(
+                    base64.b64encode(json.dumps(split_args(args)).encode(
+                        'utf-8')) + b'\n')
+                self._stdin.flush()
+            except (EnvironmentError, EOFError) as err:
+                self.close()
+                raise HammerShellError(
+                    u'Unable to send the command to the hammer shell: '
+                    u'{0}'.format(err))
+            try:
+                return_code, stdout, stderr = self._read_response()
+            except HammerShellError as err:
+                err.command_sent = True
+                raise
+            metrics.record_command(
+                u'hammer {0}'.format(args), time.time() - start,
+                len(stdout), len(stderr)
+            )
+        return ssh._build_result(stdout, stderr, return_code, output_format)
+
+    def close(self):
+        """Stop the driver and close its connection."""
+        if self._channel is not None:
+            try:
+                self._channel.close()
+            except Exception:  # pragma: no cover
+                pass
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = self._channel = None
+        self._stdin = self._stdout = None
+
+
+class HammerShellPool(object):
+    """Thread-safe pool of :class:`HammerShell`.
+
+    Shells are keyed by hostname and handed to a single thread at a time, so
+    concurrent threads get their own shells. When a shell can't be started,
+    the host is marked as unsupported and :meth:`run` returns ``None`` from
+    then on, letting the caller run hammer the usual way. ``None`` is also
+    returned when a shell dies before receiving a command, while a shell
+    dying or timing out after receiving it raises
+    :class:`robottelo.cli.base.CLIReturnCodeError` as the command may have
+    run.
+
+    :param int max_idle: Maximum number of idle shells kept per host.
+    """
+
+    def __init__(self, max_idle=4):
+        self.max_idle = max_idle
+        self._idle = {}
+        self._unsupported = set()
+        self._lock = threading.Lock()
+
+    def run(self, args, output_format=None, hostname=None, timeout=None):
+        """Run hammer with ``args`` on a shell.
+
+        See :meth:`HammerShell.run` for the arguments description.
+
+        :return: The command result or ``None`` if the command or the host
+            are not supported by the shell or the command could not be sent.
+        :rtype: robottelo.ssh.SSHCommandResult
+        :raises robottelo.cli.base.CLIReturnCodeError: If the shell dies or
+            times out while running the command.
+        """
+        hostname = hostname or settings.server.hostname
+        if hostname in self._unsupported or not is_supported(args):
+            return None
+        with self._lock:
+            idle = self._idle.setdefault(hostname, [])
+            shell = idle.pop() if idle else None
+        if shell is None:
+            shell = HammerShell(
+                hostname, ruby=settings.hammer_shell_ruby or u'ruby')
+        shell.timeout = timeout
+        if not shell.alive:
+            # Nothing was run yet, so hammer can still be run the usual way
+            try:
+                shell.start()
+            except (HammerShellError, paramiko.SSHException,
+                    socket.error) as err:
+                logger.warning(
+                    'Hammer shell not available on %s, running hammer '
+                    'commands the usual way: %s', hostname, err)
+                self._unsupported.add(hostname)
+                return None
+        try:
+            result = shell.run(args, output_format)
+        except HammerShellError as err:
+            if not err.command_sent:
+                logger.warning(
+                    'Hammer shell died on %s, running the command the usual '
+                    'way: %s', hostname, err)
+                return None
+            # base imports this module
+            from robottelo.cli.base import CLIReturnCodeError
+            # Like ssh when the connection is lost
+            raise CLIReturnCodeError(
+                255,
+                u'{0}'.format(err),
+                u'The hammer shell died while running the command: '
+                u'{0}'.format(err)
+            )
+        finally:
+            with self._lock:
+                idle = self._idle.setdefault(hostname, [])
+                if len(idle) < self.max_idle:
+                    idle.append(shell)
+                    shell = None
+            if shell is not None:
+                shell.close()
+        return result
+
+    def clear(self):
+        """Close all the shells."""
+        with self._lock:
+            shells = [shell for idle in self._idle.values() for shell in idle]
+            self._idle.clear()
+            self._unsupported.clear()
+        for shell in shells:
+            shell.close()
+
+
+#: The :class:`HammerShellPool` used by
+#: :meth:`robottelo.cli.base.Base.execute`.
+shell_pool = HammerShellPool()
+atexit.register(shell_pool.clear)
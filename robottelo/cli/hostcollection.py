@@ -54,16 +54,14 @@ class HostCollection(Base):
     @classmethod
     def add_host(cls, options=None):
         """Add host to the host collection"""
-        cls.command_sub = 'add-host'
         cls.transform_ids(options)
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, 'add-host'))
 
     @classmethod
     def remove_host(cls, options=None):
         """Remove hosts from the host collection"""
-        cls.command_sub = 'remove-host'
         cls.transform_ids(options)
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, 'remove-host'))
 
     @classmethod
     def hosts(cls, options=None):
@@ -96,6 +94,5 @@ class HostCollection(Base):
              --search SEARCH                         filter results
              -h, --help                              print help
         """
-        cls.command_sub = 'hosts'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'hosts'), output_format='csv')
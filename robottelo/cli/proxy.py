@@ -34,11 +34,9 @@ class Proxy(Base):
     @classmethod
     def importclasses(cls, options=None):
         """Import puppet classes from puppet proxy."""
-        cls.command_sub = 'import-classes'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, 'import-classes'))
 
     @classmethod
     def refresh_features(cls, options=None):
         """Refreshes smart proxy features"""
-        cls.command_sub = 'refresh-features'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, 'refresh-features'))
@@ -41,8 +41,7 @@ class Puppet(Base):
              --puppet-class-id PUPPET_CLASS_ID  ID of Puppet class
              --search SEARCH                    filter results
         """
-        cls.command_sub = 'sc-params'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, 'sc-params'))
 
     @classmethod
     def smart_variables(cls, options=None):
@@ -58,5 +57,4 @@ class Puppet(Base):
              --puppet-class-id PUPPET_CLASS_ID  ID of Puppet class
              --search SEARCH                    filter results
          """
-        cls.command_sub = 'smart-variables'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, 'smart-variables'))
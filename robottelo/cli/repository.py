@@ -33,56 +33,49 @@ class Repository(Base):
     command_requires_org = True
 
     @classmethod
-    def create(cls, options=None):
+    def create(cls, options=None, single_round_trip=False):
         """Create a custom repository"""
-        cls.command_requires_org = False
-
-        try:
-            result = super(Repository, cls).create(options)
-        finally:
-            cls.command_requires_org = True
-
-        return result
+        return super(Repository, cls._without_org()).create(
+            options, single_round_trip=single_round_trip)
 
     @classmethod
     def export(cls, options=None):
         """Export a repository"""
-        cls.command_sub = 'export'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, 'export'),
             output_format='csv',
             ignore_stderr=True,
         )
 
     @classmethod
-    def info(cls, options=None):
+    def info(cls, options=None, output_format=None):
         """Show a custom repository"""
-        cls.command_requires_org = False
-
-        try:
-            result = super(Repository, cls).info(options)
-        finally:
-            cls.command_requires_org = True
-
-        return result
+        return super(Repository, cls._without_org()).info(
+            options, output_format=output_format)
 
     @classmethod
     def synchronize(cls, options, return_raw_response=None):
         """Synchronizes a repository."""
-        cls.command_sub = 'synchronize'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, 'synchronize'),
             output_format='csv',
             ignore_stderr=True,
             return_raw_response=return_raw_response,
         )
 
+    @classmethod
+    def synchronize_async(cls, options):
+        """Starts synchronizing a repository and returns a future of its
+        task, see :meth:`robottelo.cli.base.Base.execute_async`.
+        """
+        return cls.execute_async(
+            cls._construct_command(options, 'synchronize'))
+
     @classmethod
     def upload_content(cls, options):
         """Upload content to repository."""
-        cls.command_sub = 'upload-content'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, 'upload-content'),
             output_format='csv',
             ignore_stderr=True,
         )
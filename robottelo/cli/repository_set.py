@@ -34,16 +34,14 @@ class RepositorySet(Base):
     @classmethod
     def enable(cls, options):
         """Enables a repository."""
-        cls.command_sub = 'enable'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'enable'), output_format='csv')
 
     @classmethod
     def disable(cls, options):
         """Disables a repository."""
-        cls.command_sub = 'disable'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'disable'), output_format='csv')
 
     @classmethod
     def available_repositories(cls, options):
@@ -71,6 +69,6 @@ class RepositorySet(Base):
             -h, --help                              print help
 
         """
-        cls.command_sub = 'available-repositories'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'available-repositories'),
+            output_format='csv')
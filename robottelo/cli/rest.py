@@ -0,0 +1,282 @@
+# -*- encoding: utf-8 -*-
+"""Fast setup of CLI records through the server API.
+
+Creating the records a test needs, and not testing hammer itself, does not
+need a hammer ``create`` process per record. In fast setup
+mode :meth:`robottelo.cli.base.Base.create` and
+:meth:`robottelo.cli.base.Base.delete` of the classes listed on
+:data:`ENTITIES` send the same options straight to the server API instead::
+
+    with fast_setup():
+        org = make_org()
+        product = make_product({'organization-id': org['id']})
+
+The options are translated with the ``nailgun`` entity definitions: an
+option becomes the entity field with the same name, ``-id`` and ``-ids``
+options the ids of its related entities. Options not accepted by hammer,
+according to ``hammer_commands.json``, or without a matching field run
+hammer instead. The records returned by :class:`RESTClient` have their keys
+normalized like the ones parsed from hammer and their integers converted to
+strings, but keep the structure of the API ones, for example with the
+organization as a nested record. The CLI classes read the created records
+back with hammer ``info`` so they get the usual structure.
+
+Fast setup is enabled for every create by the ``cli_fast_setup`` setting of
+the ``[robottelo]`` section, or for the current thread by
+:func:`fast_setup`.
+
+"""
+import contextlib
+import logging
+import requests
+import threading
+
+from nailgun import entities, entity_fields
+from nailgun.config import ServerConfig
+from robottelo.cli import hammer
+from robottelo.cli.task_waiter import TaskFailedError, task_waiter
+from robottelo.config import settings
+
+logger = logging.getLogger(__name__)
+
+#: The ``nailgun`` entity of each hammer base command which can be created
+#: through the API
+ENTITIES = {
+    'activation-key': 'ActivationKey',
+    'content-view': 'ContentView',
+    'domain': 'Domain',
+    'gpg': 'GPGKey',
+    'host-collection': 'HostCollection',
+    'lifecycle-environment': 'LifecycleEnvironment',
+    'location': 'Location',
+    'organization': 'Organization',
+    'product': 'Product',
+    'repository': 'Repository',
+}
+
+# Entity fields named differently than their hammer option
+_FIELD_NAMES = {
+    ('repository', 'publish-via-http'): 'unprotected',
+}
+
+# Hammer exit codes of the API errors
+_RETURN_CODES = {404: 128, 422: 65}
+
+_TRUE_VALUES = (u'1', u'true', u'yes')
+
+# Fields of the Foreman tasks returned by the asynchronous API calls
+_TASK_FIELDS = (u'id', u'label', u'state', u'result')
+
+_local = threading.local()
+
+
+class RESTUnsupportedError(Exception):
+    """Indicates that a command can't be run through the API and needs
+    hammer.
+    """
+
+
+@contextlib.contextmanager
+def fast_setup(enabled=True):
+    """Create the records of the current thread through the API, or through
+    hammer if ``enabled`` is ``False``, inside the ``with`` block.
+    """
+    previous = getattr(_local, 'enabled', None)
+    _local.enabled = enabled
+    try:
+        yield
+    finally:
+        _local.enabled = previous
+
+
+def fast_setup_enabled():
+    """Return whether the current thread creates the records through the
+    API.
+    """
+    enabled = getattr(_local, 'enabled', None)
+    if enabled is None:
+        return bool(settings.cli_fast_setup)
+    return enabled
+
+
+def _normalize_record(obj):
+    """Normalize the keys of an API record like the hammer ones."""
+    if isinstance(obj, dict):
+        return {
+            hammer._normalize(key.replace(u'_', u'-')): _normalize_record(val)
+            for key, val in obj.items()
+        }
+    return hammer._normalize_obj(obj)
+
+
+def _field_value(field, value):
+    """Convert the hammer option ``value`` to the type of ``field``."""
+    if isinstance(field, entity_fields.BooleanField):
+        if isinstance(value, bool):
+            return value
+        return u'{0}'.format(value).lower() in _TRUE_VALUES
+    if isinstance(field, entity_fields.IntegerField):
+        return int(value)
+    if isinstance(field, (entity_fields.ListField,
+                          entity_fields.OneToManyField)):
+        if isinstance(value, list):
+            return value
+        return [item.strip() for item in u'{0}'.format(value).split(u',')]
+    return value
+
+
+class RESTClient(object):
+    """Thread-safe client running hammer commands through the API with a
+    pooled HTTP session.
+
+    :param int pool_size: Maximum number of connections kept open.
+    """
+
+    def __init__(self, pool_size=10):
+        self.pool_size = pool_size
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The ``requests`` session used by every call."""
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.auth = settings.server.get_credentials()
+                session.verify = False
+                self._session = session
+            return self._session
+
+    def entity(self, base, options=None):
+        """Return the ``nailgun`` entity of ``base`` with the fields of the
+        hammer ``create`` ``options``.
+
+        :raises robottelo.cli.rest.RESTUnsupportedError: If an option can't
+            be translated.
+        """
+        if base not in ENTITIES:
+            raise RESTUnsupportedError(
+                u'{0} is not supported through the API'.format(base))
+        entity_cls = getattr(entities, ENTITIES[base])
+        config = ServerConfig(
+            settings.server.get_url(),
+            settings.server.get_credentials(),
+            verify=False,
+        )
+        fields = entity_cls(config).get_fields()
+        try:
+            hammer_options = hammer.hammer_commands.options(
+                u'hammer {0} create'.format(base))
+        except KeyError:
+            raise RESTUnsupportedError(
+                u'{0} create is not a known hammer command'.format(base))
+        values = {}
+        for name, value in (options or {}).items():
+            # Hammer omits these options too
+            if value is None or value is False:
+                continue
+            if name not in hammer_options:
+                raise RESTUnsupportedError(
+                    u'{0} create has no option {1}'.format(base, name))
+            field_name = _FIELD_NAMES.get(
+                (base, name), name.replace(u'-', u'_'))
+            field = fields.get(field_name)
+            for suffix, field_type in ((u'_ids', entity_fields.OneToManyField),
+                                       (u'_id', entity_fields.OneToOneField)):
+                related = fields.get(field_name[:-len(suffix)])
+                if (field_name.endswith(suffix) and
+                        isinstance(related, field_type)):
+                    field_name = field_name[:-len(suffix)]
+                    field = related
+                    break
+            else:
+                # Related entities given by name need hammer to find them
+                if isinstance(field, (entity_fields.OneToOneField,
+                                      entity_fields.OneToManyField)):
+                    field = None
+            if field is None:
+                raise RESTUnsupportedError(
+                    u'{0} create option {1} has no API field'.format(
+                        base, name))
+            values[field_name] = _field_value(field, value)
+        try:
+            return entity_cls(config, **values)
+        except (TypeError, ValueError) as err:
+            raise RESTUnsupportedError(
+                u'{0} entity can not be built: {1}'.format(base, err))
+
+    def _request(self, method, url, **kwargs):
+        """Send a request, raising ``CLIReturnCodeError`` if it fails.
+
+        When the API runs the request as a Foreman task, like Katello does
+        for deleting products or repositories, the task is waited for as
+        hammer does.
+        """
+        # base imports this module
+        from robottelo.cli.base import CLIReturnCodeError
+        response = self.session.request(method, url, **kwargs)
+        if not response.ok:
+            raise CLIReturnCodeError(
+                _RETURN_CODES.get(response.status_code, 70),
+                response.text,
+                u'{0} {1} failed with {2}: {3}'.format(
+                    method, url, response.status_code, response.text),
+            )
+        if not response.content:
+            return {}
+        body = response.json()
+        if isinstance(body, dict) and all(
+                field in body for field in _TASK_FIELDS):
+            try:
+                body = task_waiter.wait(body[u'id']).result()
+            except TaskFailedError as err:
+                raise CLIReturnCodeError(
+                    70,
+                    u'{0}'.format(err),
+                    u'{0} {1} failed: {2}'.format(method, url, err),
+                )
+        return _normalize_record(body)
+
+    def create(self, base, options=None):
+        """Create a record with the hammer ``create`` ``options``.
+
+        :return: The created record.
+        :rtype: dict
+        :raises robottelo.cli.rest.RESTUnsupportedError: If the options
+            can't be translated.
+        :raises robottelo.cli.base.CLIReturnCodeError: If the record is not
+            created.
+        """
+        entity = self.entity(base, options)
+        return self._request(
+            'POST', entity.path('base'), json=entity.create_payload())
+
+    def info(self, base, options):
+        """Read the record with the ``id`` of ``options``.
+
+        :rtype: dict
+        """
+        return self._request('GET', self._record_url(base, options))
+
+    def delete(self, base, options):
+        """Delete the record with the ``id`` of ``options``, waiting for the
+        deletion task if there is one.
+        """
+        return self._request('DELETE', self._record_url(base, options))
+
+    def _record_url(self, base, options):
+        """Return the URL of the record with the ``id`` of ``options``."""
+        if set(options or {}) - {u'id', u'organization-id'}:
+            raise RESTUnsupportedError(
+                u'{0} records are only found by id'.format(base))
+        entity = self.entity(base)
+        return u'{0}/{1}'.format(entity.path('base'), options[u'id'])
+
+
+#: The :class:`RESTClient` used by the CLI classes.
+rest_client = RESTClient()
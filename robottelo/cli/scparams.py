@@ -31,9 +31,8 @@ class SmartClassParameter(Base):
     @classmethod
     def info(cls, options=None):
         """Gets information for smart class parameter"""
-        cls.command_sub = 'info'
         return cls.execute(
-            cls._construct_command(options), output_format='json')
+            cls._construct_command(options, 'info'), output_format='json')
 
     @classmethod
     def add_override_value(cls, options=None):
@@ -58,9 +57,9 @@ class SmartClassParameter(Base):
                                                                 yes/no, 1/0.
             --value VALUE                                       Override value
         """
-        cls.command_sub = 'add-override-value'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'add-override-value'),
+            output_format='csv')
 
     @classmethod
     def remove_override_value(cls, options=None):
@@ -81,6 +80,6 @@ class SmartClassParameter(Base):
                                                                 parameter name
             --smart-class-parameter-id SMART_CLASS_PARAMETER_ID
         """
-        cls.command_sub = 'remove-override-value'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'remove-override-value'),
+            output_format='csv')
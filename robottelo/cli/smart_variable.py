@@ -33,9 +33,8 @@ class SmartVariable(Base):
     @classmethod
     def info(cls, options=None):
         """Gets information for smart variables"""
-        cls.command_sub = 'info'
         return cls.execute(
-            cls._construct_command(options), output_format='json')
+            cls._construct_command(options, 'info'), output_format='json')
 
     @classmethod
     def add_override_value(cls, options=None):
@@ -57,9 +56,9 @@ class SmartVariable(Base):
                                                                 yes/no, 1/0.
             --value VALUE                                       Override value
         """
-        cls.command_sub = 'add-override-value'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'add-override-value'),
+            output_format='csv')
 
     @classmethod
     def remove_override_value(cls, options=None):
@@ -76,6 +75,6 @@ class SmartVariable(Base):
                                                                 name
             --smart-variable-id SMART_VARIABLE_ID
         """
-        cls.command_sub = 'remove-override-value'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'remove-override-value'),
+            output_format='csv')
@@ -34,10 +34,9 @@ class Subscription(Base):
     @classmethod
     def upload(cls, options=None):
         """Upload a subscription manifest."""
-        cls.command_sub = 'upload'
         timeout = 900 if bz_bug_is_open(1340229) else 300
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, 'upload'),
             ignore_stderr=True,
             timeout=timeout,
         )
@@ -45,23 +44,20 @@ class Subscription(Base):
     @classmethod
     def delete_manifest(cls, options=None):
         """Deletes a subscription manifest."""
-        cls.command_sub = 'delete-manifest'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, 'delete-manifest'),
             ignore_stderr=True,
         )
 
     @classmethod
     def refresh_manifest(cls, options=None):
         """Refreshes a subscription manifest."""
-        cls.command_sub = 'refresh-manifest'
         return cls.execute(
-            cls._construct_command(options),
+            cls._construct_command(options, 'refresh-manifest'),
             ignore_stderr=True,
         )
 
     @classmethod
     def manifest_history(cls, options=None):
         """Provided history for subscription manifest"""
-        cls.command_sub = 'manifest-history'
-        return cls.execute(cls._construct_command(options))
+        return cls.execute(cls._construct_command(options, 'manifest-history'))
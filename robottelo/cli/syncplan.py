@@ -30,23 +30,11 @@ class SyncPlan(Base):
     command_requires_org = True
 
     @classmethod
-    def create(cls, options=None):
-        cls.command_requires_org = False
-
-        try:
-            result = super(SyncPlan, cls).create(options)
-        finally:
-            cls.command_requires_org = True
-
-        return result
+    def create(cls, options=None, single_round_trip=False):
+        return super(SyncPlan, cls._without_org()).create(
+            options, single_round_trip=single_round_trip)
 
     @classmethod
-    def info(cls, options=None):
-        cls.command_requires_org = False
-
-        try:
-            result = super(SyncPlan, cls).info(options)
-        finally:
-            cls.command_requires_org = True
-
-        return result
+    def info(cls, options=None, output_format=None):
+        return super(SyncPlan, cls._without_org()).info(
+            options, output_format=output_format)
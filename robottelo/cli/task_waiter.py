@@ -0,0 +1,191 @@
+# -*- encoding: utf-8 -*-
+"""Wait for many Foreman tasks together.
+
+Long hammer operations, like synchronizing a repository or publishing a
+content view, can be started with ``--async`` by
+:meth:`robottelo.cli.base.Base.execute_async`, which returns a future as
+soon as hammer prints the task id. The task is then watched by
+:data:`task_waiter`, which polls all the pending tasks with a single
+``bulk_search`` API request through one HTTP session on a background thread.
+
+The poll interval starts at ``min_interval`` seconds and grows by
+``backoff`` times, up to ``max_interval``, while no task finishes::
+
+    futures = [
+        Repository.synchronize_async({'id': repo['id']}) for repo in repos]
+    for future in futures:
+        task = future.result()
+
+"""
+import logging
+import requests
+import threading
+import time
+
+from concurrent.futures import Future
+from robottelo.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tasks states once they are not running anymore
+_FINISHED_STATES = ('stopped', 'paused')
+
+
+class TaskFailedError(Exception):
+    """Indicates that a Foreman task finished with a result other than
+    ``success``.
+
+    :param dict task: The task as returned by the API.
+    """
+
+    def __init__(self, task, msg=None):
+        self.task = task
+        if msg is None:
+            msg = u'Task {0} finished with result {1}: {2}'.format(
+                task.get('id'),
+                task.get('result'),
+                u'; '.join(task.get('humanized', {}).get('errors') or []),
+            )
+        super(TaskFailedError, self).__init__(msg)
+
+
+class TaskTimedOutError(TaskFailedError):
+    """Indicates that a Foreman task did not finish in time."""
+
+
+class TaskWaiter(object):
+    """Thread-safe waiter of Foreman tasks.
+
+    :param float min_interval: Seconds between polls after a task finishes.
+    :param float max_interval: Maximum seconds between polls.
+    :param float backoff: Factor applied to the interval while no task
+        finishes.
+    :param int max_errors: Consecutive failed polls after which the pending
+        tasks fail.
+    """
+
+    def __init__(self, min_interval=1, max_interval=15, backoff=1.5,
+                 max_errors=5):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_errors = max_errors
+        self._pending = {}
+        self._session = None
+        self._thread = None
+        self._condition = threading.Condition()
+
+    def wait(self, task_id, timeout=3600):
+        """Watch the task ``task_id``.
+
+        :param str task_id: The task UUID.
+        :param float timeout: Seconds to wait for the task to finish.
+        :return: A future whose result is the finished task, as returned by
+            the API, or which raises :class:`TaskFailedError` or
+            :class:`TaskTimedOutError`.
+        :rtype: concurrent.futures.Future
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        with self._condition:
+            self._pending.setdefault(task_id, []).append(
+                (future, time.time() + timeout))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='task-waiter')
+                self._thread.daemon = True
+                self._thread.start()
+            self._condition.notify()
+        return future
+
+    def _get_session(self):
+        """Return the HTTP session used to poll the tasks."""
+        if self._session is None:
+            session = requests.Session()
+            session.auth = settings.server.get_credentials()
+            session.verify = False
+            self._session = session
+        return self._session
+
+    def poll(self, task_ids):
+        """Read the tasks ``task_ids`` with a single request.
+
+        :return: A dictionary mapping the ids to the tasks found.
+        """
+        response = self._get_session().post(
+            u'{0}/foreman_tasks/api/tasks/bulk_search'.format(
+                settings.server.get_url()),
+            json={'searches': [
+                {'type': 'task', 'task_id': task_id, 'search_id': task_id}
+                for task_id in task_ids
+            ]},
+        )
+        response.raise_for_status()
+        tasks = {}
+        for search in response.json():
+            for task in search.get('results') or []:
+                tasks[task['id']] = task
+        return tasks
+
+    def _run(self):
+        """Poll the pending tasks until there is none."""
+        interval = self.min_interval
+        errors = 0
+        while True:
+            with self._condition:
+                if not self._pending:
+                    self._thread = None
+                    return
+                task_ids = list(self._pending)
+            try:
+                tasks = self.poll(task_ids)
+                errors = 0
+            except Exception as err:
+                errors += 1
+                logger.warning('Could not poll the tasks: %s', err)
+                tasks = {}
+                if errors >= self.max_errors:
+                    self._finish_all(err)
+                    errors = 0
+            finished = 0
+            now = time.time()
+            with self._condition:
+                for task_id in task_ids:
+                    task = tasks.get(task_id)
+                    waiting = self._pending.get(task_id, [])
+                    if task is not None and task['state'] in _FINISHED_STATES:
+                        del self._pending[task_id]
+                        finished += 1
+                        for future, _ in waiting:
+                            if task.get('result') == 'success':
+                                future.set_result(task)
+                            else:
+                                future.set_exception(TaskFailedError(task))
+                        continue
+                    for item in [item for item in waiting if item[1] < now]:
+                        waiting.remove(item)
+                        item[0].set_exception(TaskTimedOutError(
+                            task or {'id': task_id},
+                            u'Timed out waiting for task {0}'.format(task_id)
+                        ))
+                    if not waiting:
+                        self._pending.pop(task_id, None)
+                if finished:
+                    interval = self.min_interval
+                else:
+                    interval = min(interval * self.backoff, self.max_interval)
+                if self._pending:
+                    self._condition.wait(interval)
+
+    def _finish_all(self, error):
+        """Fail all the pending tasks with ``error``."""
+        with self._condition:
+            pending, self._pending = self._pending, {}
+        for waiting in pending.values():
+            for future, _ in waiting:
+                future.set_exception(error)
+
+
+#: The :class:`TaskWaiter` used by
+#: :meth:`robottelo.cli.base.Base.execute_async`.
+task_waiter = TaskWaiter()
@@ -21,6 +21,7 @@ Subcommands::
 """
 
 from robottelo.cli.base import Base
+from robottelo.cli.hammer_session import hammer_sessions
 
 
 class User(Base):
@@ -33,13 +34,23 @@ class User(Base):
     @classmethod
     def add_role(cls, options=None):
         """Add a role to a user."""
-        cls.command_sub = 'add-role'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'add-role'), output_format='csv')
 
     @classmethod
     def remove_role(cls, options=None):
         """Remove a role from user."""
-        cls.command_sub = 'remove-role'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'remove-role'),
+            output_format='csv')
+
+    @classmethod
+    def update(cls, options=None):
+        """Update a user, forgetting the hammer sessions when a password
+        changes as they would keep accepting the old one.
+        """
+        result = super(User, cls).update(options)
+        if options and options.get('password'):
+            # The login may change too, so every user logs in again
+            hammer_sessions.forget()
+        return result
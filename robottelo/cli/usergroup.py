@@ -42,9 +42,8 @@ class UserGroup(Base):
             --role ROLE_NAME              User role name
             --role-id ROLE_ID
         """
-        cls.command_sub = 'add-role'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'add-role'), output_format='csv')
 
     @classmethod
     def add_user(cls, options=None):
@@ -59,9 +58,8 @@ class UserGroup(Base):
             --user USER_LOGIN             User's login to search by
             --user-id USER_ID
         """
-        cls.command_sub = 'add-user'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'add-user'), output_format='csv')
 
     @classmethod
     def add_user_group(cls, options=None):
@@ -76,9 +74,9 @@ class UserGroup(Base):
             --user-group USER_GROUP_NAME                  Name to search by
             --user-group-id USER_GROUP_ID
         """
-        cls.command_sub = 'add-user-group'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'add-user-group'),
+            output_format='csv')
 
     @classmethod
     def remove_role(cls, options=None):
@@ -93,9 +91,9 @@ class UserGroup(Base):
             --role ROLE_NAME              User role name
             --role-id ROLE_ID
         """
-        cls.command_sub = 'remove-role'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'remove-role'),
+            output_format='csv')
 
     @classmethod
     def remove_user(cls, options=None):
@@ -110,9 +108,9 @@ class UserGroup(Base):
             --user USER_LOGIN             User's login to search by
             --user-id USER_ID
         """
-        cls.command_sub = 'remove-user'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'remove-user'),
+            output_format='csv')
 
     @classmethod
     def remove_user_group(cls, options=None):
@@ -127,9 +125,9 @@ class UserGroup(Base):
             --user-group USER_GROUP_NAME                  Name to search by
             --user-group-id USER_GROUP_ID
         """
-        cls.command_sub = 'remove-user-group'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'remove-user-group'),
+            output_format='csv')
 
 
 class UserGroupExternal(Base):
@@ -150,6 +148,5 @@ class UserGroupExternal(Base):
 
     @classmethod
     def refresh(cls, options=None):
-        cls.command_sub = 'refresh'
         return cls.execute(
-            cls._construct_command(options), output_format='csv')
+            cls._construct_command(options, 'refresh'), output_format='csv')
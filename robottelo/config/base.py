@@ -684,7 +684,17 @@ class Settings(object):
         self._configured = False
         self._validation_errors = []
         self.browser = None
+        self.cli_fast_setup = None
+        self.hammer_cache = None
+        self.hammer_output_format = None
+        self.hammer_sessions = None
+        self.hammer_shell = None
+        self.hammer_shell_ruby = None
         self.locale = None
+        self.object_cache_dir = None
+        self.object_cache_max_entries = None
+        self.object_cache_scope = None
+        self.object_cache_ttl = None
         self.project = None
         self.reader = None
         self.rhel6_repo = None
@@ -693,7 +703,10 @@ class Settings(object):
         self.saucelabs_key = None
         self.saucelabs_user = None
         self.server = ServerSettings()
+        self.server_facts_cache_dir = None
+        self.server_facts_ttl = None
         self.run_one_datapoint = None
+        self.ssh_metrics_file = None
         self.upstream = None
         self.verbosity = None
         self.webdriver = None
@@ -816,7 +829,27 @@ class Settings(object):
         )
         self.browser = self.reader.get(
             'robottelo', 'browser', 'selenium')
+        self.cli_fast_setup = self.reader.get(
+            'robottelo', 'cli_fast_setup', False, bool)
+        self.hammer_cache = self.reader.get(
+            'robottelo', 'hammer_cache', 'none')
+        self.hammer_output_format = self.reader.get(
+            'robottelo', 'hammer_output_format', 'csv')
+        self.hammer_sessions = self.reader.get(
+            'robottelo', 'hammer_sessions', False, bool)
+        self.hammer_shell = self.reader.get(
+            'robottelo', 'hammer_shell', False, bool)
+        self.hammer_shell_ruby = self.reader.get(
+            'robottelo', 'hammer_shell_ruby', 'ruby')
         self.locale = self.reader.get('robottelo', 'locale', 'en_US.UTF-8')
+        self.object_cache_dir = self.reader.get(
+            'robottelo', 'object_cache_dir', None)
+        self.object_cache_max_entries = self.reader.get(
+            'robottelo', 'object_cache_max_entries', 128, int)
+        self.object_cache_scope = self.reader.get(
+            'robottelo', 'object_cache_scope', 'session')
+        self.object_cache_ttl = self.reader.get(
+            'robottelo', 'object_cache_ttl', 0, int)
         self.project = self.reader.get('robottelo', 'project', 'sat')
         self.rhel6_repo = self.reader.get('robottelo', 'rhel6_repo', None)
         self.rhel7_repo = self.reader.get('robottelo', 'rhel7_repo', None)
@@ -824,6 +857,12 @@ class Settings(object):
             'robottelo', 'screenshots_path', '/tmp/robottelo/screenshots')
         self.run_one_datapoint = self.reader.get(
             'robottelo', 'run_one_datapoint', False, bool)
+        self.server_facts_cache_dir = self.reader.get(
+            'robottelo', 'server_facts_cache_dir', None)
+        self.server_facts_ttl = self.reader.get(
+            'robottelo', 'server_facts_ttl', 3600, int)
+        self.ssh_metrics_file = self.reader.get(
+            'robottelo', 'ssh_metrics_file', None)
         self.cleanup = self.reader.get('robottelo', 'cleanup', False, bool)
         self.upstream = self.reader.get('robottelo', 'upstream', True, bool)
         self.verbosity = self.reader.get(
@@ -859,6 +898,16 @@ class Settings(object):
                 '[robottelo] browser should be one of {0}.'
                 .format(', '.join(browsers))
             )
+        if self.hammer_cache not in ('none', 'session', 'test'):
+            validation_errors.append(
+                '[robottelo] hammer_cache should be none, session or test.')
+        if self.object_cache_scope not in ('session', 'module', 'worker'):
+            validation_errors.append(
+                '[robottelo] object_cache_scope should be session, module or '
+                'worker.')
+        if self.hammer_output_format not in ('csv', 'json'):
+            validation_errors.append(
+                '[robottelo] hammer_output_format should be csv or json.')
         if self.webdriver not in webdrivers:
             validation_errors.append(
                 '[robottelo] webdriver should be one of {0}.'
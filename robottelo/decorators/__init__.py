@@ -1,20 +1,28 @@
 # -*- encoding: utf-8 -*-
 """Implements various decorators"""
 import bugzilla
+import hashlib
 import logging
+import os
 import pytest
 import requests
+import shutil
+import six
+import threading
+import time
 import unittest2
+import uuid
 
+from collections import OrderedDict
 from functools import wraps
 from robottelo.config import settings
 from robottelo.constants import BZ_OPEN_STATUSES, NOT_IMPLEMENTED
+from six.moves import cPickle as pickle
 from six.moves.xmlrpc_client import Fault
 from xml.parsers.expat import ExpatError, ErrorString
 
 BUGZILLA_URL = "https://bugzilla.redhat.com/xmlrpc.cgi"
 LOGGER = logging.getLogger(__name__)
-OBJECT_CACHE = {}
 REDMINE_URL = 'http://projects.theforeman.org'
 
 # Test Tier Decorators
@@ -150,8 +158,294 @@ def stubbed(reason=None):
     return wrapper
 
 
-def cacheable(func):
-    """Decorator that makes an optional object cache available"""
+class ObjectCache(object):
+    """Thread-safe cache of the objects made by the :func:`cacheable`
+    factories.
+
+    Objects are keyed by server, factory and options and kept on one of the
+    scopes:
+
+    * ``session``: until the end of the test session. When ``cache_dir`` is
+      set, the objects are also written to the ``namespace`` directory under
+      it so processes sharing both, like the pytest-xdist workers of a test
+      run, share them too. Other runs use another namespace, see
+      :meth:`remove_files`.
+    * ``worker``: until the end of the test session, never shared with other
+      processes.
+    * ``module``: until the end of the current test module, see
+      :meth:`end_module`.
+
+    The least recently used objects are dropped when there are more than
+    ``max_entries`` and the objects expire ``ttl`` seconds after being made.
+    These default to the ``object_cache_max_entries``, ``object_cache_ttl``
+    and ``object_cache_dir`` settings of the ``[robottelo]`` section.
+
+    :param int max_entries: Maximum number of objects kept by this process.
+    :param int ttl: Number of seconds an object is valid for, ``0`` for ever.
+    :param str cache_dir: Directory to share the session objects with other
+        processes.
+    :param str namespace: Name of the directory under ``cache_dir`` holding
+        the session objects. A new one is used for each cache by default.
+    """
+
+    #: Valid scopes
+    SCOPES = ('session', 'module', 'worker')
+
+    #: Maximum number of objects when ``max_entries`` is not set
+    default_max_entries = 128
+
+    def __init__(self, max_entries=None, ttl=None, cache_dir=None,
+                 namespace=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.namespace = namespace or uuid.uuid4().hex
+        self.module = None
+        self._entries = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _get_max_entries(self):
+        """Return the maximum number of objects falling back to the
+        settings.
+        """
+        if self.max_entries is not None:
+            return self.max_entries
+        return settings.object_cache_max_entries or self.default_max_entries
+
+    def _get_ttl(self):
+        """Return the ttl to use falling back to the settings."""
+        if self.ttl is not None:
+            return self.ttl
+        return settings.object_cache_ttl or 0
+
+    def _get_cache_dir(self):
+        """Return the directory shared with other processes or ``None``."""
+        cache_dir = self.cache_dir or settings.object_cache_dir
+        if not cache_dir:
+            return None
+        return os.path.join(cache_dir, self.namespace)
+
+    def _scoped_key(self, key, scope):
+        """Return the key of ``key`` on ``scope``."""
+        if scope not in self.SCOPES:
+            raise ValueError(
+                'Object cache scope should be one of {0}, got {1}'.format(
+                    ', '.join(self.SCOPES), scope))
+        hostname = settings.server.hostname
+        if scope == 'module':
+            return (scope, hostname, self.module, key)
+        return (scope, hostname, key)
+
+    def _count(self, key, stat):
+        """Count ``stat`` for the factory of ``key``."""
+        stats = self._stats.setdefault(key[0], {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'expired': 0,
+            'evictions': 0,
+        })
+        stats[stat] += 1
+
+    @staticmethod
+    def _get_path(cache_dir, key):
+        """Return the path of the file storing ``key`` on ``cache_dir``."""
+        name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(cache_dir, 'object-{0}.pickle'.format(name))
+
+    @staticmethod
+    def _read_file(path):
+        """Return the ``(stored_at, key, obj)`` stored at ``path`` or
+        ``None`` if it can't be read.
+        """
+        try:
+            with open(path, 'rb') as handler:
+                return pickle.load(handler)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def get(self, key, scope='session'):
+        """Return a ``(found, obj)`` tuple for ``key`` on ``scope``.
+
+        :param tuple key: The factory name followed by its normalized
+            options, see :func:`cacheable`.
+        """
+        scoped_key = self._scoped_key(key, scope)
+        cache_dir = self._get_cache_dir() if scope == 'session' else None
+        ttl = self._get_ttl()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(scoped_key)
+        if entry is None and cache_dir:
+            stored = self._read_file(self._get_path(cache_dir, scoped_key))
+            if stored is not None and stored[1] == scoped_key:
+                entry = (stored[0], stored[2])
+        with self._lock:
+            if entry is not None and ttl and now - entry[0] > ttl:
+                self._entries.pop(scoped_key, None)
+                self._count(key, 'expired')
+                entry = None
+            if entry is None:
+                self._count(key, 'misses')
+                return False, None
+            self._count(key, 'hits')
+            self._store(scoped_key, entry)
+        return True, entry[1]
+
+    def _store(self, scoped_key, entry):
+        """Keep ``entry`` as the most recently used one, the lock being
+        held.
+        """
+        self._entries.pop(scoped_key, None)
+        self._entries[scoped_key] = entry
+        max_entries = self._get_max_entries()
+        while len(self._entries) > max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._count(evicted[-1], 'evictions')
+
+    def set(self, key, obj, scope='session'):
+        """Store ``obj`` as the object of ``key`` on ``scope``."""
+        scoped_key = self._scoped_key(key, scope)
+        stored_at = time.time()
+        with self._lock:
+            self._store(scoped_key, (stored_at, obj))
+        cache_dir = self._get_cache_dir() if scope == 'session' else None
+        if not cache_dir:
+            return
+        if not os.path.isdir(cache_dir):
+            try:
+                os.makedirs(cache_dir)
+            except OSError:  # pragma: no cover
+                # Created by another process in the meantime
+                pass
+        path = self._get_path(cache_dir, scoped_key)
+        # Write to a temporary file and rename it so other processes never
+        # read a partially written file
+        temp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+        with open(temp_path, 'wb') as handler:
+            pickle.dump((stored_at, scoped_key, obj), handler)
+        os.rename(temp_path, path)
+
+    def invalidate(self, key, scope='session', stale=False):
+        """Forget the object of ``key`` on ``scope``.
+
+        :param bool stale: Count the object as found not to exist anymore.
+        """
+        scoped_key = self._scoped_key(key, scope)
+        with self._lock:
+            self._entries.pop(scoped_key, None)
+            if stale:
+                self._count(key, 'stale')
+        cache_dir = self._get_cache_dir() if scope == 'session' else None
+        if cache_dir:
+            try:
+                os.remove(self._get_path(cache_dir, scoped_key))
+            except OSError:
+                pass
+
+    def end_module(self, module=None):
+        """Forget the objects of the ``module`` scope and start keeping the
+        ones of ``module``.
+        """
+        with self._lock:
+            for scoped_key in [scoped_key for scoped_key in self._entries
+                               if scoped_key[0] == 'module']:
+                del self._entries[scoped_key]
+            self.module = module
+
+    def clear(self):
+        """Forget all the objects kept by this process and the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+            self.module = None
+
+    def remove_files(self):
+        """Remove the session objects of the namespace from the cache
+        directory, once no process uses them anymore.
+        """
+        cache_dir = self._get_cache_dir()
+        if cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def stats(self):
+        """Return the hits, misses, stale, expired and evicted objects of
+        each factory and of all of them under the ``total`` key.
+
+        :rtype: dict
+        """
+        with self._lock:
+            stats = dict(
+                (name, dict(values)) for name, values in self._stats.items())
+        total = {}
+        for values in stats.values():
+            for stat, value in values.items():
+                total[stat] = total.get(stat, 0) + value
+        stats['total'] = total
+        for values in stats.values():
+            reads = values.get('hits', 0) + values.get('misses', 0)
+            values['hit-ratio'] = (
+                float(values.get('hits', 0)) / reads if reads else None)
+        return stats
+
+    def log_stats(self):
+        """Log the statistics of each factory."""
+        stats = self.stats()
+        for name in sorted(stats, key=lambda name: (name == 'total', name)):
+            values = stats[name]
+            if values['hit-ratio'] is None:
+                continue
+            LOGGER.info(
+                'object cache %s: %d hits, %d misses, %d stale, %d expired, '
+                '%d evictions, %.1f%% hit ratio', name, values['hits'],
+                values['misses'], values['stale'], values['expired'],
+                values['evictions'], values['hit-ratio'] * 100)
+
+
+#: The :class:`ObjectCache` used by the :func:`cacheable` factories.
+OBJECT_CACHE = ObjectCache()
+
+
+def _normalize_options(options):
+    """Return a hashable representation of the factory ``options``.
+
+    ``None`` values are dropped, as the factories use their defaults for
+    them, and scalars are compared as text, as they are passed to hammer.
+    """
+    if isinstance(options, dict):
+        return tuple(sorted(
+            (six.text_type(key), _normalize_options(value))
+            for key, value in options.items()
+            if value is not None
+        ))
+    if isinstance(options, (list, tuple, set, frozenset)):
+        return tuple(_normalize_options(value) for value in options)
+    if options is None or isinstance(options, bool):
+        return options
+    return six.text_type(options)
+
+
+def cacheable(func=None, validate=None):
+    """Decorator that makes an optional object cache available.
+
+    The decorated factory gets a ``cached`` argument. When it is ``True``, or
+    the name of a scope, the object made is kept on :data:`OBJECT_CACHE`,
+    keyed by factory and options, and returned again to the following calls
+    with the same options. ``True`` uses the scope of the
+    ``object_cache_scope`` setting, ``session`` by default::
+
+        org = make_org(cached=True)
+        env = make_lifecycle_environment(
+            {'organization-id': org['id']}, cached='module')
+
+    :param validate: Optional function called with a cached object and the
+        options before returning it, which returns ``False`` if the object
+        does not exist anymore and has to be made again.
+    """
+    if func is None:
+        return lambda func: cacheable(func, validate=validate)
 
     @wraps(func)
     def cacheable_function(options=None, cached=False):
@@ -159,12 +453,22 @@ def cacheable(func):
         This is the function being returned.
         Requires input function's name start with 'make_'
         """
-        object_key = func.__name__.replace('make_', '')
-        if cached is True and object_key in OBJECT_CACHE:
-            return OBJECT_CACHE[object_key]
-        new_object = func(options)
+        if not cached:
+            return func(options)
+        scope = cached
         if cached is True:
-            OBJECT_CACHE[object_key] = new_object
+            scope = settings.object_cache_scope or 'session'
+        key = (
+            func.__name__.replace('make_', ''),
+            _normalize_options(options),
+        )
+        found, obj = OBJECT_CACHE.get(key, scope)
+        if found:
+            if validate is None or validate(obj, options):
+                return obj
+            OBJECT_CACHE.invalidate(key, scope, stale=True)
+        new_object = func(options)
+        OBJECT_CACHE.set(key, new_object, scope)
         return new_object
 
     return cacheable_function
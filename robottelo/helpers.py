@@ -1,13 +1,18 @@
 # -*- encoding: utf-8 -*-
 """Several helper methods and functions."""
 import contextlib
+import functools
+import hashlib
 import logging
 import os
 import random
 import re
 import requests
 import six
+import threading
+import time
 
+from six.moves import cPickle as pickle
 from tempfile import mkstemp
 from nailgun.config import ServerConfig
 from robottelo import ssh
@@ -71,6 +76,166 @@ class ServerFileDownloader(object):
 download_server_file = ServerFileDownloader()
 
 
+class ServerFactsCache(object):
+    """Thread-safe cache of facts queried from remote hosts.
+
+    Values are keyed by ``(hostname, query)`` and expire ``ttl`` seconds after
+    being stored. When ``cache_dir`` is set, the values are also written to
+    that directory so processes sharing it, like pytest-xdist workers, query
+    the hosts only once. Both default to the ``server_facts_ttl`` and
+    ``server_facts_cache_dir`` settings of the ``[robottelo]`` section.
+
+    Call :meth:`invalidate` when a fact is known to have changed, for example
+    after upgrading the server.
+
+    :param int ttl: Number of seconds a value is valid for.
+    :param str cache_dir: Directory to share the values with other processes.
+    """
+
+    #: Number of seconds a value is valid for when ``ttl`` is not set
+    default_ttl = 3600
+
+    def __init__(self, ttl=None, cache_dir=None):
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _get_ttl(self):
+        """Return the ttl to use falling back to the settings."""
+        if self.ttl is not None:
+            return self.ttl
+        return settings.server_facts_ttl or self.default_ttl
+
+    def _get_cache_dir(self):
+        """Return the directory shared with other processes or ``None``."""
+        return self.cache_dir or settings.server_facts_cache_dir
+
+    @staticmethod
+    def _get_path(cache_dir, key):
+        """Return the path of the file storing ``key`` on ``cache_dir``."""
+        name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(cache_dir, '{0}.pickle'.format(name))
+
+    @staticmethod
+    def _read_file(path):
+        """Return the ``(stored_at, key, value)`` stored at ``path`` or
+        ``None`` if it can't be read.
+        """
+        try:
+            with open(path, 'rb') as handler:
+                return pickle.load(handler)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def get(self, hostname, query):
+        """Return a ``(found, value)`` tuple for the fact ``query`` of
+        ``hostname``.
+        """
+        key = (hostname, query)
+        now = time.time()
+        ttl = self._get_ttl()
+        with self._lock:
+            entry = self._values.get(key)
+        if entry is None:
+            cache_dir = self._get_cache_dir()
+            if cache_dir:
+                stored = self._read_file(self._get_path(cache_dir, key))
+                if stored is not None and stored[1] == key:
+                    entry = (stored[0], stored[2])
+        if entry is None or now - entry[0] > ttl:
+            return False, None
+        with self._lock:
+            self._values[key] = entry
+        return True, entry[1]
+
+    def set(self, hostname, query, value):
+        """Store ``value`` as the fact ``query`` of ``hostname``."""
+        key = (hostname, query)
+        stored_at = time.time()
+        with self._lock:
+            self._values[key] = (stored_at, value)
+        cache_dir = self._get_cache_dir()
+        if cache_dir:
+            if not os.path.isdir(cache_dir):
+                try:
+                    os.makedirs(cache_dir)
+                except OSError:  # pragma: no cover
+                    # Created by another process in the meantime
+                    pass
+            path = self._get_path(cache_dir, key)
+            # Write to a temporary file and rename it so other processes
+            # never read a partially written file
+            temp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+            with open(temp_path, 'wb') as handler:
+                pickle.dump((stored_at, key, value), handler)
+            os.rename(temp_path, path)
+
+    def invalidate(self, hostname=None, query=None):
+        """Forget the cached facts matching ``hostname`` and ``query``.
+
+        ``None`` matches any hostname or query, so calling it without
+        arguments forgets everything.
+        """
+        def matches(key):
+            return (
+                (hostname is None or key[0] == hostname) and
+                (query is None or key[1] == query)
+            )
+
+        with self._lock:
+            for key in [key for key in self._values if matches(key)]:
+                del self._values[key]
+        cache_dir = self._get_cache_dir()
+        if not cache_dir or not os.path.isdir(cache_dir):
+            return
+        for name in os.listdir(cache_dir):
+            if not name.endswith('.pickle'):
+                continue
+            path = os.path.join(cache_dir, name)
+            stored = self._read_file(path)
+            if stored is None or matches(stored[1]):
+                try:
+                    os.remove(path)
+                except OSError:  # pragma: no cover
+                    pass
+
+    def clear(self):
+        """Forget all the cached facts."""
+        self.invalidate()
+
+
+#: The :class:`ServerFactsCache` used by the functions decorated with
+#: :func:`server_fact`.
+server_facts = ServerFactsCache()
+
+
+def server_fact(func):
+    """Cache the return value of ``func`` on :data:`server_facts`.
+
+    ``func`` must accept only an optional ``hostname`` argument, defaulting to
+    the configured server. Exceptions are not cached. The decorated function
+    exposes the original function as ``__wrapped__`` and a ``cache_clear``
+    function which invalidates its cached values for all the hosts.
+    """
+    query = '{0}.{1}'.format(func.__module__, func.__name__)
+
+    @functools.wraps(func)
+    def wrapper(hostname=None):
+        key_hostname = hostname or settings.server.hostname
+        found, value = server_facts.get(key_hostname, query)
+        if not found:
+            value = func() if hostname is None else func(hostname)
+            server_facts.set(key_hostname, query, value)
+        return value
+
+    wrapper.__wrapped__ = func
+    wrapper.cache_clear = functools.partial(
+        server_facts.invalidate, query=query)
+    return wrapper
+
+
+@server_fact
 def get_server_software():
     """Figure out which product distribution is installed on the server.
 
@@ -83,6 +248,7 @@ def get_server_software():
     return 'upstream'
 
 
+@server_fact
 def get_server_version():
     """Read Satellite version.
 
@@ -102,6 +268,7 @@ def get_server_version():
     return result
 
 
+@server_fact
 def get_host_info(hostname=None):
     """Get remote host's distribution information
 
@@ -201,20 +368,15 @@ def install_katello_ca(hostname=None):
         :raises: AssertionError: If katello-ca wasn't installed.
 
         """
-        ssh.command(
+        # Not checking the return_code of the install, as rpm could be
+        # installed before and installation may fail
+        results = ssh.command_batch([
             u'rpm -Uvh {0}'.format(settings.server.get_cert_rpm_url()),
-            hostname
-        )
-        # Not checking the return_code here, as rpm could be installed before
-        # and installation may fail
-        result = ssh.command(
-            u'rpm -q katello-ca-consumer-{0}'
-            .format(settings.server.hostname),
-            hostname
-        )
+            u'rpm -q katello-ca-consumer-{0}'.format(settings.server.hostname),
+        ], hostname)
         # Checking the return_code here to verify katello-ca rpm is actually
         # present in the system
-        if result.return_code != 0:
+        if results[-1].return_code != 0:
             raise AssertionError('Failed to install the katello-ca rpm')
 
 
@@ -227,20 +389,15 @@ def remove_katello_ca(hostname=None):
         :raises: AssertionError: If katello-ca wasn't removed.
 
         """
-        # Not checking the return_code here, as rpm can be not even installed
-        # and deleting may fail
-        ssh.command(
+        # Not checking the return_code of the erase, as rpm can be not even
+        # installed and deleting may fail
+        results = ssh.command_batch([
             'yum erase -y $(rpm -qa |grep katello-ca-consumer)',
-            hostname
-        )
+            'rpm -q katello-ca-consumer-{0}'.format(settings.server.hostname),
+        ], hostname)
         # Checking the return_code here to verify katello-ca rpm is actually
         # not present in the system
-        result = ssh.command(
-            'rpm -q katello-ca-consumer-{0}'
-            .format(settings.server.hostname),
-            hostname
-        )
-        if result.return_code == 0:
+        if results[-1].return_code == 0:
             raise AssertionError('Failed to remove the katello-ca rpm')
         # Resetting rhsm.conf to point to cdn
         rhsm_updates = [
@@ -249,13 +406,14 @@ def remove_katello_ca(hostname=None):
             's|^baseurl.*|baseurl=https://cdn.redhat.com|',
             's/^repo_ca_cert.*/repo_ca_cert=%(ca_cert_dir)sredhat-uep.pem/',
         ]
-        for command in rhsm_updates:
-            result = ssh.command(
-                'sed -i -e "{0}" /etc/rhsm/rhsm.conf'.format(command),
-                hostname
-            )
-            if result.return_code != 0:
-                raise AssertionError('Failed to reset the rhsm.conf')
+        results = ssh.command_batch(
+            ['sed -i -e "{0}" /etc/rhsm/rhsm.conf'.format(command)
+             for command in rhsm_updates],
+            hostname,
+            stop_on_failure=True
+        )
+        if results[-1].return_code != 0:
+            raise AssertionError('Failed to reset the rhsm.conf')
 
 
 def add_remote_execution_ssh_key(hostname, key_path=None, **kwargs):
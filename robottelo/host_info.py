@@ -2,13 +2,13 @@
 import logging
 
 import re
-from robottelo.helpers import lru_cache
+from robottelo.helpers import server_fact
 
 from robottelo import ssh
 LOGGER = logging.getLogger(__name__)
 
 
-@lru_cache(maxsize=1)
+@server_fact
 def get_host_os_version():
     """Fetchs host's OS version through SSH
     :return: str with version
@@ -36,7 +36,7 @@ _SAT_6_1_VERSION_COMMAND = (
 )
 
 
-@lru_cache(maxsize=1)
+@server_fact
 def get_host_sat_version():
     """Fetchs host's Satellite version through SSH
     :return: Satellite version
@@ -1,45 +1,174 @@
 """Utility module to handle the shared ssh connection."""
+import atexit
 import base64
+import codecs
+import hashlib
 import logging
 import os
 import paramiko
 import re
 import six
+import threading
+import time
+import uuid
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from robottelo.cli import hammer
 from robottelo.config import settings
+from robottelo.ssh_metrics import metrics
+from six.moves import shlex_quote
 
 logger = logging.getLogger(__name__)
 
+# Escape codes for colors displayed in the output
+_COLOR_CODES_REGEX = re.compile(r'\x1b\[\d\d?m')
+
+# Seconds to wait before polling a streaming channel again when no data is
+# available
+_STREAM_POLL_INTERVAL = 0.01
+
 
 def decode_to_utf8(text):  # pragma: no cover
-    """In python 3 all strings are already unicode, no need to decode"""
-    if six.PY2:
+    """Paramiko returns bytes, decode them to a unicode string. Already
+    decoded strings are returned as is.
+    """
+    if isinstance(text, six.binary_type):
         return text.decode('utf-8')
     return text
 
 
+# Marks the lazily computed attributes of SSHCommandResult not computed yet
+_NOT_COMPUTED = object()
+
+
+def _clean_stdout(stdout, output_format=None):
+    """Decode and clean up the stdout of a command read from the channel."""
+    if stdout:
+        # Convert to unicode string
+        stdout = decode_to_utf8(stdout)
+    # we don't want a list as output of 'plain' just pure text
+    if stdout and output_format not in ('json', 'plain'):
+        # Mostly only for hammer commands
+        # for output we don't really want to see all of Rails traffic
+        # information, so strip it out.
+        # Empty fields are returned as "" which gives us u'""'
+        stdout = stdout.replace('""', '')
+        lines = [
+            line for line in stdout.split('\n') if not line.startswith('[')
+        ]
+        # Only run the color codes regex when the output has any
+        if u'\x1b' in stdout:
+            lines = [_COLOR_CODES_REGEX.sub('', line) for line in lines]
+        stdout = lines
+    return stdout
+
+
+def _clean_stderr(stderr):
+    """Decode the stderr of a command read from the channel and remove all
+    color codes characters.
+    """
+    if stderr:
+        stderr = _COLOR_CODES_REGEX.sub('', decode_to_utf8(stderr))
+    return stderr
+
+
 class SSHCommandResult(object):
-    """Structure that returns in all ssh commands results."""
+    """Structure that returns in all ssh commands results.
+
+    ``stdout`` is parsed according to ``output_format`` only when it is first
+    accessed and the parsed value is kept, so callers checking only
+    ``return_code`` don't pay for the parsing.
+
+    Results built by :meth:`from_channel_output` keep the command output as
+    read from the channel, available as ``raw_stdout`` and ``raw_stderr``,
+    and also decode and clean it up lazily.
+    """
+
+    __slots__ = (
+        'return_code',
+        'output_format',
+        '_raw_stdout',
+        '_raw_stderr',
+        '_stdout',
+        '_stderr',
+        '_from_channel',
+    )
 
     def __init__(
             self, stdout=None, stderr=None, return_code=0, output_format=None):
-        self.stdout = stdout
-        self.stderr = stderr
         self.return_code = return_code
         self.output_format = output_format
-        #  Does not make sense to return suspicious output if ($? <> 0)
-        if output_format and self.return_code == 0:
-            if output_format == 'csv':
-                self.stdout = hammer.parse_csv(stdout) if stdout else {}
-            if output_format == 'json':
-                self.stdout = hammer.parse_json(stdout) if stdout else None
+        self._raw_stdout = stdout
+        self._raw_stderr = stderr
+        self._stdout = _NOT_COMPUTED
+        self._stderr = _NOT_COMPUTED
+        self._from_channel = False
+
+    @classmethod
+    def from_channel_output(
+            cls, stdout, stderr, return_code, output_format=None):
+        """Build a result from the raw output of a command as read from the
+        channel.
+        """
+        result = cls(stdout, stderr, return_code, output_format)
+        result._from_channel = True
+        return result
+
+    @property
+    def raw_stdout(self):
+        """The command stdout before being cleaned up and parsed."""
+        return self._raw_stdout
+
+    @property
+    def raw_stderr(self):
+        """The command stderr before being cleaned up."""
+        return self._raw_stderr
+
+    @property
+    def stdout(self):
+        """The command stdout, parsed according to ``output_format``."""
+        if self._stdout is _NOT_COMPUTED:
+            stdout = self._raw_stdout
+            if self._from_channel:
+                stdout = _clean_stdout(stdout, self.output_format)
+            #  Does not make sense to return suspicious output if ($? <> 0)
+            if self.output_format and self.return_code == 0:
+                if self.output_format == 'csv':
+                    stdout = hammer.parse_csv(stdout) if stdout else {}
+                if self.output_format == 'json':
+                    stdout = hammer.parse_json(stdout) if stdout else None
+            self._stdout = stdout
+        return self._stdout
+
+    @stdout.setter
+    def stdout(self, value):
+        self._stdout = value
+
+    @property
+    def stderr(self):
+        """The command stderr."""
+        if self._stderr is _NOT_COMPUTED:
+            stderr = self._raw_stderr
+            if self._from_channel:
+                stderr = _clean_stderr(stderr)
+            self._stderr = stderr
+        return self._stderr
+
+    @stderr.setter
+    def stderr(self, value):
+        self._stderr = value
 
     def __repr__(self):
         tmpl = u'SSHCommandResult(stdout={stdout!r}, stderr={stderr!r}, ' + \
                u'return_code={return_code!r}, output_format={output_format!r})'
-        return tmpl.format(**self.__dict__)
+        return tmpl.format(
+            stdout=self.stdout,
+            stderr=self.stderr,
+            return_code=self.return_code,
+            output_format=self.output_format,
+        )
 
 
 def _call_paramiko_sshclient():  # pragma: no cover
@@ -53,6 +182,48 @@ def _call_paramiko_sshclient():  # pragma: no cover
     return paramiko.SSHClient()
 
 
+def _resolve_connection_args(hostname=None, username=None, password=None,
+                             key_filename=None):
+    """Fill the missing connection arguments with the values from the
+    ``server`` section of the configuration file.
+
+    :return: A tuple in the form ``(hostname, username, password,
+        key_filename)``.
+    """
+    if hostname is None:
+        hostname = settings.server.hostname
+    if username is None:
+        username = settings.server.ssh_username
+    if key_filename is None:
+        key_filename = settings.server.ssh_key
+    if password is None:
+        password = settings.server.ssh_password
+    return hostname, username, password, key_filename
+
+
+def _connect(hostname=None, username=None, password=None, key_filename=None,
+             timeout=10):
+    """Create and return a new connected ``paramiko.SSHClient``.
+
+    Missing arguments fall-back to server configuration in the configuration
+    file. See :func:`get_connection` for the arguments description.
+    """
+    hostname, username, password, key_filename = _resolve_connection_args(
+        hostname, username, password, key_filename)
+    client = _call_paramiko_sshclient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    start = time.time()
+    client.connect(
+        hostname=hostname,
+        username=username,
+        key_filename=key_filename,
+        password=password,
+        timeout=timeout
+    )
+    metrics.record_connect(hostname, time.time() - start)
+    return client
+
+
 @contextmanager
 def get_connection(hostname=None, username=None, password=None,
                    key_filename=None, timeout=10):
@@ -68,6 +239,10 @@ def get_connection(hostname=None, username=None, password=None,
         with get_connection() as connection:
             ...
 
+    This connection is not shared with anybody else, use
+    :meth:`SSHConnectionPool.connection` through :data:`connection_pool` in
+    order to reuse already established connections.
+
     :param str hostname: The hostname of the server to establish connection. If
         it is ``None`` ``hostname`` from configuration's ``server`` section
         will be used.
@@ -87,22 +262,7 @@ def get_connection(hostname=None, username=None, password=None,
     """
     if hostname is None:
         hostname = settings.server.hostname
-    if username is None:
-        username = settings.server.ssh_username
-    if key_filename is None:
-        key_filename = settings.server.ssh_key
-    if password is None:
-        password = settings.server.ssh_password
-
-    client = _call_paramiko_sshclient()
-    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    client.connect(
-        hostname=hostname,
-        username=username,
-        key_filename=key_filename,
-        password=password,
-        timeout=timeout
-    )
+    client = _connect(hostname, username, password, key_filename, timeout)
     client_id = hex(id(client))
     try:
         logger.info('Instantiated Paramiko client {0}'.format(client_id))
@@ -114,6 +274,164 @@ def get_connection(hostname=None, username=None, password=None,
         logger.info('Destroyed Paramiko client {0}'.format(client_id))
 
 
+class SSHConnectionPool(object):
+    """Thread-safe pool of authenticated ssh connections.
+
+    Connections are keyed by ``(hostname, username, key_filename)`` and are
+    handed to a single caller at a time. When the caller is done the
+    connection goes back to the pool and can be reused by the next caller
+    asking for the same key, saving the TCP, key exchange and authentication
+    handshakes::
+
+        with connection_pool.connection(hostname='example.com') as connection:
+            execute_command('ls', connection)
+
+    Idle connections are closed when they are not used for more than
+    ``max_idle_time`` seconds, when they are found dead by the health check or
+    when the pool already holds ``max_size`` idle connections, in which case
+    the least recently used one is evicted.
+
+    :param int max_size: Maximum number of idle connections kept by the pool.
+        ``0`` disables the connection reuse.
+    :param int max_idle_time: Number of seconds an idle connection can be kept
+        on the pool.
+    """
+
+    def __init__(self, max_size=10, max_idle_time=300):
+        self.max_size = max_size
+        self.max_idle_time = max_idle_time
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._idle = []  # (key, client, released_at), most recent last
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _is_alive(client):
+        """Health check an idle connection."""
+        transport = client.get_transport()
+        return transport is not None and transport.is_active()
+
+    @staticmethod
+    def _close(client):
+        """Close a connection ignoring any error raised on closing."""
+        client_id = hex(id(client))
+        logger.info('Destroying Paramiko client {0}'.format(client_id))
+        try:
+            client.close()
+        except Exception as err:  # pragma: no cover
+            logger.debug(
+                'Error closing Paramiko client %s: %s', client_id, err)
+
+    def _expire(self, now):
+        """Remove from the idle list the connections idle for too long.
+
+        Must be called holding the lock. Return the removed connections so
+        they can be closed after releasing the lock.
+        """
+        expired = [
+            entry for entry in self._idle
+            if now - entry[2] > self.max_idle_time
+        ]
+        if expired:
+            self._idle = [
+                entry for entry in self._idle if entry not in expired]
+            self.evictions += len(expired)
+        return [client for _, client, _ in expired]
+
+    def _acquire(self, key):
+        """Return an idle healthy connection for ``key`` or ``None``."""
+        while True:
+            with self._lock:
+                to_close = self._expire(time.time())
+                client = None
+                for index in range(len(self._idle) - 1, -1, -1):
+                    if self._idle[index][0] == key:
+                        client = self._idle.pop(index)[1]
+                        break
+            for expired in to_close:
+                self._close(expired)
+            if client is None:
+                return None
+            if self._is_alive(client):
+                return client
+            logger.debug('Discarding dead Paramiko client %s', hex(id(client)))
+            with self._lock:
+                self.evictions += 1
+            self._close(client)
+
+    def _release(self, key, client):
+        """Put ``client`` back on the pool evicting connections if needed."""
+        with self._lock:
+            to_close = self._expire(time.time())
+            self._idle.append((key, client, time.time()))
+            while len(self._idle) > self.max_size:
+                to_close.append(self._idle.pop(0)[1])
+                self.evictions += 1
+        for evicted in to_close:
+            self._close(evicted)
+
+    @contextmanager
+    def connection(self, hostname=None, username=None, password=None,
+                   key_filename=None, timeout=10):
+        """Yield a pooled ssh connection.
+
+        Accept the same arguments as :func:`get_connection`. A new connection
+        is established only if there is no idle connection available for the
+        ``(hostname, username, key_filename)`` key. If the caller raises an
+        exception while using the connection, the connection is closed
+        instead of going back to the pool.
+        """
+        hostname, username, password, key_filename = _resolve_connection_args(
+            hostname, username, password, key_filename)
+        key = (hostname, username, key_filename)
+        client = self._acquire(key)
+        if client is None:
+            with self._lock:
+                self.misses += 1
+            client = _connect(
+                hostname, username, password, key_filename, timeout)
+            logger.info(
+                'Instantiated Paramiko client {0}'.format(hex(id(client))))
+            logger.debug('Connected to [%s]', hostname)
+        else:
+            with self._lock:
+                self.hits += 1
+        reusable = False
+        try:
+            yield client
+            reusable = True
+        finally:
+            if reusable:
+                self._release(key, client)
+            else:
+                self._close(client)
+
+    def clear(self):
+        """Close all idle connections."""
+        with self._lock:
+            to_close = [client for _, client, _ in self._idle]
+            self._idle = []
+        for client in to_close:
+            self._close(client)
+
+    def stats(self):
+        """Return a dictionary with the pool counters."""
+        with self._lock:
+            return {
+                u'hits': self.hits,
+                u'misses': self.misses,
+                u'evictions': self.evictions,
+                u'idle': len(self._idle),
+            }
+
+
+#: The :class:`SSHConnectionPool` used by :func:`command` and the other
+#: helpers running commands.
+connection_pool = SSHConnectionPool()
+atexit.register(connection_pool.clear)
+
+
 def add_authorized_key(key, hostname=None, username=None, password=None,
                        key_filename=None, timeout=10):
     """Appends a local public ssh key to remote authorized keys
@@ -172,47 +490,401 @@ def add_authorized_key(key, hostname=None, username=None, password=None,
         execute_command(cmd, con)
 
 
+class SFTPTransferResult(object):
+    """Summary of a file transferred by :class:`SFTPTransferEngine`.
+
+    ``skipped`` is ``True`` when the upload was not done because the remote
+    file already had the same content.
+    """
+
+    def __init__(self, source, destination, size, elapsed, skipped=False):
+        self.source = source
+        self.destination = destination
+        self.size = size
+        self.elapsed = elapsed
+        self.skipped = skipped
+
+    @property
+    def throughput(self):
+        """Transfer rate in megabytes per second."""
+        if self.skipped or not self.elapsed:
+            return 0.0
+        return self.size / self.elapsed / 1024.0 / 1024.0
+
+    def __repr__(self):
+        return (
+            u'SFTPTransferResult(source={0!r}, destination={1!r}, size={2}, '
+            u'elapsed={3:.3f}, skipped={4})'.format(
+                self.source, self.destination, self.size, self.elapsed,
+                self.skipped)
+        )
+
+
+def _local_size(local_file):
+    """Return the size of a local file path or seekable file-like object
+    from its current position.
+    """
+    if not hasattr(local_file, 'read'):
+        return os.path.getsize(local_file)
+    position = local_file.tell()
+    local_file.seek(0, os.SEEK_END)
+    size = local_file.tell() - position
+    local_file.seek(position)
+    return size
+
+
+def _local_sha256(local_file, buffer_size):
+    """Return the sha256 hex digest of a local file path or file-like object.
+
+    File-like objects are read from their current position which is restored
+    afterwards.
+    """
+    digest = hashlib.sha256()
+    if hasattr(local_file, 'read'):
+        position = local_file.tell()
+        for chunk in iter(lambda: local_file.read(buffer_size), b''):
+            digest.update(chunk)
+        local_file.seek(position)
+    else:
+        with open(local_file, 'rb') as handler:
+            for chunk in iter(lambda: handler.read(buffer_size), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SFTPTransferEngine(object):
+    """Thread-safe file transfer engine keeping SFTP sessions open.
+
+    A dedicated connection is kept per ``(hostname, username, key_filename)``
+    and the SFTP sessions opened on it are reused by the following transfers
+    to the same host. Parallel transfers, through :meth:`upload_many` and
+    :meth:`download_many`, open one SFTP session per worker on the same
+    connection::
+
+        results = sftp_engine.upload_many(
+            [('manifest.zip', '/tmp/manifest.zip'),
+             ('module.tar.gz', '/tmp/module.tar.gz')],
+            hostname='example.com'
+        )
+        for result in results:
+            print(result.throughput)
+
+    Uploads are written with pipelining and downloads use prefetching, both
+    reading and writing ``buffer_size`` bytes at a time. When ``dedupe`` is
+    enabled an upload of at least ``dedupe_min_size`` bytes is skipped if the
+    sha256 of the remote file matches the local one. Smaller files are always
+    uploaded as checking them costs about the same as sending them.
+
+    :param int buffer_size: Number of bytes read and written at a time.
+    :param int window_size: SSH channel window size of the SFTP sessions.
+    :param int max_packet_size: SSH max packet size of the SFTP sessions.
+    :param int max_workers: Default number of parallel transfers.
+    :param bool dedupe: Whether uploads check the remote sha256 by default.
+    :param int dedupe_min_size: Minimum size in bytes of the files checked for
+        dedupe.
+    """
+
+    def __init__(self, buffer_size=262144, window_size=16777216,
+                 max_packet_size=32768, max_workers=4, dedupe=True,
+                 dedupe_min_size=1048576):
+        self.buffer_size = buffer_size
+        self.window_size = window_size
+        self.max_packet_size = max_packet_size
+        self.max_workers = max_workers
+        self.dedupe = dedupe
+        self.dedupe_min_size = dedupe_min_size
+        self._connections = {}
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _get_connection(self, key, password, timeout):
+        """Return the live connection for ``key`` connecting if needed.
+
+        The connection is made without holding the lock so a slow host does
+        not hold up the transfers to the other ones. If another thread
+        connected to the same host meanwhile its connection is kept and the
+        new one closed.
+        """
+        with self._lock:
+            client = self._connections.get(key)
+            if client is not None and not SSHConnectionPool._is_alive(client):
+                SSHConnectionPool._close(client)
+                del self._connections[key]
+                self._idle.pop(key, None)
+                client = None
+        if client is not None:
+            return client
+        hostname, username, key_filename = key
+        new_client = _connect(
+            hostname, username, password, key_filename, timeout)
+        with self._lock:
+            client = self._connections.get(key)
+            if client is None or not SSHConnectionPool._is_alive(client):
+                self._connections[key] = new_client
+                return new_client
+        SSHConnectionPool._close(new_client)
+        return client
+
+    @contextmanager
+    def sftp(self, hostname=None, username=None, password=None,
+             key_filename=None, timeout=10):
+        """Yield a ``(connection, sftp)`` tuple for a host.
+
+        The SFTP session is used by a single caller at a time and is kept open
+        for the next caller once it is done.
+        """
+        hostname, username, password, key_filename = _resolve_connection_args(
+            hostname, username, password, key_filename)
+        key = (hostname, username, key_filename)
+        client = self._get_connection(key, password, timeout)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            sftp = None
+            while idle and sftp is None:
+                sftp = idle.pop()
+                if sftp.sock.closed:
+                    sftp = None
+        if sftp is None:
+            sftp = paramiko.SFTPClient.from_transport(
+                client.get_transport(),
+                window_size=self.window_size,
+                max_packet_size=self.max_packet_size,
+            )
+        reusable = False
+        try:
+            yield client, sftp
+            reusable = True
+        finally:
+            with self._lock:
+                if reusable and self._connections.get(key) is client:
+                    self._idle.setdefault(key, []).append(sftp)
+                else:
+                    sftp.close()
+
+    def _remote_sha256(self, connection, remote_file):
+        """Return the sha256 hex digest of a remote file or ``None`` if it
+        could not be computed.
+        """
+        result = _run_command(
+            u'sha256sum {0}'.format(shlex_quote(remote_file)), connection)
+        if result.return_code != 0 or not result.stdout:
+            return None
+        return result.stdout[0].split(u' ', 1)[0]
+
+    def upload(self, local_file, remote_file, hostname=None, dedupe=None,
+               **kwargs):
+        """Upload a local file to a remote machine.
+
+        :param local_file: either a file path or a file-like object to be
+            uploaded.
+        :param str remote_file: a remote file path where the uploaded file will
+            be placed.
+        :param str hostname: target machine hostname. If not provided will be
+            used the ``server.hostname`` from the configuration.
+        :param bool dedupe: Skip the upload if the remote file already has the
+            same sha256. If ``None`` the engine's ``dedupe`` is used.
+        :param kwargs: ``username``, ``password``, ``key_filename`` and
+            ``timeout`` to connect to the host, see :func:`command`.
+        :return: The transfer summary.
+        :rtype: SFTPTransferResult
+        """
+        if dedupe is None:
+            dedupe = self.dedupe
+        is_file_obj = hasattr(local_file, 'read')
+        if is_file_obj and dedupe:
+            # Hashing needs to read the object twice
+            dedupe = all(
+                hasattr(local_file, attr) for attr in ('seek', 'tell'))
+        if dedupe:
+            size = _local_size(local_file)
+            dedupe = size >= self.dedupe_min_size
+        start = time.time()
+        with self.sftp(hostname=hostname, **kwargs) as (connection, sftp):
+            if dedupe:
+                local_digest = _local_sha256(local_file, self.buffer_size)
+                if local_digest == self._remote_sha256(
+                        connection, remote_file):
+                    result = SFTPTransferResult(
+                        local_file, remote_file, size, time.time() - start,
+                        skipped=True
+                    )
+                    logger.debug(
+                        'Skipped upload of %s to %s, same sha256 %s',
+                        local_file, remote_file, local_digest
+                    )
+                    return result
+            if is_file_obj:
+                size = self._write(local_file, sftp, remote_file)
+            else:
+                with open(local_file, 'rb') as handler:
+                    size = self._write(handler, sftp, remote_file)
+        result = SFTPTransferResult(
+            local_file, remote_file, size, time.time() - start)
+        logger.debug(
+            'Uploaded %s to %s: %d bytes in %.3fs, %.2f MB/s', local_file,
+            remote_file, size, result.elapsed, result.throughput
+        )
+        return result
+
+    def _write(self, handler, sftp, remote_file):
+        """Write the contents of ``handler`` to ``remote_file`` and return the
+        number of bytes written.
+        """
+        size = 0
+        with sftp.open(remote_file, 'wb', self.buffer_size) as remote:
+            remote.set_pipelined(True)
+            for chunk in iter(lambda: handler.read(self.buffer_size), b''):
+                remote.write(chunk)
+                size += len(chunk)
+        return size
+
+    def download(self, remote_file, local_file=None, hostname=None,
+                 **kwargs):
+        """Download a remote file to the local machine.
+
+        :param str remote_file: the remote file path to be downloaded.
+        :param local_file: either a file path or a file-like object to write
+            the downloaded contents. If ``None`` the ``remote_file`` path is
+            used.
+        :param str hostname: source machine hostname. If not provided will be
+            used the ``server.hostname`` from the configuration.
+        :param kwargs: ``username``, ``password``, ``key_filename`` and
+            ``timeout`` to connect to the host, see :func:`command`.
+        :return: The transfer summary.
+        :rtype: SFTPTransferResult
+        """
+        if local_file is None:
+            local_file = remote_file
+        start = time.time()
+        with self.sftp(hostname=hostname, **kwargs) as (_, sftp):
+            if hasattr(local_file, 'write'):
+                size = self._read(sftp, remote_file, local_file)
+            else:
+                with open(local_file, 'wb') as handler:
+                    size = self._read(sftp, remote_file, handler)
+        result = SFTPTransferResult(
+            remote_file, local_file, size, time.time() - start)
+        logger.debug(
+            'Downloaded %s to %s: %d bytes in %.3fs, %.2f MB/s', remote_file,
+            local_file, size, result.elapsed, result.throughput
+        )
+        return result
+
+    def _read(self, sftp, remote_file, handler):
+        """Write the contents of ``remote_file`` to ``handler`` and return the
+        number of bytes read.
+        """
+        size = 0
+        with sftp.open(remote_file, 'rb', self.buffer_size) as remote:
+            remote.prefetch(remote.stat().st_size)
+            for chunk in iter(lambda: remote.read(self.buffer_size), b''):
+                handler.write(chunk)
+                size += len(chunk)
+        return size
+
+    def _transfer_many(self, method, files, max_workers, **kwargs):
+        """Run ``method`` for each pair of files in parallel."""
+        files = list(files)
+        if not files:
+            return []
+        workers = min(max_workers or self.max_workers, len(files))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(method, source, destination, **kwargs)
+                for source, destination in files
+            ]
+            return [future.result() for future in futures]
+
+    def upload_many(self, files, hostname=None, max_workers=None, **kwargs):
+        """Upload several files to the same host in parallel.
+
+        :param files: iterable of ``(local_file, remote_file)`` tuples.
+        :param int max_workers: Number of parallel uploads. If ``None`` the
+            engine's ``max_workers`` is used.
+
+        See :meth:`upload` for the description of the other arguments.
+
+        :return: The :class:`SFTPTransferResult` of each file, in order.
+        :rtype: list
+        """
+        return self._transfer_many(
+            self.upload, files, max_workers, hostname=hostname, **kwargs)
+
+    def download_many(self, files, hostname=None, max_workers=None,
+                      **kwargs):
+        """Download several files from the same host in parallel.
+
+        :param files: iterable of ``(remote_file, local_file)`` tuples.
+        :param int max_workers: Number of parallel downloads. If ``None`` the
+            engine's ``max_workers`` is used.
+
+        See :meth:`download` for the description of the other arguments.
+
+        :return: The :class:`SFTPTransferResult` of each file, in order.
+        :rtype: list
+        """
+        return self._transfer_many(
+            self.download, files, max_workers, hostname=hostname, **kwargs)
+
+    def clear(self):
+        """Close all the SFTP sessions and their connections."""
+        with self._lock:
+            sessions = [
+                sftp for idle in self._idle.values() for sftp in idle]
+            connections = list(self._connections.values())
+            self._idle.clear()
+            self._connections.clear()
+        for sftp in sessions:
+            try:
+                sftp.close()
+            except Exception:  # pragma: no cover
+                pass
+        for client in connections:
+            SSHConnectionPool._close(client)
+
+
+#: The :class:`SFTPTransferEngine` used by :func:`upload_file` and
+#: :func:`download_file`.
+sftp_engine = SFTPTransferEngine()
+atexit.register(sftp_engine.clear)
+
+
 def upload_file(local_file, remote_file, hostname=None):
     """Upload a local file to a remote machine
 
+    The upload is done by :data:`sftp_engine`, skipping it if the remote file
+    already has the same content.
+
     :param local_file: either a file path or a file-like object to be uploaded.
     :param remote_file: a remote file path where the uploaded file will be
         placed.
     :param hostname: target machine hostname. If not provided will be used the
         ``server.hostname`` from the configuration.
+    :return: The transfer summary.
+    :rtype: SFTPTransferResult
     """
-    with get_connection(hostname=hostname) as connection:  # pragma: no cover
-        try:
-            sftp = connection.open_sftp()
-            # Check if local_file is a file-like object and use the proper
-            # paramiko function to upload it to the remote machine.
-            if hasattr(local_file, 'read'):
-                sftp.putfo(local_file, remote_file)
-            else:
-                sftp.put(local_file, remote_file)
-        finally:
-            sftp.close()
+    return sftp_engine.upload(local_file, remote_file, hostname=hostname)
 
 
 def download_file(remote_file, local_file=None, hostname=None):
     """Download a remote file to the local machine. If ``hostname`` is not
     provided will be used the server.
 
+    The download is done by :data:`sftp_engine`.
+
+    :return: The transfer summary.
+    :rtype: SFTPTransferResult
     """
-    if local_file is None:  # pragma: no cover
-        local_file = remote_file
-    with get_connection(hostname=hostname) as connection:  # pragma: no cover
-        try:
-            sftp = connection.open_sftp()
-            sftp.get(remote_file, local_file)
-        finally:
-            sftp.close()
+    return sftp_engine.download(remote_file, local_file, hostname=hostname)
 
 
 def command(cmd, hostname=None, output_format=None, username=None,
             password=None, key_filename=None, timeout=10):
     """Executes SSH command(s) on remote hostname.
 
+    The connection is taken from :data:`connection_pool`, so consecutive calls
+    for the same hostname and credentials reuse the same connection.
+
     :param str cmd: The command to run
     :param str output_format: json, csv or None
     :param str hostname: The hostname of the server to establish connection. If
@@ -229,9 +901,9 @@ def command(cmd, hostname=None, output_format=None, username=None,
     :param int timeout: Time to wait for establish the connection.
     """
     hostname = hostname or settings.server.hostname
-    with get_connection(hostname=hostname, username=username,
-                        password=password, key_filename=key_filename,
-                        timeout=timeout) as connection:
+    with connection_pool.connection(
+            hostname=hostname, username=username, password=password,
+            key_filename=key_filename, timeout=timeout) as connection:
         return execute_command(cmd, connection, output_format, timeout)
 
 
@@ -245,39 +917,469 @@ def execute_command(cmd, connection, output_format=None, timeout=120):
     :return: SSHCommandResult
     """
     logger.debug('>>> %s', cmd)
+    start = time.time()
     _, stdout, stderr = connection.exec_command(cmd, timeout)
 
     errorcode = stdout.channel.recv_exit_status()
+    elapsed = time.time() - start
 
     stdout = stdout.read()
     stderr = stderr.read()
-    # Remove escape code for colors displayed in the output
-    regex = re.compile(r'\x1b\[\d\d?m')
-    if stdout:
-        # Convert to unicode string
-        stdout = decode_to_utf8(stdout)
-        logger.debug('<<< stdout\n%s', stdout)
-    if stderr:
-        # Convert to unicode string and remove all color codes characters
-        stderr = regex.sub('', decode_to_utf8(stderr))
-        logger.debug('<<< stderr\n%s', stderr)
-    # we don't want a list as output of 'plain' just pure text
-    if stdout and output_format not in ('json', 'plain'):
-        # Mostly only for hammer commands
-        # for output we don't really want to see all of Rails traffic
-        # information, so strip it out.
-        # Empty fields are returned as "" which gives us u'""'
-        stdout = stdout.replace('""', '')
-        stdout = u''.join(stdout).split('\n')
-        stdout = [
-            regex.sub('', line)
-            for line in stdout
-            if not line.startswith('[')
-        ]
-    return SSHCommandResult(
+    metrics.record_command(cmd, elapsed, len(stdout), len(stderr))
+    return _build_result(stdout, stderr, errorcode, output_format)
+
+
+def _build_result(stdout, stderr, errorcode, output_format=None):
+    """Build the ``SSHCommandResult`` of a command raw output.
+
+    The output is decoded, cleaned up and parsed by the result only when it
+    is accessed.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        if stdout:
+            # Decode once for both the log and the result
+            stdout = decode_to_utf8(stdout)
+            logger.debug('<<< stdout\n%s', stdout)
+        if stderr:
+            stderr = decode_to_utf8(stderr)
+            logger.debug('<<< stderr\n%s', _clean_stderr(stderr))
+    return SSHCommandResult.from_channel_output(
         stdout, stderr, errorcode, output_format)
 
 
+class SSHMultiHostResult(OrderedDict):
+    """Ordered mapping of hostname to ``SSHCommandResult`` returned by
+    :func:`command_many`.
+
+    Besides the results, it holds ``elapsed``, a dictionary mapping each
+    hostname to the number of seconds its command took, and ``errors``, a
+    dictionary mapping the hostnames where the command could not be run to the
+    exception raised. The results for those hosts have ``return_code`` set to
+    ``-1`` and ``stderr`` set to the error message.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(SSHMultiHostResult, self).__init__(*args, **kwargs)
+        self.elapsed = {}
+        self.errors = {}
+
+    @property
+    def failed(self):
+        """List the hostnames where the command returned non-zero or could
+        not be run.
+        """
+        return [
+            hostname for hostname, result in self.items()
+            if result.return_code != 0
+        ]
+
+    @property
+    def succeeded(self):
+        """List the hostnames where the command returned zero."""
+        return [
+            hostname for hostname, result in self.items()
+            if result.return_code == 0
+        ]
+
+
+def _run_command(cmd, connection, output_format=None, timeout=None):
+    """Execute a command via ssh in the given connection.
+
+    Unlike :func:`execute_command` the output is read before waiting for the
+    exit status, so ``timeout`` is applied to every read on the channel and
+    ``socket.timeout`` is raised if the command does not output anything for
+    ``timeout`` seconds.
+    """
+    logger.debug('>>> %s', cmd)
+    start = time.time()
+    _, stdout, stderr = connection.exec_command(cmd, timeout=timeout)
+    stdout_data = stdout.read()
+    stderr_data = stderr.read()
+    errorcode = stdout.channel.recv_exit_status()
+    metrics.record_command(
+        cmd, time.time() - start, len(stdout_data), len(stderr_data))
+    return _build_result(stdout_data, stderr_data, errorcode, output_format)
+
+
+def command_many(cmd, hostnames, output_format=None, username=None,
+                 password=None, key_filename=None, timeout=10,
+                 command_timeout=None, max_workers=10):
+    """Executes SSH command(s) on several remote hosts at once.
+
+    The commands are run concurrently by a pool of at most ``max_workers``
+    threads, each using connections from :data:`connection_pool`. A failure on
+    a host, including a connection error or a timeout, does not interrupt the
+    other hosts::
+
+        results = command_many('subscription-manager clean', vm_ips)
+        for hostname in results.failed:
+            print(hostname, results[hostname].stderr)
+
+    :param cmd: The command to run on all hosts or a dictionary mapping each
+        hostname to the command to run on it.
+    :param hostnames: The hostnames where to run the command. The result keeps
+        this order.
+    :param str output_format: json, csv or None
+    :param str username: The username to use when connecting. If it is ``None``
+        ``ssh_username`` from configuration's ``server`` section will be used.
+    :param str password: The password to use when connecting. If it is ``None``
+        ``ssh_password`` from configuration's ``server`` section will be used.
+    :param str key_filename: The path of the ssh private key to use when
+        connecting. If it is ``None`` ``key_filename`` from configuration's
+        ``server`` section will be used.
+    :param int timeout: Time to wait for establish each connection.
+    :param int command_timeout: Time to wait for output of the command on each
+        host. ``None`` waits forever.
+    :param int max_workers: Maximum number of hosts handled at the same time.
+    :return: The results ordered as ``hostnames``.
+    :rtype: SSHMultiHostResult
+    """
+    hostnames = list(hostnames)
+    results = SSHMultiHostResult()
+    if not hostnames:
+        return results
+
+    def run(hostname):
+        """Run the command on ``hostname`` timing it."""
+        host_cmd = cmd[hostname] if isinstance(cmd, dict) else cmd
+        start = time.time()
+        try:
+            with connection_pool.connection(
+                    hostname=hostname, username=username, password=password,
+                    key_filename=key_filename,
+                    timeout=timeout) as connection:
+                result = _run_command(
+                    host_cmd, connection, output_format, command_timeout)
+            error = None
+        except Exception as err:
+            logger.warning(
+                'Failed to run command on %s: %r', hostname, err)
+            result = SSHCommandResult(stderr=u'{0}'.format(err),
+                                      return_code=-1)
+            error = err
+        return result, time.time() - start, error
+
+    with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(hostnames))) as executor:
+        futures = [executor.submit(run, hostname) for hostname in hostnames]
+        for hostname, future in zip(hostnames, futures):
+            result, elapsed, error = future.result()
+            results[hostname] = result
+            results.elapsed[hostname] = elapsed
+            if error is not None:
+                results.errors[hostname] = error
+    return results
+
+
+class SSHSession(object):
+    """Run several commands at the same time over a single ssh connection.
+
+    paramiko can open many channels on one authenticated transport. A session
+    borrows a connection from :data:`connection_pool` and runs each submitted
+    command on its own channel of that connection through a pool of at most
+    ``max_channels`` threads. Submitting returns a
+    ``concurrent.futures.Future`` which resolves to the
+    ``SSHCommandResult``::
+
+        with session() as ssh_session:
+            futures = [ssh_session.submit(cmd) for cmd in commands]
+            results = [future.result() for future in futures]
+
+    A session can be shared by several threads, all of them will use the same
+    authenticated connection instead of opening one each.
+
+    Note that OpenSSH limits the number of channels per connection by its
+    ``MaxSessions`` option, 10 by default, keep ``max_channels`` below that
+    limit.
+
+    :param int max_channels: Maximum number of commands running at the same
+        time.
+
+    See :func:`command` for the description of the other arguments.
+    """
+
+    def __init__(self, hostname=None, username=None, password=None,
+                 key_filename=None, timeout=10, max_channels=10):
+        self.hostname = hostname
+        self.max_channels = max_channels
+        self.connection = None
+        self._connection_args = {
+            'hostname': hostname,
+            'username': username,
+            'password': password,
+            'key_filename': key_filename,
+            'timeout': timeout,
+        }
+        self._connection_context = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close(*exc_info)
+
+    def open(self):
+        """Borrow a connection from the pool and start the channels
+        workers.
+        """
+        with self._lock:
+            if self.connection is not None:
+                return
+            self._connection_context = connection_pool.connection(
+                **self._connection_args)
+            self.connection = self._connection_context.__enter__()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_channels)
+
+    def close(self, *exc_info):
+        """Wait for the running commands and give the connection back to the
+        pool. If the session is closed due to an exception, the connection is
+        closed instead.
+        """
+        with self._lock:
+            if self.connection is None:
+                return
+            self._executor.shutdown(wait=True)
+            if not exc_info:
+                exc_info = (None, None, None)
+            try:
+                self._connection_context.__exit__(*exc_info)
+            finally:
+                self.connection = None
+                self._connection_context = None
+                self._executor = None
+
+    def submit(self, cmd, output_format=None, timeout=None):
+        """Run a command on a new channel of the session connection.
+
+        :param str cmd: The command to run
+        :param str output_format: json, csv or None
+        :param int timeout: Time to wait for output of the command. ``None``
+            waits forever.
+        :return: A future which resolves to the ``SSHCommandResult``.
+        :rtype: concurrent.futures.Future
+        """
+        if self.connection is None:
+            self.open()
+        return self._executor.submit(
+            _run_command, cmd, self.connection, output_format, timeout)
+
+    def command(self, cmd, output_format=None, timeout=None):
+        """Run a command on a new channel of the session connection and wait
+        for its result.
+
+        :return: SSHCommandResult
+        """
+        return self.submit(cmd, output_format, timeout).result()
+
+
+def session(hostname=None, username=None, password=None, key_filename=None,
+            timeout=10, max_channels=10):
+    """Return an :class:`SSHSession` to run concurrent commands over a single
+    ssh connection.
+
+    It is meant to be used as a context manager::
+
+        with session('example.com') as ssh_session:
+            futures = [ssh_session.submit(cmd) for cmd in commands]
+    """
+    return SSHSession(
+        hostname=hostname, username=username, password=password,
+        key_filename=key_filename, timeout=timeout, max_channels=max_channels
+    )
+
+
+def command_batch(cmds, hostname=None, output_format=None, username=None,
+                  password=None, key_filename=None, timeout=10,
+                  stop_on_failure=False):
+    """Executes several SSH commands on remote hostname in a single round
+    trip.
+
+    All commands are sent to one remote shell. Each command runs on its own
+    subshell, like it would when executed by :func:`command`, and is followed
+    by delimiters on ``stdout`` and ``stderr`` carrying its exit code. The
+    output is then split back into one ``SSHCommandResult`` per command::
+
+        results = command_batch(['yum install -y puppet', 'rpm -q puppet'])
+        if results[-1].return_code != 0:
+            ...
+
+    :param list cmds: The commands to run, in order, as unicode strings or
+        UTF-8 encoded bytes like the ones :func:`command` accepts.
+    :param bool stop_on_failure: Do not run the remaining commands after the
+        first one returning non-zero. In this case the list of results is
+        shorter than the list of commands.
+
+    See :func:`command` for the description of the other arguments.
+
+    :return: A list with the ``SSHCommandResult`` of each command run.
+    :rtype: list
+    """
+    cmds = [decode_to_utf8(cmd) for cmd in cmds]
+    if not cmds:
+        return []
+    marker = u'ROBOTTELO-BATCH-{0}'.format(uuid.uuid4().hex)
+    script = []
+    for index, cmd in enumerate(cmds):
+        script.append(u'(\n{0}\n)'.format(cmd))
+        script.append(u'batch_rc=$?')
+        script.append(
+            u"printf '\\n%s %d %d\\n' {0} {1} $batch_rc".format(marker, index))
+        script.append(
+            u"printf '\\n%s %d\\n' {0} {1} >&2".format(marker, index))
+        if stop_on_failure:
+            script.append(u'[ $batch_rc -eq 0 ] || exit $batch_rc')
+    script = u'\n'.join(script)
+
+    hostname = hostname or settings.server.hostname
+    with connection_pool.connection(
+            hostname=hostname, username=username, password=password,
+            key_filename=key_filename, timeout=timeout) as connection:
+        logger.debug('>>> %s', u'; '.join(cmds))
+        _, stdout, stderr = connection.exec_command(script)
+        stdout_data = stdout.read()
+        stderr_data = stderr.read()
+        stdout.channel.recv_exit_status()
+
+    marker = marker.encode('ascii')
+    # Parts are in the form [output, index, return_code, output, ...]
+    stdout_parts = re.split(
+        b'\n' + marker + b' (\\d+) (-?\\d+)\n', stdout_data)
+    # Parts are in the form [output, index, output, index, ...]
+    stderr_parts = re.split(b'\n' + marker + b' (\\d+)\n', stderr_data)
+    stderrs = dict(
+        (int(index), output) for output, index
+        in zip(stderr_parts[0::2], stderr_parts[1::2])
+    )
+    results = []
+    for output, index, return_code in zip(
+            stdout_parts[0::3], stdout_parts[1::3], stdout_parts[2::3]):
+        index = int(index)
+        results.append(_build_result(
+            output, stderrs.get(index, b''), int(return_code), output_format))
+    return results
+
+
+class SSHCommandStream(object):
+    """Iterable over the output lines of a command executed via ssh.
+
+    Instances are returned by :func:`stream_command`. The command starts to
+    run when the iteration starts and each ``stdout`` line is yielded, as
+    unicode string without the trailing new line and the color escape codes,
+    as soon as it arrives. Only the line being received is kept in memory::
+
+        stream = stream_command('cat /var/log/foreman/production.log')
+        for line in stream:
+            ...
+        if stream.return_code != 0:
+            print(stream.stderr)
+
+    ``return_code`` and ``stderr`` are ``None`` until the stream is
+    exhausted. A stream can be iterated only once, call :meth:`close` to stop
+    consuming it early.
+
+    """
+
+    def __init__(self, cmd, hostname=None, username=None, password=None,
+                 key_filename=None, timeout=10, chunk_size=32768):
+        self.cmd = cmd
+        self.chunk_size = chunk_size
+        self.return_code = None
+        self.stderr = None
+        self._connection_args = {
+            'hostname': hostname,
+            'username': username,
+            'password': password,
+            'key_filename': key_filename,
+            'timeout': timeout,
+        }
+        self._lines = None
+
+    def __iter__(self):
+        if self._lines is None:
+            self._lines = self._read_lines()
+        return self._lines
+
+    def __repr__(self):
+        tmpl = u'SSHCommandStream(cmd={0!r}, stderr={1!r}, return_code={2!r})'
+        return tmpl.format(self.cmd, self.stderr, self.return_code)
+
+    def close(self):
+        """Stop reading the output and release the ssh channel."""
+        if self._lines is not None:
+            self._lines.close()
+
+    def _read_lines(self):
+        """Generator which runs the command and yields its output lines."""
+        with connection_pool.connection(
+                **self._connection_args) as connection:
+            channel = connection.get_transport().open_session()
+            try:
+                logger.debug('>>> %s', self.cmd)
+                channel.exec_command(self.cmd)
+                stdout_decoder = codecs.getincrementaldecoder('utf-8')(
+                    'replace')
+                stderr_decoder = codecs.getincrementaldecoder('utf-8')(
+                    'replace')
+                stderr = []
+                pending = u''
+                while True:
+                    # Drain stderr first so it never fills the channel window
+                    # while the stdout is being consumed.
+                    while channel.recv_stderr_ready():
+                        stderr.append(stderr_decoder.decode(
+                            channel.recv_stderr(self.chunk_size)))
+                    if channel.recv_ready():
+                        pending += stdout_decoder.decode(
+                            channel.recv(self.chunk_size))
+                        lines = pending.split(u'\n')
+                        pending = lines.pop()
+                        for line in lines:
+                            yield _COLOR_CODES_REGEX.sub(u'', line)
+                    elif (channel.exit_status_ready() and
+                            not channel.recv_stderr_ready()):
+                        break
+                    else:
+                        time.sleep(_STREAM_POLL_INTERVAL)
+                pending += stdout_decoder.decode(b'', True)
+                if pending:
+                    yield _COLOR_CODES_REGEX.sub(u'', pending)
+                stderr.append(stderr_decoder.decode(b'', True))
+                self.stderr = _COLOR_CODES_REGEX.sub(u'', u''.join(stderr))
+                self.return_code = channel.recv_exit_status()
+                if self.stderr:
+                    logger.debug('<<< stderr\n%s', self.stderr)
+            finally:
+                channel.close()
+
+
+def stream_command(cmd, hostname=None, username=None, password=None,
+                   key_filename=None, timeout=10, chunk_size=32768):
+    """Executes SSH command on remote hostname streaming its output.
+
+    Unlike :func:`command`, which waits the command to finish and keeps its
+    whole output in memory, the output is read from the channel in chunks of
+    ``chunk_size`` bytes and yielded line by line as it arrives. This is
+    useful for commands with big outputs or long running ones like tailing a
+    log file.
+
+    Accept the same connection arguments as :func:`command`.
+
+    :param int chunk_size: Maximum number of bytes read from the channel at
+        once.
+    :return: An iterable which yields the ``stdout`` lines. Its
+        ``return_code`` and ``stderr`` attributes are available once it is
+        exhausted.
+    :rtype: SSHCommandStream
+    """
+    return SSHCommandStream(
+        cmd, hostname=hostname, username=username, password=password,
+        key_filename=key_filename, timeout=timeout, chunk_size=chunk_size
+    )
+
+
 def is_ssh_pub_key(key):
     """Validates if a string is in valid ssh pub key format
 
@@ -305,3 +1407,27 @@ def is_ssh_pub_key(key):
     return key_type in (
         'ecdsa-sha2-nistp256', 'ssh-dss', 'ssh-rsa', 'ssh-ed25519'
     )
+
+
+def acommand(cmd, **kwargs):
+    """Asyncio version of :func:`command`.
+
+    Return a future, to be awaited from a coroutine, resolved with the
+    ``SSHCommandResult``. It accepts the same arguments of :func:`command` and
+    is run by :data:`robottelo.ssh_async.backend`. Requires Python 3.5.3 or
+    newer.
+    """
+    from robottelo.ssh_async import backend
+    return backend.command(cmd, **kwargs)
+
+
+def command_sync(cmd, **kwargs):
+    """Run :func:`acommand` on a background event loop and wait for its
+    result.
+
+    Synchronous callers can use it as a drop-in replacement of
+    :func:`command` to share the connections of the asyncio backend. Requires
+    Python 3.5.3 or newer.
+    """
+    from robottelo.ssh_async import backend
+    return backend.command_sync(cmd, **kwargs)
@@ -0,0 +1,309 @@
+"""Asyncio backend for :mod:`robottelo.ssh`.
+
+This module requires Python 3.5.3 or newer, the first version having
+``loop.create_future``, ``asyncio.ensure_future`` and
+``asyncio.get_event_loop`` returning the running loop, and raises
+``ImportError`` on older ones. It provides the same semantics of
+:func:`robottelo.ssh.command` but returning awaitable futures, so a lot of
+concurrent remote commands can run on a single event loop::
+
+    results = yield from asyncio.gather(*[
+        ssh.acommand('hammer ping', hostname=hostname) for _ in range(1000)])
+
+When the optional `asyncssh`_ package is installed the commands run natively
+on the event loop, sharing a few connections per host. Otherwise they are run
+by :func:`robottelo.ssh.command` on a bounded pool of worker threads.
+
+The code does not use the ``async``/``await`` syntax so the module can be
+parsed by every Python version supported by Robottelo.
+
+.. _asyncssh: https://asyncssh.readthedocs.io/
+
+"""
+import asyncio
+import collections
+import functools
+import logging
+import sys
+import threading
+
+from concurrent.futures import Future as ConcurrentFuture, ThreadPoolExecutor
+from robottelo import ssh
+
+try:
+    import asyncssh
+except ImportError:  # pragma: no cover
+    asyncssh = None
+
+if sys.version_info < (3, 5, 3):  # pragma: no cover
+    raise ImportError('robottelo.ssh_async requires Python 3.5.3 or newer')
+
+logger = logging.getLogger(__name__)
+
+
+def _copy_future_state(source, destination):
+    """Copy the result, exception or cancellation of ``source`` future to
+    ``destination`` future. Both can be asyncio or concurrent futures.
+    """
+    if destination.done():
+        return
+    if source.cancelled():
+        destination.cancel()
+    elif source.exception() is not None:
+        destination.set_exception(source.exception())
+    else:
+        destination.set_result(source.result())
+
+
+def _chain(future, callback, loop):
+    """Return a future resolved with ``callback(future.result())``.
+
+    If ``callback`` returns a future or a coroutine, the returned future is
+    resolved with its result instead. Exceptions are propagated.
+    """
+    chained = loop.create_future()
+
+    def done(source):
+        if chained.done():
+            return
+        if source.cancelled() or source.exception() is not None:
+            _copy_future_state(source, chained)
+            return
+        try:
+            value = callback(source.result())
+        except Exception as err:
+            chained.set_exception(err)
+            return
+        if isinstance(value, asyncio.Future) or asyncio.iscoroutine(value):
+            asyncio.ensure_future(value, loop=loop).add_done_callback(
+                functools.partial(_copy_future_state, destination=chained))
+        else:
+            chained.set_result(value)
+
+    future.add_done_callback(done)
+    return chained
+
+
+class _AsyncSSHConnection(object):
+    """An asyncssh connection being established or established and the
+    number of channels open on it.
+    """
+
+    def __init__(self, ready):
+        self.ready = ready
+        self.connection = None
+        self.channels = 1
+        self.broken = False
+
+
+class AsyncSSHBackend(object):
+    """Run ssh commands on an asyncio event loop.
+
+    With asyncssh, up to ``max_connections`` connections are opened per host
+    and event loop, each running up to ``max_channels`` commands at the same
+    time. Commands exceeding that wait for a free channel. Keep
+    ``max_channels`` within the ``MaxSessions`` limit of the remote ssh
+    server.
+
+    Without asyncssh, the commands are run by :func:`robottelo.ssh.command` on
+    ``max_workers`` threads.
+
+    :param int max_channels: Maximum concurrent commands per connection.
+    :param int max_connections: Maximum connections per host.
+    :param int max_workers: Number of threads of the fallback executor.
+    """
+
+    def __init__(self, max_channels=10, max_connections=10, max_workers=50):
+        self.max_channels = max_channels
+        self.max_connections = max_connections
+        self.max_workers = max_workers
+        self._connections = {}
+        self._waiters = {}
+        self._executor = None
+        self._background_loop = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        """Return the fallback executor creating it if needed."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers)
+            return self._executor
+
+    def _connect(self, key, password, timeout, loop):
+        """Start a new connection for ``key`` and return its entry."""
+        hostname, username, key_filename = key[1:]
+        logger.debug('Connecting to [%s] with asyncssh', hostname)
+        entry = _AsyncSSHConnection(asyncio.ensure_future(asyncio.wait_for(
+            asyncssh.connect(
+                hostname,
+                username=username,
+                password=password,
+                client_keys=[key_filename] if key_filename else None,
+                known_hosts=None,
+            ),
+            timeout,
+        ), loop=loop))
+        entries = self._connections.setdefault(key, [])
+        entries.append(entry)
+
+        def connected(future):
+            if future.cancelled() or future.exception() is not None:
+                entry.broken = True
+                if entry in entries:
+                    entries.remove(entry)
+                self._wake_waiter(key)
+            else:
+                entry.connection = future.result()
+
+        entry.ready.add_done_callback(connected)
+        return entry
+
+    def _acquire(self, key, password, timeout, loop):
+        """Return a future resolved with a connection entry having a channel
+        reserved for the caller.
+        """
+        entries = self._connections.setdefault(key, [])
+        for entry in entries:
+            if entry.channels < self.max_channels:
+                entry.channels += 1
+                break
+        else:
+            if len(entries) < self.max_connections:
+                entry = self._connect(key, password, timeout, loop)
+            else:
+                waiter = loop.create_future()
+                self._waiters.setdefault(key, collections.deque()).append(
+                    waiter)
+                return _chain(
+                    waiter,
+                    lambda _: self._acquire(key, password, timeout, loop),
+                    loop
+                )
+        return _chain(entry.ready, lambda _: entry, loop)
+
+    def _release(self, key, entry, broken=False):
+        """Give back a channel reserved by :meth:`_acquire`."""
+        entry.channels -= 1
+        entries = self._connections.get(key, [])
+        if broken and entry in entries:
+            entry.broken = True
+            entries.remove(entry)
+        if entry.broken and entry.channels == 0 and entry.connection:
+            entry.connection.close()
+        self._wake_waiter(key)
+
+    def _wake_waiter(self, key):
+        """Let the first caller waiting for a channel try again."""
+        waiters = self._waiters.get(key)
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def command(self, cmd, hostname=None, output_format=None, username=None,
+                password=None, key_filename=None, timeout=10, loop=None):
+        """Executes SSH command(s) on remote hostname without blocking the
+        event loop.
+
+        See :func:`robottelo.ssh.command` for the description of the
+        arguments.
+
+        :param loop: The event loop to run the command on. If ``None`` the
+            current event loop is used.
+        :return: A future resolved with the ``SSHCommandResult``.
+        :rtype: asyncio.Future
+        """
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        hostname, username, password, key_filename = (
+            ssh._resolve_connection_args(
+                hostname, username, password, key_filename))
+        if asyncssh is None:
+            return loop.run_in_executor(
+                self._get_executor(),
+                functools.partial(
+                    ssh.command, cmd, hostname=hostname,
+                    output_format=output_format, username=username,
+                    password=password, key_filename=key_filename,
+                    timeout=timeout
+                )
+            )
+        key = (loop, hostname, username, key_filename)
+
+        def run(entry):
+            logger.debug('>>> %s', cmd)
+            process = asyncio.ensure_future(
+                entry.connection.run(cmd, encoding=None), loop=loop)
+            process.add_done_callback(lambda future: self._release(
+                key, entry,
+                broken=future.cancelled() or future.exception() is not None
+            ))
+            return process
+
+        return _chain(
+            _chain(self._acquire(key, password, timeout, loop), run, loop),
+            lambda process: ssh._build_result(
+                process.stdout, process.stderr, process.exit_status,
+                output_format),
+            loop
+        )
+
+    def _get_background_loop(self):
+        """Return an event loop running on a daemon thread, starting it if
+        needed.
+        """
+        with self._lock:
+            if self._background_loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name='robottelo-ssh-async')
+                thread.daemon = True
+                thread.start()
+                self._background_loop = loop
+            return self._background_loop
+
+    def command_sync(self, cmd, **kwargs):
+        """Run :meth:`command` on a background event loop and block until its
+        result is available.
+
+        This lets synchronous code, from any thread, share the connections of
+        the asyncio backend. It accepts the same arguments as :meth:`command`
+        except ``loop``.
+
+        :return: The command result.
+        :rtype: robottelo.ssh.SSHCommandResult
+        """
+        loop = self._get_background_loop()
+        result = ConcurrentFuture()
+
+        def start():
+            try:
+                future = self.command(cmd, loop=loop, **kwargs)
+            except Exception as err:
+                result.set_exception(err)
+                return
+            future.add_done_callback(
+                functools.partial(_copy_future_state, destination=result))
+
+        loop.call_soon_threadsafe(start)
+        return result.result()
+
+    def clear(self):
+        """Close all the asyncssh connections and forget them."""
+        entries = [
+            entry for key_entries in self._connections.values()
+            for entry in key_entries
+        ]
+        self._connections.clear()
+        for entry in entries:
+            entry.broken = True
+            if entry.connection is not None:
+                entry.connection.close()
+
+
+#: The :class:`AsyncSSHBackend` used by :func:`robottelo.ssh.acommand` and
+#: :func:`robottelo.ssh.command_sync`.
+backend = AsyncSSHBackend()
@@ -0,0 +1,242 @@
+"""Timing and traffic metrics of the ssh layer.
+
+:mod:`robottelo.ssh` records on :data:`metrics` the time spent establishing
+and authenticating each connection and, for each command, the time until its
+exit status is received and the size of its output. Commands are grouped by
+family, for example every ``hammer -v -u admin -p changeme host create ...``
+command belongs to the ``hammer host create`` family.
+
+The aggregated numbers can be dumped as JSON or CSV::
+
+    from robottelo.ssh_metrics import metrics
+    metrics.dump('ssh-metrics.json')
+
+When the ``ssh_metrics_file`` setting of the ``[robottelo]`` section is set,
+they are dumped automatically at the end of the pytest session.
+
+"""
+import bisect
+import csv
+import json
+import os
+import shlex
+import threading
+
+#: Upper bounds, in seconds, of the histograms buckets. Durations over the
+#: last bound are counted on an extra bucket.
+BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300
+)
+
+# hammer options which take a value as the next argument
+_HAMMER_OPTIONS_WITH_VALUE = (
+    '-c', '--config', '-p', '--password', '-r', '--reload-cache', '-s',
+    '--server', '-u', '--username', '--output', '--csv-separator',
+)
+
+
+def command_family(cmd):
+    """Return the family of a command.
+
+    The family of hammer commands is ``hammer <base> <sub>``, ignoring the
+    environment variables, the ``time`` prefix and the global options. For
+    other commands it is the name of the executable, for example ``rpm``.
+
+    :param str cmd: The command run.
+    :rtype: str
+    """
+    try:
+        args = shlex.split(cmd)
+    except ValueError:
+        # Unbalanced quotes, the family only needs the first words
+        args = cmd.split()
+    # Skip environment variables assignments and the time prefix
+    while args and ('=' in args[0] or args[0] in ('time', '-p')):
+        args.pop(0)
+    if not args:
+        return u''
+    executable = os.path.basename(args[0])
+    if executable != 'hammer':
+        return executable
+    family = [executable]
+    skip_next = False
+    for arg in args[1:]:
+        if skip_next:
+            skip_next = False
+        elif arg.startswith('-'):
+            skip_next = arg in _HAMMER_OPTIONS_WITH_VALUE
+        else:
+            family.append(arg)
+            if len(family) == 3:
+                break
+    return u' '.join(family)
+
+
+class Histogram(object):
+    """Count, sum, bounds and distribution on :data:`BUCKETS` of durations.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def add(self, value):
+        """Record a duration in seconds."""
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.buckets[bisect.bisect_left(BUCKETS, value)] += 1
+
+    @property
+    def mean(self):
+        """Mean duration or ``None`` if nothing was recorded."""
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def to_dict(self):
+        """Return the histogram as a JSON serializable dictionary. Buckets
+        are keyed by their upper bound, ``+Inf`` for the last one.
+        """
+        bounds = [str(bound) for bound in BUCKETS] + ['+Inf']
+        return {
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'buckets': dict(zip(bounds, self.buckets)),
+        }
+
+
+class SSHMetrics(object):
+    """Thread-safe aggregation of the ssh connections and commands metrics.
+
+    Connections are grouped by hostname and commands by
+    :func:`command_family`. Callables registered with :meth:`add_listener`
+    are called with the ``kind`` (``'connect'`` or ``'command'``) and a
+    dictionary describing every recorded event, letting performance tests
+    keep their own raw samples.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.reset()
+
+    def reset(self):
+        """Forget all the recorded metrics."""
+        with self._lock:
+            self.connections = {}
+            self.commands = {}
+
+    def add_listener(self, listener):
+        """Call ``listener(kind, event)`` for every recorded event."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stop calling ``listener`` for the recorded events."""
+        self._listeners.remove(listener)
+
+    def _notify(self, kind, event):
+        """Call the registered listeners."""
+        for listener in list(self._listeners):
+            listener(kind, event)
+
+    def record_connect(self, hostname, elapsed):
+        """Record the time spent connecting and authenticating to a host.
+
+        :param str hostname: The host connected to.
+        :param float elapsed: Seconds spent.
+        """
+        with self._lock:
+            histogram = self.connections.get(hostname)
+            if histogram is None:
+                histogram = self.connections[hostname] = Histogram()
+            histogram.add(elapsed)
+        self._notify('connect', {'hostname': hostname, 'elapsed': elapsed})
+
+    def record_command(self, cmd, elapsed, stdout_bytes, stderr_bytes):
+        """Record a command execution.
+
+        :param str cmd: The command run.
+        :param float elapsed: Seconds until the exit status was received.
+        :param int stdout_bytes: Size of the command stdout.
+        :param int stderr_bytes: Size of the command stderr.
+        """
+        family = command_family(cmd)
+        with self._lock:
+            stats = self.commands.get(family)
+            if stats is None:
+                stats = self.commands[family] = {
+                    'histogram': Histogram(),
+                    'stdout_bytes': 0,
+                    'stderr_bytes': 0,
+                }
+            stats['histogram'].add(elapsed)
+            stats['stdout_bytes'] += stdout_bytes
+            stats['stderr_bytes'] += stderr_bytes
+        self._notify('command', {
+            'family': family,
+            'elapsed': elapsed,
+            'stdout_bytes': stdout_bytes,
+            'stderr_bytes': stderr_bytes,
+        })
+
+    def to_dict(self):
+        """Return the metrics as a JSON serializable dictionary."""
+        with self._lock:
+            return {
+                'connections': dict(
+                    (hostname, histogram.to_dict())
+                    for hostname, histogram in self.connections.items()
+                ),
+                'commands': dict(
+                    (family, dict(
+                        stats['histogram'].to_dict(),
+                        stdout_bytes=stats['stdout_bytes'],
+                        stderr_bytes=stats['stderr_bytes'],
+                    ))
+                    for family, stats in self.commands.items()
+                ),
+            }
+
+    def rows(self):
+        """Return the metrics as a list of CSV rows, the first one being the
+        header.
+        """
+        metrics = self.to_dict()
+        bounds = [str(bound) for bound in BUCKETS] + ['+Inf']
+        header = ['kind', 'name', 'count', 'total', 'min', 'mean', 'max',
+                  'stdout_bytes', 'stderr_bytes']
+        header.extend('<={0}'.format(bound) for bound in bounds)
+        rows = [header]
+        for kind in ('connections', 'commands'):
+            for name in sorted(metrics[kind]):
+                stats = metrics[kind][name]
+                row = [kind, name] + [
+                    stats.get(column, '') for column in header[2:9]]
+                row.extend(stats['buckets'][bound] for bound in bounds)
+                rows.append(row)
+        return rows
+
+    def dump(self, path):
+        """Write the metrics to ``path``, as CSV if its extension is ``.csv``
+        or as JSON otherwise.
+        """
+        if os.path.splitext(path)[1].lower() == '.csv':
+            with open(path, 'w') as handler:
+                csv.writer(handler).writerows(self.rows())
+        else:
+            with open(path, 'w') as handler:
+                json.dump(self.to_dict(), handler, indent=2, sort_keys=True)
+
+
+#: The :class:`SSHMetrics` where :mod:`robottelo.ssh` records its metrics.
+metrics = SSHMetrics()
@@ -40,6 +40,7 @@ from robottelo.performance.thread import (
     SubscribeAKThread,
     SubscribeAttachThread
 )
+from robottelo.ssh_metrics import metrics as ssh_metrics
 from robottelo.ui.browser import browser, DockerBrowser
 from robottelo.ui.activationkey import ActivationKey
 from robottelo.ui.architecture import Architecture
@@ -486,6 +487,7 @@ class ConcurrentTestCase(TestCase):
 
         # Restore database before concurrent subscription/deletion
         self._restore_from_savepoint(self.savepoint)
+        ssh_metrics.reset()
 
     def _restore_from_savepoint(self, savepoint):
         """Restore from savepoint"""
@@ -674,6 +676,24 @@ class ConcurrentTestCase(TestCase):
             )
             writer.writerow([])
 
+        # 5. write the ssh metrics recorded along the timings
+        self._write_ssh_metrics(stat_file_name)
+
+    def _write_ssh_metrics(self, stat_file_name):
+        """Append the ssh connections and commands metrics recorded since
+        the last call, or since the test started, to the csv file and reset
+        them.
+
+        :param str stat_file_name: The name of output csv file.
+
+        """
+        with open(stat_file_name, 'a') as handler:
+            writer = csv.writer(handler)
+            writer.writerow(['ssh-metrics'])
+            writer.writerows(ssh_metrics.rows())
+            writer.writerow([])
+        ssh_metrics.reset()
+
     def _write_stat_per_client_bucketized(
             self,
             stat_file_name,
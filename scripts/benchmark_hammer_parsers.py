@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+"""Micro-benchmark the hammer output parsers of ``robottelo.cli.hammer``.
+
+Each parser is timed over the recorded hammer outputs found on
+``tests/robottelo/data``, or over generated ones for the CSV parsers, and
+compared to a baseline, the implementation it replaced, after making sure
+both produce the same result. Use ``--min-speedup`` to fail when a parser
+gets slower than expected::
+
+    $ scripts/benchmark_hammer_parsers.py --min-speedup 1.2
+
+The CSV outputs have ``--csv-rows`` rows, 100000 by default, and are timed
+from the raw bytes read from the ssh channel up to the parsed rows. The JSON
+outputs have ``--json-rows`` entities, 10000 by default, and are timed until
+the name of each entity is read.
+
+"""
+from __future__ import print_function
+
+import argparse
+import csv
+import glob
+import io
+import json
+import os
+import re
+import six
+import sys
+import timeit
+
+from robottelo import ssh
+from robottelo.cli import hammer
+from six.moves import cStringIO as StringIO
+from six.moves import zip
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'tests', 'robottelo', 'data'
+)
+
+
+def legacy_parse_info(output):
+    """The ``parse_info`` implementation before the single pass rewrite."""
+    contents = {}
+    sub_prop = None
+    sub_num = None
+
+    for line in output:
+        if line == '':
+            continue
+        if line.startswith(' '):
+            if line.find(':') != -1 and not line.find('::') != -1:
+                key, value = line.lstrip().split(":", 1)
+            elif line.find('=>') != -1:
+                key, value = line.lstrip().split(" =>", 1)
+            else:
+                key = value = None
+
+            if key is None and value is None:
+                match = re.match(r'\d+\)\s+(.+)$', line.lstrip())
+
+                if match is None:
+                    match = re.match(r'(.*)$', line.lstrip())
+
+                value = match.group(1)
+
+                if isinstance(contents[sub_prop], dict):
+                    contents[sub_prop] = []
+
+                contents[sub_prop].append(value)
+            else:
+                starts_with_number = re.match(r'(\d+)\)', key)
+                if starts_with_number:
+                    sub_num = int(starts_with_number.group(1))
+                    if sub_num == 1:
+                        contents[sub_prop] = []
+                    key = re.sub(r'\d+\)', '', key)
+                    contents[sub_prop].append({})
+
+                key = key.lstrip().replace(' ', '-').lower()
+
+                if sub_num is not None:
+                    contents[sub_prop][-1][key] = value.lstrip()
+                else:
+                    contents[sub_prop][key] = value.lstrip()
+        else:
+            sub_num = None
+            key, value = line.lstrip().split(":", 1)
+            key = key.lstrip().replace(' ', '-').lower()
+            if value.lstrip() == '':
+                sub_prop = key
+                contents[sub_prop] = {}
+            else:
+                contents[key] = value.lstrip()
+
+    return contents
+
+
+def legacy_csv_reader(output):
+    """The ``_csv_reader`` implementation joining the lines back."""
+    data = '\n'.join(output)
+    if six.PY2:
+        data = data.encode('utf8')
+    handler = StringIO(data)
+
+    for row in csv.reader(handler):
+        if six.PY2:
+            yield [value.decode('utf8') for value in row]
+        else:
+            yield row
+
+
+def legacy_parse_csv(output):
+    """The ``parse_csv`` implementation before the streaming parser."""
+    reader = legacy_csv_reader(output)
+    keys = [hammer._normalize(header) for header in next(reader)]
+    return [dict(zip(keys, values)) for values in reader if len(values) > 0]
+
+
+def legacy_clean_stdout(stdout):
+    """The ``ssh._clean_stdout`` implementation for CSV outputs."""
+    stdout = ssh.decode_to_utf8(stdout)
+    stdout = stdout.replace('""', '')
+    stdout = u''.join(stdout).split('\n')
+    return [
+        ssh._COLOR_CODES_REGEX.sub('', line)
+        for line in stdout
+        if not line.startswith('[')
+    ]
+
+
+def legacy_read_csv(raw_stdout):
+    """Clean up and parse a raw CSV output as ``ssh.command`` used to."""
+    return legacy_parse_csv(legacy_clean_stdout(raw_stdout))
+
+
+def read_csv(raw_stdout):
+    """Clean up and parse a raw CSV output as ``ssh.command`` does."""
+    return ssh.SSHCommandResult.from_channel_output(
+        raw_stdout, b'', 0, 'csv').stdout
+
+
+def stream_csv_records(raw_stdout):
+    """Parse a raw CSV output into records as ``Base.execute_stream`` does,
+    feeding the lines of a channel read in 32KiB chunks.
+    """
+    def stream():
+        pending = u''
+        for start in range(0, len(raw_stdout), 32768):
+            pending += raw_stdout[start:start + 32768].decode('utf-8')
+            lines = pending.split(u'\n')
+            pending = lines.pop()
+            for line in lines:
+                line = line.replace(u'""', u'')
+                if not line.startswith(u'['):
+                    yield line
+        if pending:
+            yield pending
+
+    return list(hammer.iter_csv(stream(), records=True))
+
+
+def recorded_outputs(pattern):
+    """Return a function listing the recorded outputs matching ``pattern``
+    as ``(name, lines)``.
+    """
+    def outputs(args):
+        return [
+            (os.path.basename(path), read_lines(path))
+            for path in sorted(glob.glob(os.path.join(DATA_DIR, pattern)))
+        ]
+    return outputs
+
+
+def generated_csv_outputs(args):
+    """Return a generated ``hammer host list --output=csv`` raw output as
+    ``(name, bytes)``.
+    """
+    lines = [
+        u'[ INFO 2017-01-01 00:00:00 API] GET /api/hosts',
+        u'Id,Name,Operating System,Host Group,IP,MAC',
+    ]
+    for index in range(args.csv_rows):
+        lines.append(
+            u'{0},host-{0}.example.com,RedHat 7.3,"group, {1}",{2},'
+            u'00:1a:4a:{3:02x}:{4:02x}:{5:02x}'.format(
+                index,
+                index % 10,
+                u'""' if index % 3 else u'192.168.{0}.{1}'.format(
+                    index // 256 % 256, index % 256),
+                index >> 16 & 255, index >> 8 & 255, index & 255,
+            )
+        )
+    name = u'host_list_{0}_rows.csv'.format(args.csv_rows)
+    return [(name, (u'\n'.join(lines) + u'\n').encode('utf-8'))]
+
+
+def read_json_names(output):
+    """Parse a JSON output and read the name of each entity."""
+    return [entity['name'] for entity in hammer.parse_json(output)]
+
+
+def legacy_read_json_names(output):
+    """Parse a JSON output normalizing it eagerly and read the name of each
+    entity.
+    """
+    return [
+        entity['name'] for entity in hammer.parse_json(output, lazy=False)]
+
+
+def generated_json_outputs(args):
+    """Return a generated ``hammer host list --output=json`` output as
+    ``(name, text)``.
+    """
+    hosts = [
+        {
+            u'ID': index,
+            u'Name': u'host-{0}.example.com'.format(index),
+            u'Operating System': u'RedHat 7.3',
+            u'Host Group': u'group {0}'.format(index % 10),
+            u'Network': {
+                u'IPv4 Address': u'192.168.{0}.{1}'.format(
+                    index // 256 % 256, index % 256),
+                u'MAC': u'00:1a:4a:00:00:{0:02x}'.format(index % 256),
+            },
+            u'Parameters': [
+                {u'Name': u'param {0}'.format(param), u'Value': param}
+                for param in range(10)
+            ],
+        }
+        for index in range(args.json_rows)
+    ]
+    name = u'host_list_{0}_rows.json'.format(args.json_rows)
+    return [(name, json.dumps(hosts))]
+
+
+#: Benchmarks as ``(name, outputs, parser, baseline, calls per repetition)``,
+#: ``None`` calls per repetition means ``--number``
+BENCHMARKS = (
+    ('parse_info', recorded_outputs('hammer_info_*.txt'), hammer.parse_info,
+     legacy_parse_info, None),
+    ('parse_csv', generated_csv_outputs, read_csv, legacy_read_csv, 1),
+    ('iter_csv', generated_csv_outputs, stream_csv_records, legacy_read_csv,
+     1),
+    ('parse_json', generated_json_outputs, read_json_names,
+     legacy_read_json_names, 1),
+)
+
+
+def read_lines(path):
+    """Return the lines of the recorded output ``path``."""
+    with io.open(path, encoding='utf-8') as handler:
+        return handler.read().splitlines()
+
+
+def comparable(result):
+    """Return ``result`` with its CSV records converted to dictionaries."""
+    if isinstance(result, list):
+        return [
+            item._asdict() if isinstance(item, hammer.CSVRecord) else item
+            for item in result
+        ]
+    return result
+
+
+def best_time(func, output, repeat, number):
+    """Return the best time, in seconds, of a single ``func(output)`` call.
+    """
+    timer = timeit.Timer(lambda: func(output))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main():
+    """Run the benchmarks and return the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--repeat', type=int, default=5, help='timing repetitions')
+    parser.add_argument(
+        '--number', type=int, default=20, help='calls per repetition')
+    parser.add_argument(
+        '--csv-rows', type=int, default=100000,
+        help='rows of the generated CSV outputs')
+    parser.add_argument(
+        '--json-rows', type=int, default=10000,
+        help='entities of the generated JSON outputs')
+    parser.add_argument(
+        '--min-speedup', type=float, default=None,
+        help='fail if a parser is not this many times faster than baseline')
+    args = parser.parse_args()
+
+    failed = False
+    print('{0:<14} {1:<34} {2:>11} {3:>11} {4:>8}'.format(
+        'parser', 'output', 'baseline ms', 'parser ms', 'speedup'))
+    for name, outputs, func, baseline, number in BENCHMARKS:
+        number = number or args.number
+        for output_name, output in outputs(args):
+            if comparable(func(output)) != comparable(baseline(output)):
+                print('{0} output differs from baseline for {1}'.format(
+                    name, output_name))
+                failed = True
+                continue
+            baseline_time = best_time(baseline, output, args.repeat, number)
+            func_time = best_time(func, output, args.repeat, number)
+            speedup = baseline_time / func_time
+            print('{0:<14} {1:<34} {2:>11.3f} {3:>11.3f} {4:>7.2f}x'.format(
+                name, output_name, baseline_time * 1000, func_time * 1000,
+                speedup))
+            if args.min_speedup is not None and speedup < args.min_speedup:
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
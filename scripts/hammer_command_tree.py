@@ -1,34 +1,185 @@
+#!/usr/bin/env python
 """Generate hammer command tree in json format by inspecting every command's
 help.
 
+The ``--help`` of the commands is fetched by ``--workers`` threads at once,
+sharing the pooled ssh connections, and every command is fetched as soon as
+the help of its parent is parsed::
+
+    $ PYTHONPATH=. scripts/hammer_command_tree.py \\
+        --previous tests/foreman/data/hammer_commands.json
+
+The versions of hammer and its plugins, as printed by ``hammer --version``,
+are kept on the ``versions`` key of the tree. When they did not change since
+the ``--previous`` tree, the help of the top level commands is still fetched
+but the subcommands of the ones whose help did not change are copied from the
+previous tree instead of being fetched again.
+
+The number of commands fetched and reused and the time spent are reported
+at the end, with the slowest commands.
+
 """
+from __future__ import print_function
+
+import argparse
 import json
+import os
+import re
+import sys
+import time
 
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from robottelo import ssh
 from robottelo.cli import hammer
 from robottelo.config import settings
 
+# Lines like " * hammer_cli_katello (0.11.0)" of hammer --version
+VERSION_REGEX = re.compile(r'^\W*(?P<name>[\w-]+) \((?P<version>[^)]+)\)')
+
+
+def hammer_versions():
+    """Return the versions of hammer and its plugins, keyed by name."""
+    output = ssh.command('hammer --version').stdout
+    versions = {}
+    for line in output:
+        match = VERSION_REGEX.match(line)
+        if match is not None:
+            versions[match.group('name')] = match.group('version')
+    return versions
 
-def generate_command_tree(command):
-    """Recursively walk trhough the hammer commands and subcommands and fetch
-    their help. Return a dictionary with the contents.
 
+def fetch_help(command):
+    """Fetch and parse the help of ``command``.
+
+    :return: A tuple with the parsed help and the seconds it took.
     """
+    start = time.time()
     output = ssh.command('{0} --help'.format(command)).stdout
-    contents = hammer.parse_help(output)
-    if len(contents['subcommands']) > 0:
-        for subcommand in contents['subcommands']:
-            subcommand.update(generate_command_tree(
-                '{0} {1}'.format(command, subcommand['name'])
-            ))
-    return contents
-
-settings.configure()
-
-# Generate the json file in the working directory
-with open('hammer_commands.json', 'w') as f:
-    f.write(json.dumps(
-        generate_command_tree('hammer'),
-        indent=2,
-        sort_keys=True
+    return hammer.parse_help(output), time.time() - start
+
+
+def same_help(contents, previous):
+    """Return whether the parsed help ``contents`` is the one of the
+    ``previous`` tree node, ignoring the help of its subcommands.
+    """
+    def subcommands(node):
+        return [
+            (subcommand['name'], subcommand.get('description'))
+            for subcommand in node.get('subcommands') or []
+        ]
+    return (
+        previous is not None and
+        contents['options'] == previous.get('options') and
+        subcommands(contents) == subcommands(previous)
+    )
+
+
+def find_subcommand(node, name):
+    """Return the subcommand ``name`` of the tree ``node`` or ``None``."""
+    for subcommand in (node or {}).get('subcommands') or []:
+        if subcommand['name'] == name:
+            return subcommand
+    return None
+
+
+def generate_command_tree(command='hammer', previous=None, workers=10):
+    """Walk through the hammer commands and subcommands and fetch their help.
+
+    :param str command: The root command.
+    :param dict previous: A tree generated by the same versions of hammer and
+        its plugins, whose unchanged subtrees are reused.
+    :param int workers: Maximum number of help fetched at the same time.
+    :return: A tuple with the tree and a dictionary with the time each
+        command fetched took.
+    """
+    timings = {}
+    tree = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Each fetch fills the tree node of a command, which is compared to
+        # the node of the same command on the previous tree
+        pending = {
+            executor.submit(fetch_help, command): (command, tree, previous)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, node, previous_node = pending.pop(future)
+                contents, timings[path] = future.result()
+                node.update(contents)
+                reuse = path != command and same_help(contents, previous_node)
+                for subcommand in node['subcommands']:
+                    previous_subcommand = find_subcommand(
+                        previous_node, subcommand['name'])
+                    if reuse:
+                        subcommand.update(
+                            (key, value)
+                            for key, value in previous_subcommand.items()
+                            if key not in subcommand
+                        )
+                        continue
+                    subpath = u'{0} {1}'.format(path, subcommand['name'])
+                    pending[executor.submit(fetch_help, subpath)] = (
+                        subpath, subcommand, previous_subcommand)
+    return tree, timings
+
+
+def count_commands(node):
+    """Return the number of commands of the tree ``node``."""
+    return 1 + sum(
+        count_commands(subcommand)
+        for subcommand in node.get('subcommands') or []
+    )
+
+
+def main():
+    """Generate the tree and return the process exit code."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--output', default='hammer_commands.json',
+        help='file the tree is written to')
+    parser.add_argument(
+        '--previous', default=None,
+        help='previously generated tree to reuse, defaults to --output')
+    parser.add_argument(
+        '--workers', type=int, default=10,
+        help='maximum number of help fetched at the same time')
+    parser.add_argument(
+        '--slowest', type=int, default=10,
+        help='number of slowest commands reported')
+    args = parser.parse_args()
+
+    settings.configure()
+    start = time.time()
+    versions = hammer_versions()
+    previous = None
+    previous_path = args.previous or args.output
+    if os.path.isfile(previous_path):
+        with open(previous_path) as handler:
+            previous = json.load(handler)
+        if previous.get('versions') != versions:
+            print('Hammer versions changed, fetching every command')
+            previous = None
+
+    tree, timings = generate_command_tree(
+        previous=previous, workers=args.workers)
+    tree['versions'] = versions
+
+    # Generate the json file in the working directory
+    with open(args.output, 'w') as handler:
+        handler.write(json.dumps(tree, indent=2, sort_keys=True))
+
+    total = count_commands(tree)
+    print('{0} commands, {1} fetched, {2} reused from {3}'.format(
+        total, len(timings), total - len(timings), previous_path
+        if previous is not None else 'nothing'))
+    print('{0:.1f}s elapsed, {1:.1f}s fetching, {2:.2f}s per command'.format(
+        time.time() - start,
+        sum(timings.values()),
+        sum(timings.values()) / len(timings),
     ))
+    for path in sorted(timings, key=timings.get, reverse=True)[:args.slowest]:
+        print('  {0:6.2f}s {1}'.format(timings[path], path))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -19,6 +19,7 @@ setup(
         'cachetools',
         'cryptography',
         'fauxfactory',
+        'futures; python_version < "3"',
         'inflector',
         # 'nailgun',
         'blinker',
@@ -14,33 +14,16 @@
 
 @Upstream: No
 """
-import json
-
 from robottelo import ssh
 from robottelo.cli import hammer
 from robottelo.decorators import bz_bug_is_open, tier1
-from robottelo.helpers import read_data_file
 from robottelo.test import CLITestCase
 from six import StringIO
 
-HAMMER_COMMANDS = json.loads(read_data_file('hammer_commands.json'))
-
 
 def _fetch_command_info(command):
     """Fetch command info from expected commands info dictionary."""
-    info = HAMMER_COMMANDS
-    if command != 'hammer':
-        found = []
-        parts = command.split(' ')[1:]  # exclude hammer
-        for part in parts:
-            for command in info['subcommands']:
-                if command['name'] == part:
-                    found.append(part)
-                    info = command
-                    break
-        if found != parts:
-            return None
-    return info
+    return hammer.hammer_commands.get(command)
 
 
 def _format_commands_diff(commands_diff):
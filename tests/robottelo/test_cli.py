@@ -1,14 +1,28 @@
 import six
+import threading
+import time
 import unittest2
 
 from functools import partial
 from robottelo.cli.base import (
     Base,
+    CLIBulkResult,
     CLIReturnCodeError,
     CLIError,
     CLIBaseError,
-    CLIDataBaseError
+    CLIDataBaseError,
+    HammerCommand,
+    run_many,
 )
+from robottelo.cli.factory import (
+    CLIFactoryError,
+    _still_exists,
+    create_object,
+    make_many,
+)
+from robottelo.cli.repository import Repository
+from robottelo.cli.syncplan import SyncPlan
+from robottelo.ssh import SSHCommandResult
 
 if six.PY2:
     import mock
@@ -22,19 +36,23 @@ class CLIClass(Base):
     foreman_admin_password = 'adminpassword'
 
 
+class CommandClass(Base):
+    """Class used for the command construction tests"""
+    command_base = 'basecommand'
+
+
 class BaseCliTestCase(unittest2.TestCase):
     """Tests for the Base cli class"""
 
     def test_construct_command(self):
         """_construct_command builds a command using flags and arguments"""
-        Base.command_base = 'basecommand'
-        Base.command_sub = 'subcommand'
-        command_parts = Base._construct_command({
+        command = CommandClass._construct_command({
             u'flag-one': True,
             u'flag-two': False,
             u'argument': u'value',
             u'ommited-arg': None,
-        }).split()
+        }, 'subcommand')
+        command_parts = command.split()
 
         self.assertIn(u'basecommand', command_parts)
         self.assertIn(u'subcommand', command_parts)
@@ -42,6 +60,58 @@ class BaseCliTestCase(unittest2.TestCase):
         self.assertIn(u'--argument="value"', command_parts)
         self.assertNotIn(u'--flag-two', command_parts)
         self.assertEqual(len(command_parts), 4)
+        self.assertIsInstance(command, HammerCommand)
+        self.assertEqual(command.base, 'basecommand')
+        self.assertEqual(command.sub, 'subcommand')
+        self.assertEqual(
+            command.options,
+            ((u'argument', u'value'), (u'flag-one', True))
+        )
+        self.assertIsNone(CommandClass.command_sub)
+
+    def test_construct_command_default_sub(self):
+        """_construct_command uses ``command_sub`` when no subcommand is
+        passed
+        """
+        class DefaultSubClass(CommandClass):
+            command_sub = 'defaultsub'
+
+        self.assertEqual(
+            DefaultSubClass._construct_command({u'id': 1}),
+            u'basecommand defaultsub --id="1"'
+        )
+
+    @mock.patch('robottelo.cli.base.Base.execute')
+    def test_concurrent_commands(self, execute):
+        """Concurrent calls on the same class run their own subcommands"""
+        barrier = threading.Barrier(2) if six.PY3 else None
+        commands = []
+
+        def record(command, **kwargs):
+            if barrier is not None:
+                barrier.wait(timeout=5)
+            commands.append(command)
+            return []
+
+        execute.side_effect = record
+        threads = [
+            threading.Thread(target=CommandClass.delete, args=({'id': 1},)),
+            threading.Thread(
+                target=CommandClass.set_parameter, args=({'id': 1},)),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(
+            sorted(command.sub for command in commands),
+            ['delete', 'set-parameter']
+        )
+        self.assertEqual(
+            sorted(commands),
+            [u'basecommand delete --id="1"',
+             u'basecommand set-parameter --id="1"']
+        )
 
     def test_username_password_parameters_lookup(self):
         """Username and password returned are the parameters"""
@@ -112,6 +182,19 @@ class BaseCliTestCase(unittest2.TestCase):
         """
         self.assert_response_error(CLIReturnCodeError)
 
+    def test_handle_response_error_command(self):
+        """Check the error describes the command run"""
+        response = mock.Mock()
+        response.return_code = 1
+        response.stderr = [u'some error']
+        command = CommandClass._construct_command({}, 'synchronize')
+        with self.assertRaises(CLIReturnCodeError) as context:
+            CommandClass._handle_response(response, command=command)
+        self.assertIn(
+            u'Command "basecommand synchronize" finished',
+            context.exception.msg
+        )
+
     def test_handle_data_base_response_error(self):
         """Check handle_response raise ``CLIDataBaseError`` when
         return_code is not 0 and error is related to DB error.
@@ -156,14 +239,14 @@ class BaseCliTestCase(unittest2.TestCase):
     @mock.patch('robottelo.cli.base.Base.execute')
     @mock.patch('robottelo.cli.base.Base._construct_command')
     def test_add_operating_system(self, construct, execute):
-        """Check command_sub edited when executing add_operating_system"""
+        """Check subcommand passed when executing add_operating_system"""
         options = {u'foo': u'bar'}
-        self.assertNotEqual('add-operatingsystem', Base.command_sub)
         self.assertEqual(
             execute.return_value,
             Base.add_operating_system(options)
         )
-        self.assertEqual('add-operatingsystem', Base.command_sub)
+        construct.assert_called_once_with(options, 'add-operatingsystem')
+        self.assertIsNone(Base.command_sub)
         construct.called_once_with(options)
         execute.called_once_with(construct.return_value)
 
@@ -176,7 +259,7 @@ class BaseCliTestCase(unittest2.TestCase):
             execute.return_value,
             Base.create()
         )
-        self.assertEqual('create', Base.command_sub)
+        self.assertEqual(construct.call_args[0][1], 'create')
         construct.called_once_with({})
         execute.called_once_with(construct.return_value, output_format='csv')
 
@@ -191,7 +274,7 @@ class BaseCliTestCase(unittest2.TestCase):
             execute.return_value,
             Base.create()
         )
-        self.assertEqual('create', Base.command_sub)
+        self.assertEqual(construct.call_args[0][1], 'create')
         construct.called_once_with({})
         execute.called_once_with(construct.return_value, output_format='csv')
         self.assertFalse(info.called)
@@ -210,7 +293,7 @@ class BaseCliTestCase(unittest2.TestCase):
             execute.return_value,
             Base.create()
         )
-        self.assertEqual('create', Base.command_sub)
+        self.assertEqual(construct.call_args[0][1], 'create')
         construct.called_once_with({})
         execute.called_once_with(construct.return_value, output_format='csv')
         info.called_once_with({'id': 'foo'})
@@ -229,7 +312,7 @@ class BaseCliTestCase(unittest2.TestCase):
             execute.return_value,
             Base.create({'organization-id': 'org-id'})
         )
-        self.assertEqual('create', Base.command_sub)
+        self.assertEqual(construct.call_args[0][1], 'create')
         construct.called_once_with({})
         execute.called_once_with(construct.return_value, output_format='csv')
         info.called_once_with({'id': 'foo', 'organization-id': 'org-id'})
@@ -246,10 +329,118 @@ class BaseCliTestCase(unittest2.TestCase):
         ]
         Base.command_requires_org = True
         self.assertRaises(CLIError, Base.create)
-        self.assertEqual('create', Base.command_sub)
+        self.assertEqual(construct.call_args[0][1], 'create')
         construct.called_once_with({})
         execute.called_once_with(construct.return_value, output_format='csv')
 
+    @mock.patch('robottelo.cli.base.ssh.command_batch')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_create_single_round_trip(self, settings, command_batch):
+        """Check create and info are chained on a single round trip"""
+        settings.locale = 'en_US'
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        command_batch.return_value = [
+            SSHCommandResult.from_channel_output(
+                b'Message,Id,Name\nCreated,42,foo\n', b'', 0),
+            SSHCommandResult.from_channel_output(
+                b'Id:   42\nName: foo\n', b'', 0),
+        ]
+
+        class OrgClass(CommandClass):
+            command_requires_org = True
+
+        self.assertEqual(
+            OrgClass.create(
+                {u'name': u'foo', u'organization-id': 1},
+                single_round_trip=True
+            ),
+            {u'id': u'42', u'name': u'foo'}
+        )
+        cmds, = command_batch.call_args[0]
+        self.assertEqual(len(cmds), 2)
+        self.assertIn(
+            u'hammer -v -u admin -p password --output=csv basecommand create',
+            cmds[0]
+        )
+        self.assertIn(
+            u'basecommand info --id="$create_id" --organization-id="1"',
+            cmds[1]
+        )
+        self.assertTrue(command_batch.call_args[1]['stop_on_failure'])
+
+    @mock.patch('robottelo.ssh.uuid.uuid4')
+    @mock.patch('robottelo.ssh.connection_pool')
+    @mock.patch('robottelo.ssh.settings')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_create_single_round_trip_batch(
+            self, settings, ssh_settings, pool, uuid4):
+        """Check the single round trip script is run by command_batch with
+        non-ASCII options
+        """
+        settings.locale = 'en_US'
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        uuid4.return_value.hex = 'abc'
+        connection = pool.connection.return_value.__enter__.return_value
+        stdout, stderr = mock.Mock(), mock.Mock()
+        stdout.read.return_value = (
+            u'Message,Id,Name\nCreated,42,caf\xe9\n'
+            u'\nROBOTTELO-BATCH-abc 0 0\n'
+            u'Id:   42\nName: caf\xe9\n'
+            u'\nROBOTTELO-BATCH-abc 1 0\n'
+        ).encode('utf-8')
+        stderr.read.return_value = (
+            b'\nROBOTTELO-BATCH-abc 0\n\nROBOTTELO-BATCH-abc 1\n')
+        connection.exec_command.return_value = (None, stdout, stderr)
+
+        class NoOrgClass(CommandClass):
+            command_requires_org = False
+
+        self.assertEqual(
+            NoOrgClass.create({u'name': u'caf\xe9'}, single_round_trip=True),
+            {u'id': u'42', u'name': u'caf\xe9'}
+        )
+        script = connection.exec_command.call_args[0][0]
+        self.assertIn(u'basecommand create --name="caf\xe9"', script)
+
+    @mock.patch('robottelo.cli.base.Base.info')
+    @mock.patch('robottelo.cli.base.ssh.command_batch')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_create_single_round_trip_info_failure(
+            self, settings, command_batch, info):
+        """Check info runs again when it failed on the single round trip"""
+        command_batch.return_value = [
+            SSHCommandResult.from_channel_output(
+                b'Message,Id,Name\nCreated,42,foo\n', b'', 0),
+            SSHCommandResult.from_channel_output(b'', b'', 1),
+        ]
+        info.return_value = {u'id': u'42'}
+
+        class NoOrgClass(CommandClass):
+            command_requires_org = False
+
+        self.assertEqual(
+            NoOrgClass.create({u'name': u'foo'}, single_round_trip=True),
+            info.return_value
+        )
+        info.assert_called_once_with({u'id': u'42'})
+
+    @mock.patch('robottelo.cli.base.ssh.command_batch')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_create_single_round_trip_error(self, settings, command_batch):
+        """Check create errors are raised on the single round trip"""
+        command_batch.return_value = [
+            SSHCommandResult.from_channel_output(b'', b'invalid name', 65),
+        ]
+
+        class NoOrgClass(CommandClass):
+            command_requires_org = False
+
+        with self.assertRaises(CLIReturnCodeError) as context:
+            NoOrgClass.create({u'name': u''}, single_round_trip=True)
+        self.assertIn(u'basecommand create', context.exception.msg)
+
     def assert_cmd_execution(
             self, construct, execute, base_method, cmd_sub,
             ignore_stderr=False, **base_method_kwargs):
@@ -258,7 +449,7 @@ class BaseCliTestCase(unittest2.TestCase):
             execute.return_value,
             base_method(**base_method_kwargs)
         )
-        self.assertEqual(cmd_sub, Base.command_sub)
+        self.assertEqual(construct.call_args[0][1], cmd_sub)
         construct.called_once_with({})
         execute.called_once_with(
             construct.return_value, ignore_stderr=ignore_stderr
@@ -290,6 +481,8 @@ class BaseCliTestCase(unittest2.TestCase):
         """Check excuted build ssh method and returns raw response"""
         settings.locale = 'en_US'
         settings.performance = False
+        settings.hammer_sessions = False
+        settings.hammer_shell = False
         settings.server.admin_username = 'admin'
         settings.server.admin_password = 'password'
         response = Base.execute('some_cmd', return_raw_response=True)
@@ -301,6 +494,56 @@ class BaseCliTestCase(unittest2.TestCase):
         )
         self.assertIs(response, command.return_value)
 
+    @mock.patch('robottelo.cli.base.ssh.stream_command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_stream(self, settings, stream_command):
+        """Check execute_stream parses the rows while streaming"""
+        settings.locale = 'en_US'
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        stream = stream_command.return_value
+        stream.__iter__.return_value = iter([
+            u'[ INFO 2016-01-01] request',
+            u'Id,Name',
+            u'1,""',
+            u'2,second',
+        ])
+        stream.return_code = 0
+        stream.stderr = u''
+        rows = Base.execute_stream('some_cmd', records=True)
+        self.assertFalse(stream_command.called)
+        self.assertEqual(
+            [row._asdict() for row in rows],
+            [{u'id': u'1', u'name': u''}, {u'id': u'2', u'name': u'second'}]
+        )
+        stream_command.assert_called_once_with(
+            u'LANG=en_US  hammer -v -u admin -p password --output=csv '
+            u'some_cmd'.encode('utf-8')
+        )
+        stream.close.assert_called_once_with()
+
+    @mock.patch('robottelo.cli.base.ssh.stream_command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_stream_error(self, settings, stream_command):
+        """Check execute_stream raises once a failed output is consumed"""
+        stream = stream_command.return_value
+        stream.__iter__.return_value = iter([])
+        stream.return_code = 1
+        stream.stderr = u'error'
+        with self.assertRaises(CLIReturnCodeError):
+            list(CommandClass.execute_stream(
+                CommandClass._construct_command(None, 'list')))
+
+    @mock.patch('robottelo.cli.base.Base.execute_stream')
+    @mock.patch('robottelo.cli.base.Base._construct_command')
+    def test_list_stream(self, construct, execute_stream):
+        """Check list_stream streams a single list command"""
+        rows = Base.list_stream({'organization-id': 1}, records=True)
+        construct.assert_called_once_with({'organization-id': 1}, 'list')
+        execute_stream.assert_called_once_with(
+            construct.return_value, records=True)
+        self.assertIs(rows, execute_stream.return_value)
+
     @mock.patch('robottelo.cli.base.Base._handle_response')
     @mock.patch('robottelo.cli.base.ssh.command')
     @mock.patch('robottelo.cli.base.settings')
@@ -308,6 +551,7 @@ class BaseCliTestCase(unittest2.TestCase):
         """Check excuted build ssh method and delegate response handling"""
         settings.locale = 'en_US'
         settings.performance.timer_hammer = True
+        settings.hammer_sessions = False
         settings.server.admin_username = 'admin'
         settings.server.admin_password = 'password'
         response = Base.execute('some_cmd', output_format='json')
@@ -322,7 +566,8 @@ class BaseCliTestCase(unittest2.TestCase):
         )
         handle_resp.assert_called_once_with(
             command.return_value,
-            ignore_stderr=None
+            ignore_stderr=None,
+            command='some_cmd'
         )
         self.assertIs(response, handle_resp.return_value)
 
@@ -380,6 +625,42 @@ class BaseCliTestCase(unittest2.TestCase):
         )
         parse.called_once_with('some_response')
 
+    @mock.patch('robottelo.cli.base.hammer.parse_info')
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.Base.execute')
+    @mock.patch('robottelo.cli.base.Base._construct_command')
+    def test_info_json_output_format_setting(
+            self, construct, execute, settings, parse):
+        """Check info reads the JSON output only when asked for, as it has a
+        different structure
+        """
+        settings.hammer_output_format = 'json'
+        self.assertIs(
+            Base.info({'organization-id': 1}), parse.return_value)
+        execute.assert_called_once_with(
+            command=construct.return_value, output_format=None)
+        execute.reset_mock()
+        parse.reset_mock()
+        self.assertIs(
+            Base.info({'organization-id': 1}, output_format='json'),
+            execute.return_value
+        )
+        execute.assert_called_once_with(
+            command=construct.return_value, output_format='json')
+        parse.assert_not_called()
+
+    @mock.patch('robottelo.cli.base.Base.execute')
+    def test_info_overrides_output_format(self, execute):
+        """Check the info overrides forward the output format"""
+        for cli_class in (Repository, SyncPlan):
+            execute.reset_mock()
+            self.assertIs(
+                cli_class.info({'id': 1}, output_format='json'),
+                execute.return_value
+            )
+            self.assertEqual(
+                execute.call_args[1]['output_format'], 'json')
+
     @mock.patch('robottelo.cli.base.Base.command_requires_org')
     def test_list_requires_organization_id(self, _):
         """Check list raises CLIError with organization-id is not present in
@@ -390,14 +671,85 @@ class BaseCliTestCase(unittest2.TestCase):
     @mock.patch('robottelo.cli.base.Base.execute')
     @mock.patch('robottelo.cli.base.Base._construct_command')
     def test_list_with_default_per_page(self, construct, execute):
-        """Check list method set per_page as 1000 by default"""
+        """Check list method set per_page as 10000 by default"""
+        execute.return_value = [{u'id': 1}]
         self.assertEquals(
             execute.return_value,
             Base.list(options={'organization-id': 1})
         )
-        self.assertEqual('list', Base.command_sub)
-        construct.called_once_with({'per-page': 1000})
-        execute.called_once_with(construct.return_value, output_format='csv')
+        construct.assert_called_once_with(
+            {'organization-id': 1, u'per-page': 10000}, 'list')
+        execute.assert_called_once_with(
+            construct.return_value, output_format='csv')
+
+    @mock.patch('robottelo.cli.base.settings')
+    @mock.patch('robottelo.cli.base.Base.execute')
+    @mock.patch('robottelo.cli.base.Base._construct_command')
+    def test_list_json_output_format(self, construct, execute, settings):
+        """Check list reads the configured output format unless one is given
+        """
+        settings.hammer_output_format = 'json'
+        execute.return_value = []
+        self.assertEqual(Base.list(options={'organization-id': 1}), [])
+        execute.assert_called_once_with(
+            construct.return_value, output_format='json')
+        execute.reset_mock()
+        Base.list({'organization-id': 1}, per_page=False, output_format='csv')
+        execute.assert_called_once_with(
+            construct.return_value, output_format='csv')
+
+    @mock.patch('robottelo.cli.base.Base.execute')
+    @mock.patch('robottelo.cli.base.Base._construct_command')
+    def test_list_iter(self, construct, execute):
+        """Check list_iter reads the pages lazily"""
+        pages = [[{u'id': 1}, {u'id': 2}], [{u'id': 3}, {u'id': 4}],
+                 [{u'id': 5}]]
+        execute.side_effect = pages
+        records = Base.list_iter({'organization-id': 1}, page_size=2)
+        self.assertFalse(execute.called)
+        self.assertEqual(next(records), {u'id': 1})
+        self.assertEqual(execute.call_count, 1)
+        self.assertEqual(
+            list(records), [{u'id': 2}, {u'id': 3}, {u'id': 4}, {u'id': 5}])
+        self.assertEqual(
+            [call[0][0]['page'] for call in construct.call_args_list],
+            [1, 2, 3]
+        )
+        self.assertEqual(construct.call_args[0][0][u'per-page'], 2)
+
+    @mock.patch('robottelo.cli.base.Base.execute')
+    @mock.patch('robottelo.cli.base.Base._construct_command')
+    def test_list_iter_page_ignored(self, construct, execute):
+        """Check list_iter stops when the command ignores the page"""
+        execute.return_value = [{u'id': 1}, {u'id': 2}]
+        for prefetch in (False, True):
+            execute.reset_mock()
+            records = Base.list_iter(
+                {'organization-id': 1}, page_size=2, prefetch=prefetch)
+            self.assertEqual(list(records), [{u'id': 1}, {u'id': 2}])
+            self.assertEqual(execute.call_count, 2)
+
+    @mock.patch('robottelo.cli.base.Base.execute')
+    @mock.patch('robottelo.cli.base.Base._construct_command')
+    def test_list_iter_max_pages(self, construct, execute):
+        """Check list_iter reads up to max_pages pages"""
+        execute.side_effect = [
+            [{u'id': 1}, {u'id': 2}], [{u'id': 3}, {u'id': 4}]]
+        records = Base.list_iter(
+            {'organization-id': 1}, page_size=2, max_pages=1)
+        self.assertEqual(list(records), [{u'id': 1}, {u'id': 2}])
+        self.assertEqual(execute.call_count, 1)
+
+    @mock.patch('robottelo.cli.base.Base.execute')
+    @mock.patch('robottelo.cli.base.Base._construct_command')
+    def test_list_iter_prefetch(self, construct, execute):
+        """Check list_iter reads the next page while yielding a full one"""
+        execute.side_effect = [[{u'id': 1}, {u'id': 2}], []]
+        records = Base.list_iter(
+            {'organization-id': 1}, page_size=2, prefetch=True)
+        self.assertEqual(next(records), {u'id': 1})
+        self.assertEqual(list(records), [{u'id': 2}])
+        self.assertEqual(execute.call_count, 2)
 
     @mock.patch('robottelo.cli.base.Base.execute')
     @mock.patch('robottelo.cli.base.Base._construct_command')
@@ -506,3 +858,99 @@ class CLIBaseErrorTestCase(unittest2.TestCase):
         """Check if message is exposed to assertRaisesRegexp"""
         with self.assertRaisesRegexp(CLIBaseError, u'msg'):
             raise CLIBaseError(1, u'stderr', u'msg')
+
+
+class RunManyTestCase(unittest2.TestCase):
+    """Tests for :func:`robottelo.cli.base.run_many`."""
+
+    def test_order_and_errors(self):
+        """Results keep the arguments order and failures are per item"""
+        def func(value):
+            time.sleep(0.01 * (5 - value))
+            if value % 2:
+                raise CLIError(u'odd {0}'.format(value))
+            return value * 10
+
+        results = run_many(func, range(5), concurrency=3)
+        self.assertIsInstance(results, CLIBulkResult)
+        self.assertEqual(results, [0, None, 20, None, 40])
+        self.assertEqual(results.failed, [1, 3])
+        self.assertEqual(results.succeeded, [0, 2, 4])
+        self.assertEqual(str(results.errors[3]), u'odd 3')
+
+    def test_empty(self):
+        """Nothing is run without arguments"""
+        self.assertEqual(run_many(mock.Mock(), []), [])
+
+    @mock.patch('robottelo.cli.base.Base.create')
+    def test_create_many(self, create):
+        """create_many creates each record"""
+        create.side_effect = lambda options, **kwargs: dict(options, id=1)
+        results = Base.create_many(
+            [{u'name': u'a'}, {u'name': u'b'}], single_round_trip=True)
+        self.assertEqual(
+            results, [{u'name': u'a', 'id': 1}, {u'name': u'b', 'id': 1}])
+        create.assert_any_call({u'name': u'a'}, single_round_trip=True)
+
+    def test_without_org(self):
+        """_without_org does not change the class"""
+        class OrgClass(CommandClass):
+            command_requires_org = True
+
+        without_org = OrgClass._without_org()
+        self.assertFalse(without_org.command_requires_org)
+        self.assertTrue(OrgClass.command_requires_org)
+        self.assertTrue(issubclass(without_org, OrgClass))
+        self.assertEqual(without_org.__name__, 'OrgClass')
+
+
+class MakeManyTestCase(unittest2.TestCase):
+    """Tests for :func:`robottelo.cli.factory.make_many`."""
+
+    def test_shared_options(self):
+        """Every call gets its own copy of the options"""
+        make_fn = mock.Mock(side_effect=lambda options: options)
+        results = make_many(make_fn, 3, {u'organization-id': 1})
+        self.assertEqual(results, [{u'organization-id': 1}] * 3)
+        self.assertEqual(len(set(id(result) for result in results)), 3)
+
+    def test_options_list(self):
+        """Each call gets its options and failures are reported"""
+        def make_fn(options):
+            if options[u'name'] == u'bad':
+                raise CLIFactoryError(u'Failed to create')
+            return options
+
+        results = make_many(
+            make_fn, 2, [{u'name': u'bad'}, {u'name': u'good'}])
+        self.assertEqual(results, [None, {u'name': u'good'}])
+        self.assertIsInstance(results.errors[0], CLIFactoryError)
+        with self.assertRaises(CLIFactoryError):
+            make_many(make_fn, 3, [{u'name': u'good'}])
+
+
+@mock.patch('robottelo.cli.factory.logger')
+class CreateObjectTestCase(unittest2.TestCase):
+    """Tests for :func:`robottelo.cli.factory.create_object`."""
+
+    def test_unknown_options(self, logger):
+        """Options not accepted by hammer are reported"""
+        cli_object = mock.Mock(command_base=u'organization')
+        cli_object.create.return_value = {u'id': u'1'}
+        create_object(cli_object, {u'name': None}, {u'nmae': u'org'})
+        self.assertIn(u'nmae', logger.warning.call_args[0][1])
+        logger.warning.reset_mock()
+        create_object(cli_object, {u'name': None}, {u'name': u'org'})
+        logger.warning.assert_not_called()
+
+    def test_still_exists(self, logger):
+        """Cached objects are read by id to check they still exist"""
+        cli_object = mock.Mock(command_requires_org=True)
+        validate = _still_exists(cli_object)
+        self.assertTrue(validate({u'id': u'1'}, {u'organization-id': 2}))
+        cli_object.info.assert_called_once_with(
+            {u'id': u'1', u'organization-id': 2})
+        cli_object.info.side_effect = CLIReturnCodeError(
+            128, u'not found', u'not found')
+        self.assertFalse(validate({u'id': u'1'}, {u'organization-id': 2}))
+        self.assertTrue(validate({u'id': u'1'}, {}))
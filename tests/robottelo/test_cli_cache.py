@@ -0,0 +1,169 @@
+"""Tests for module ``robottelo.cli.cache``."""
+import six
+import unittest2
+
+from robottelo.cli.base import Base
+from robottelo.cli.cache import CLICache, cli_cache
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class CacheClass(Base):
+    """Class used to run cached commands"""
+    command_base = 'cached'
+    foreman_user = 'admin'
+    foreman_password = 'changeme'
+
+
+class CLICacheTestCase(unittest2.TestCase):
+    """Tests for :class:`robottelo.cli.cache.CLICache`."""
+
+    def setUp(self):
+        self.cache = CLICache()
+        self.key = ('org', 'info', ((u'id', u'1'),), None, 'admin')
+
+    def test_get_set(self):
+        """Cached results are copies counted as hits"""
+        self.assertEqual(self.cache.get(self.key), (False, None))
+        result = {u'id': u'1', u'labels': [u'a']}
+        self.cache.set(self.key, result, self.cache.generation('org'))
+        result[u'labels'].append(u'b')
+        hit, cached = self.cache.get(self.key)
+        self.assertTrue(hit)
+        self.assertEqual(cached, {u'id': u'1', u'labels': [u'a']})
+        cached[u'id'] = u'2'
+        self.assertEqual(self.cache.get(self.key)[1][u'id'], u'1')
+        stats = self.cache.stats()
+        self.assertEqual(stats['org']['hits'], 2)
+        self.assertEqual(stats['org']['misses'], 1)
+        self.assertAlmostEqual(stats['total']['hit-ratio'], 2.0 / 3)
+
+    def test_invalidate(self):
+        """Invalidating a base command drops only its results"""
+        other_key = ('host', 'list', (), 'csv', 'admin')
+        self.cache.set(self.key, {}, self.cache.generation('org'))
+        self.cache.set(other_key, [], self.cache.generation('host'))
+        self.cache.invalidate('org')
+        self.assertFalse(self.cache.get(self.key)[0])
+        self.assertTrue(self.cache.get(other_key)[0])
+        self.assertEqual(self.cache.stats()['org']['invalidations'], 1)
+        self.cache.invalidate()
+        self.assertFalse(self.cache.get(other_key)[0])
+
+    def test_stale_result_not_cached(self):
+        """A result read before an invalidation is not cached"""
+        generation = self.cache.generation('org')
+        self.cache.invalidate('org')
+        self.cache.set(self.key, {}, generation)
+        self.assertFalse(self.cache.get(self.key)[0])
+        generation = self.cache.generation('org')
+        self.cache.clear()
+        self.cache.set(self.key, {}, generation)
+        self.assertFalse(self.cache.get(self.key)[0])
+
+    def test_max_entries(self):
+        """The least recently used results are dropped first"""
+        self.cache.max_entries = 2
+        keys = [('org', 'info', ((u'id', i),), None, 'admin')
+                for i in range(3)]
+        self.cache.set(keys[0], 0, self.cache.generation('org'))
+        self.cache.set(keys[1], 1, self.cache.generation('org'))
+        self.cache.get(keys[0])
+        self.cache.set(keys[2], 2, self.cache.generation('org'))
+        self.assertTrue(self.cache.get(keys[0])[0])
+        self.assertFalse(self.cache.get(keys[1])[0])
+        self.assertTrue(self.cache.get(keys[2])[0])
+
+    @mock.patch('robottelo.cli.cache.settings')
+    def test_scope(self, settings):
+        """The cache is active inside a scope and cleared at its end"""
+        settings.hammer_cache = 'none'
+        self.assertFalse(self.cache.active)
+        with self.cache.scope():
+            self.assertTrue(self.cache.active)
+            self.cache.set(self.key, {}, self.cache.generation('org'))
+        self.assertFalse(self.cache.active)
+        self.assertFalse(self.cache.get(self.key)[0])
+        settings.hammer_cache = 'test'
+        self.assertTrue(self.cache.active)
+
+
+@mock.patch('robottelo.cli.base.Base._execute')
+class ExecuteCacheTestCase(unittest2.TestCase):
+    """Tests for the cache of :meth:`robottelo.cli.base.Base.execute`."""
+
+    def setUp(self):
+        cli_cache.reset()
+
+    def tearDown(self):
+        cli_cache.reset()
+
+    def test_not_active(self, execute):
+        """Nothing is cached when the cache is not active"""
+        command = CacheClass._construct_command({'id': 1}, 'info')
+        CacheClass.execute(command)
+        CacheClass.execute(command)
+        self.assertEqual(execute.call_count, 2)
+
+    def test_read_cached(self, execute):
+        """Reads with the same options, output format and user are cached
+        """
+        execute.return_value = {u'id': u'1'}
+        with cli_cache.scope():
+            self.assertEqual(
+                CacheClass.execute(CacheClass._construct_command(
+                    {'id': 1, 'name': 'a'}, 'info')),
+                {u'id': u'1'}
+            )
+            self.assertEqual(
+                CacheClass.execute(CacheClass._construct_command(
+                    {'name': 'a', 'id': '1'}, 'info')),
+                {u'id': u'1'}
+            )
+            self.assertEqual(execute.call_count, 1)
+            CacheClass.execute(
+                CacheClass._construct_command({'id': 1, 'name': 'a'}, 'info'),
+                output_format='json'
+            )
+            CacheClass.with_user('other', 'pass').execute(
+                CacheClass._construct_command({'id': 1, 'name': 'a'}, 'info'))
+            self.assertEqual(execute.call_count, 3)
+
+    def test_write_invalidates(self, execute):
+        """Other subcommands invalidate the results of their base command"""
+        with cli_cache.scope():
+            info = CacheClass._construct_command({'id': 1}, 'info')
+            CacheClass.execute(info)
+            CacheClass.execute(
+                CacheClass._construct_command({'id': 1}, 'add-label'))
+            CacheClass.execute(info)
+            self.assertEqual(execute.call_count, 3)
+            self.assertEqual(
+                cli_cache.stats()['cached'],
+                {'hits': 0, 'misses': 2, 'invalidations': 1,
+                 'hit-ratio': 0.0}
+            )
+
+    def test_failed_write_invalidates(self, execute):
+        """Failed writes invalidate the results too"""
+        with cli_cache.scope():
+            info = CacheClass._construct_command({'id': 1}, 'info')
+            CacheClass.execute(info)
+            execute.side_effect = RuntimeError
+            with self.assertRaises(RuntimeError):
+                CacheClass.execute(
+                    CacheClass._construct_command({'id': 1}, 'delete'))
+            execute.side_effect = None
+            CacheClass.execute(info)
+            self.assertEqual(execute.call_count, 3)
+
+    def test_raw_response_not_cached(self, execute):
+        """Raw responses are not cached"""
+        with cli_cache.scope():
+            info = CacheClass._construct_command({'id': 1}, 'info')
+            CacheClass.execute(info, return_raw_response=True)
+            CacheClass.execute(info, return_raw_response=True)
+            self.assertEqual(execute.call_count, 2)
@@ -0,0 +1,169 @@
+"""Tests for module ``robottelo.cli.rest``."""
+import six
+import unittest2
+
+from concurrent.futures import Future
+from robottelo.cli import rest
+from robottelo.cli.base import CLIReturnCodeError
+from robottelo.cli.task_waiter import TaskFailedError
+from robottelo.cli.org import Org
+from robottelo.cli.product import Product
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+def response(status_code=200, body=None):
+    """Return a mocked ``requests`` response."""
+    resp = mock.Mock()
+    resp.ok = status_code < 400
+    resp.status_code = status_code
+    resp.content = b'{}' if body is not None else b''
+    resp.json.return_value = body
+    resp.text = u'{0}'.format(body)
+    return resp
+
+
+class RESTTestCase(unittest2.TestCase):
+    """Base class patching the settings and the HTTP session."""
+
+    def setUp(self):
+        patcher = mock.patch('robottelo.cli.rest.settings')
+        self.settings = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.settings.cli_fast_setup = False
+        self.settings.server.get_url.return_value = u'https://example.com'
+        self.settings.server.get_credentials.return_value = ('admin', 'pass')
+        patcher = mock.patch('robottelo.cli.rest.requests.Session')
+        self.session = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch(
+            'robottelo.cli.base.rest_client', rest.RESTClient())
+        self.client = patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class RESTClientTestCase(RESTTestCase):
+    """Tests for :class:`robottelo.cli.rest.RESTClient`."""
+
+    def test_entity(self):
+        """Options are translated to the entity fields"""
+        entity = self.client.entity(u'repository', {
+            u'name': u'repo',
+            u'product-id': u'5',
+            u'publish-via-http': u'true',
+            u'url': None,
+            u'gpg-key-id': False,
+        })
+        payload = entity.create_payload()
+        self.assertEqual(payload[u'name'], u'repo')
+        self.assertEqual(payload[u'product_id'], u'5')
+        self.assertIs(payload[u'unprotected'], True)
+        self.assertNotIn(u'url', payload)
+
+    def test_entity_unsupported(self):
+        """Options without API field or unknown to hammer are rejected"""
+        for base, options in (
+                (u'product', {u'organization': u'org'}),
+                (u'product', {u'unknown-option': u'1'}),
+                (u'host', {u'name': u'host'})):
+            with self.assertRaises(rest.RESTUnsupportedError):
+                self.client.entity(base, options)
+
+    def test_create(self):
+        """Created records are normalized like the hammer ones"""
+        self.session.request.return_value = response(body={
+            u'id': 5, u'name': u'org', u'created_at': u'today',
+            u'parent': {u'full_name': u'top'}})
+        record = self.client.create(u'organization', {u'name': u'org'})
+        self.assertEqual(record, {
+            u'id': u'5', u'name': u'org', u'created-at': u'today',
+            u'parent': {u'full-name': u'top'}})
+        method, url = self.session.request.call_args[0]
+        self.assertEqual(method, 'POST')
+        self.assertEqual(
+            url, u'https://example.com/katello/api/v2/organizations')
+        self.assertEqual(
+            self.session.request.call_args[1]['json'][u'name'], u'org')
+
+    def test_create_error(self):
+        """API errors raise CLIReturnCodeError"""
+        self.session.request.return_value = response(422, {u'error': u'x'})
+        with self.assertRaises(CLIReturnCodeError) as context:
+            self.client.create(u'organization', {u'name': u'org'})
+        self.assertEqual(context.exception.return_code, 65)
+
+    def test_delete(self):
+        """Records are deleted by id"""
+        self.session.request.return_value = response()
+        self.client.delete(u'product', {u'id': 3, u'organization-id': 1})
+        self.assertEqual(
+            self.session.request.call_args[0],
+            ('DELETE', u'https://example.com/katello/api/v2/products/3')
+        )
+        with self.assertRaises(rest.RESTUnsupportedError):
+            self.client.delete(u'product', {u'name': u'product'})
+
+    @mock.patch('robottelo.cli.rest.task_waiter')
+    def test_delete_task(self, waiter):
+        """Deletions run as tasks are waited for"""
+        task = {u'id': u'abc', u'label': u'Actions::Katello::Product::Destroy',
+                u'state': u'planned', u'result': u'pending'}
+        self.session.request.return_value = response(body=task)
+        done = Future()
+        done.set_result(dict(task, state=u'stopped', result=u'success'))
+        waiter.wait.return_value = done
+        record = self.client.delete(u'product', {u'id': 3})
+        waiter.wait.assert_called_once_with(u'abc')
+        self.assertEqual(record[u'state'], u'stopped')
+        failed = Future()
+        failed.set_exception(TaskFailedError(dict(task, result=u'error')))
+        waiter.wait.return_value = failed
+        with self.assertRaises(CLIReturnCodeError):
+            self.client.delete(u'product', {u'id': 3})
+
+
+@mock.patch('robottelo.cli.base.Base.execute')
+class FastSetupTestCase(RESTTestCase):
+    """Tests for the fast setup mode of the CLI classes."""
+
+    def test_disabled(self, execute):
+        """Records are created with hammer unless fast setup is enabled"""
+        execute.return_value = []
+        Org.create({u'name': u'org'})
+        execute.assert_called_once()
+        self.session.request.assert_not_called()
+
+    @mock.patch('robottelo.cli.base.Base.info')
+    def test_create(self, info, execute):
+        """Records are created through the API in fast setup mode and read
+        back with hammer
+        """
+        self.session.request.return_value = response(body={
+            u'id': 5, u'organization': {u'id': 1, u'name': u'org'}})
+        info.return_value = {u'id': u'5', u'organization': u'org'}
+        with rest.fast_setup():
+            self.assertEqual(
+                Product.create({u'name': u'p', u'organization-id': 1}),
+                info.return_value
+            )
+        info.assert_called_once_with({u'id': u'5', u'organization-id': 1})
+        execute.assert_not_called()
+        self.settings.cli_fast_setup = True
+        Product.create({u'name': u'p', u'organization-id': 1})
+        with rest.fast_setup(False):
+            execute.return_value = []
+            Product.create({u'name': u'p', u'organization-id': 1})
+        self.assertEqual(self.session.request.call_count, 2)
+        self.assertEqual(info.call_count, 2)
+        execute.assert_called_once()
+
+    def test_fallback(self, execute):
+        """Options which can't be sent to the API run hammer"""
+        execute.return_value = []
+        with rest.fast_setup():
+            Product.create({u'name': u'p', u'organization': u'org'})
+        execute.assert_called_once()
+        self.session.request.assert_not_called()
@@ -1,5 +1,8 @@
 """Unit tests for :mod:`robottelo.decorators`."""
+import os
+import shutil
 import six
+import tempfile
 
 from fauxfactory import gen_integer
 from robottelo import decorators
@@ -155,36 +158,152 @@ class BzBugIsOpenTestCase(TestCase):
 class CacheableTestCase(TestCase):
     """Tests for :func:`robottelo.decorators.cacheable`."""
     def setUp(self):
-        self.object_cache_patcher = mock.patch.dict(
-            'robottelo.decorators.OBJECT_CACHE')
+        self.object_cache_patcher = mock.patch(
+            'robottelo.decorators.OBJECT_CACHE',
+            decorators.ObjectCache(max_entries=10, ttl=0, namespace='run'))
         self.object_cache = self.object_cache_patcher.start()
+        self.settings_patcher = mock.patch('robottelo.decorators.settings')
+        self.settings = self.settings_patcher.start()
+        self.settings.server.hostname = 'example.com'
+        self.settings.object_cache_dir = None
+        self.settings.object_cache_scope = 'session'
+        self.calls = []
 
         def make_foo(options):
-            return {'id': 42}
+            self.calls.append(options)
+            return {'id': len(self.calls)}
 
+        self.raw_make_foo = make_foo
         self.make_foo = decorators.cacheable(make_foo)
 
     def tearDown(self):
         self.object_cache_patcher.stop()
+        self.settings_patcher.stop()
 
     def test_build_cache(self):
         """Create a new object and add it to the cache."""
         obj = self.make_foo(cached=True)
-        self.assertEqual(decorators.OBJECT_CACHE, {'foo': {'id': 42}})
-        self.assertEqual(id(decorators.OBJECT_CACHE['foo']), id(obj))
+        self.assertEqual(self.object_cache.get(('foo', None)), (True, obj))
 
     def test_return_from_cache(self):
         """Return an already cached object."""
-        cache_obj = {'id': 42}
-        decorators.OBJECT_CACHE['foo'] = cache_obj
         obj = self.make_foo(cached=True)
-        self.assertEqual(id(cache_obj), id(obj))
+        self.assertIs(self.make_foo(cached=True), obj)
+        self.assertEqual(len(self.calls), 1)
 
     def test_create_and_not_add_to_cache(self):
         """Create a new object and not add it to the cache."""
         self.make_foo(cached=False)
-        self.assertNotIn('foo', decorators.OBJECT_CACHE)
-        self.assertEqual(decorators.OBJECT_CACHE, {})
+        self.assertEqual(self.object_cache.get(('foo', None)), (False, None))
+
+    def test_keyed_by_options(self):
+        """Objects are cached by normalized options"""
+        org_1 = self.make_foo({'organization-id': 1}, cached=True)
+        org_2 = self.make_foo({'organization-id': 2}, cached=True)
+        self.assertNotEqual(org_1, org_2)
+        self.assertIs(
+            self.make_foo(
+                {'organization-id': '1', 'name': None}, cached=True),
+            org_1
+        )
+        self.assertEqual(len(self.calls), 2)
+
+    def test_lru(self):
+        """The least recently used objects are dropped first"""
+        self.object_cache.max_entries = 2
+        first = self.make_foo({'name': 'a'}, cached=True)
+        self.make_foo({'name': 'b'}, cached=True)
+        self.make_foo({'name': 'a'}, cached=True)
+        self.make_foo({'name': 'c'}, cached=True)
+        self.assertIs(self.make_foo({'name': 'a'}, cached=True), first)
+        self.make_foo({'name': 'b'}, cached=True)
+        self.assertEqual(len(self.calls), 4)
+        self.assertEqual(self.object_cache.stats()['foo']['evictions'], 2)
+
+    def test_ttl(self):
+        """Objects expire after ttl seconds"""
+        self.object_cache.ttl = 10
+        with mock.patch('robottelo.decorators.time.time') as now:
+            now.return_value = 100
+            self.make_foo(cached=True)
+            now.return_value = 111
+            self.make_foo(cached=True)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.object_cache.stats()['foo']['expired'], 1)
+
+    def test_validate(self):
+        """Objects which do not exist anymore are made again"""
+        validate = mock.Mock(return_value=False)
+        make_foo = decorators.cacheable(validate=validate)(self.raw_make_foo)
+        make_foo({'name': 'a'}, cached=True)
+        make_foo({'name': 'a'}, cached=True)
+        validate.assert_called_once_with({'id': 1}, {'name': 'a'})
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.object_cache.stats()['foo']['stale'], 1)
+
+    def test_module_scope(self):
+        """Module objects are dropped when the module ends"""
+        self.object_cache.end_module('test_a')
+        obj = self.make_foo(cached='module')
+        self.assertIs(self.make_foo(cached='module'), obj)
+        self.object_cache.end_module('test_b')
+        self.assertIsNot(self.make_foo(cached='module'), obj)
+        self.assertEqual(len(self.calls), 2)
+        with self.assertRaises(ValueError):
+            self.make_foo(cached='unknown')
+
+    def shared_cache_dir(self):
+        """Return a temporary cache directory set on the settings."""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.settings.object_cache_dir = cache_dir
+        return cache_dir
+
+    def test_shared_session(self):
+        """Session objects are shared through the cache directory"""
+        self.shared_cache_dir()
+        obj = self.make_foo(cached=True)
+        self.make_foo(cached='worker')
+        other_process = decorators.ObjectCache(
+            max_entries=10, ttl=0, namespace='run')
+        self.assertEqual(other_process.get(('foo', None)), (True, obj))
+        self.assertEqual(
+            other_process.get(('foo', None), 'worker'), (False, None))
+        self.object_cache.invalidate(('foo', None))
+        other_process.clear()
+        self.assertEqual(other_process.get(('foo', None)), (False, None))
+
+    def test_shared_session_expired(self):
+        """Session objects read from the cache directory expire"""
+        self.shared_cache_dir()
+        other_process = decorators.ObjectCache(
+            max_entries=10, ttl=10, namespace='run')
+        with mock.patch('robottelo.decorators.time.time') as now:
+            now.return_value = 100
+            obj = self.make_foo(cached=True)
+            now.return_value = 105
+            self.assertEqual(other_process.get(('foo', None)), (True, obj))
+            other_process.clear()
+            now.return_value = 111
+            self.assertEqual(
+                other_process.get(('foo', None)), (False, None))
+        self.assertEqual(other_process.stats()['foo']['expired'], 1)
+
+    def test_shared_session_isolated(self):
+        """Session objects are not shared with other runs or servers"""
+        cache_dir = self.shared_cache_dir()
+        self.make_foo(cached=True)
+        other_run = decorators.ObjectCache(
+            max_entries=10, ttl=0, namespace='other-run')
+        self.assertEqual(other_run.get(('foo', None)), (False, None))
+        self.assertEqual(
+            decorators.ObjectCache().get(('foo', None)), (False, None))
+        self.settings.server.hostname = 'other.example.com'
+        same_run = decorators.ObjectCache(
+            max_entries=10, ttl=0, namespace='run')
+        self.assertEqual(same_run.get(('foo', None)), (False, None))
+        self.object_cache.remove_files()
+        self.assertEqual(os.listdir(cache_dir), [])
 
 
 class RmBugIsOpenTestCase(TestCase):
@@ -1,9 +1,14 @@
 # -*- encoding: utf-8 -*-
 """Tests for Robottelo's hammer helpers"""
+import io
+import json
+import os
 import unittest2
 
 from robottelo.cli import hammer
 
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
 
 class ParseCSVTestCase(unittest2.TestCase):
     """Tests for parsing CSV hammer output"""
@@ -38,6 +43,64 @@ class ParseCSVTestCase(unittest2.TestCase):
             ]
         )
 
+    def test_parse_csv_multiline_value(self):
+        """Quoted values keep their new lines"""
+        self.assertEqual(
+            hammer.parse_csv([u'Id,Description', u'1,"first', u'second"']),
+            [{u'id': u'1', u'description': u'first\nsecond'}]
+        )
+
+    def test_parse_csv_empty(self):
+        """An output without rows is parsed as an empty list"""
+        self.assertEqual(hammer.parse_csv([u'']), [])
+
+    def test_iter_csv(self):
+        """Rows are yielded while the lines are consumed"""
+        def lines():
+            yield u'Id,Name'
+            yield u'1,first'
+            yield u''
+            raise AssertionError('read past the first row')
+
+        rows = hammer.iter_csv(lines())
+        self.assertEqual(next(rows), {u'id': u'1', u'name': u'first'})
+
+    def test_iter_csv_records(self):
+        """Rows can be read as records"""
+        records = list(hammer.iter_csv(
+            [u'Id,Content View,Count', u'1,cv,3', u'2,other,4'],
+            records=True
+        ))
+        self.assertEqual(len(records), 2)
+        record = records[0]
+        self.assertIsInstance(record, hammer.CSVRecord)
+        self.assertIs(type(record), type(records[1]))
+        self.assertEqual(record, (u'1', u'cv', u'3'))
+        self.assertEqual(record[u'content-view'], u'cv')
+        self.assertEqual(record.content_view, u'cv')
+        self.assertEqual(record[0], u'1')
+        self.assertEqual(record.get(u'missing', u'default'), u'default')
+        # tuple methods are not shadowed by the column names
+        self.assertEqual(record.count(u'cv'), 1)
+        self.assertEqual(record[u'count'], u'3')
+        self.assertEqual(
+            record.keys(), [u'id', u'content-view', u'count'])
+        self.assertEqual(
+            record._asdict(), hammer.parse_csv([u'Id,Content View,Count',
+                                                u'1,cv,3'])[0]
+        )
+        with self.assertRaises(KeyError):
+            record[u'missing']
+        with self.assertRaises(AttributeError):
+            record.name = u'value'
+
+    def test_csv_record_type_cache(self):
+        """Outputs with the same columns share the record type"""
+        self.assertIs(
+            hammer.csv_record_type([u'id', u'name']),
+            hammer.csv_record_type((u'id', u'name')),
+        )
+
 
 class ParseJSONTestCase(unittest2.TestCase):
     """Tests for parsing JSON hammer output"""
@@ -138,6 +201,64 @@ class ParseJSONTestCase(unittest2.TestCase):
                          hammer.parse_csv(csv_ouput_lines)[0])
 
 
+class JSONMappingTestCase(unittest2.TestCase):
+    """Tests for :class:`robottelo.cli.hammer.JSONMapping`"""
+
+    output = u"""{
+      "ID": 1,
+      "Name": "host",
+      "Enabled": true,
+      "Parameters": [{"Name": "key", "Value": 10}],
+      "Network": {"IPv4 Address": "192.168.0.1"}
+    }"""
+
+    def test_lazy_conversion(self):
+        """The keys and values are converted on access"""
+        parsed = hammer.parse_json(self.output)
+        self.assertIsInstance(parsed, hammer.JSONMapping)
+        self.assertIsNotNone(parsed._raw)
+        self.assertEqual(parsed['id'], u'1')
+        self.assertIsNone(parsed._raw)
+        self.assertEqual(list(parsed._values), ['id'])
+        network = parsed['network']
+        self.assertIsInstance(network, hammer.JSONMapping)
+        self.assertIs(parsed['network'], network)
+        self.assertEqual(network['ipv4-address'], u'192.168.0.1')
+        self.assertIsInstance(parsed['parameters'], hammer.JSONList)
+        self.assertEqual(parsed['parameters'][0]['value'], u'10')
+
+    def test_dict_semantics(self):
+        """A mapping behaves like the eagerly parsed dictionary"""
+        parsed = hammer.parse_json(self.output)
+        expected = hammer.parse_json(self.output, lazy=False)
+        self.assertIsInstance(expected, dict)
+        self.assertEqual(parsed, expected)
+        self.assertEqual(parsed.to_dict(), expected)
+        self.assertIsInstance(parsed.to_dict()['network'], dict)
+        self.assertEqual(len(parsed), 5)
+        self.assertIn(u'enabled', parsed)
+        self.assertIs(parsed['enabled'], True)
+        self.assertIsNone(parsed.get('missing'))
+        with self.assertRaises(KeyError):
+            parsed['missing']
+        parsed['name'] = u'other'
+        parsed['new'] = {u'Raw Key': 1}
+        del parsed['id']
+        self.assertEqual(parsed['name'], u'other')
+        self.assertEqual(parsed['new'], {u'Raw Key': 1})
+        self.assertNotIn('id', parsed)
+        self.assertEqual(
+            sorted(parsed.copy()),
+            [u'enabled', u'name', u'network', u'new', u'parameters']
+        )
+
+    def test_parse_json_list(self):
+        """Arrays are parsed as lists of mappings"""
+        parsed = hammer.parse_json(u'[{"ID": 1}, {"ID": 2}]')
+        self.assertEqual(parsed, [{u'id': u'1'}, {u'id': u'2'}])
+        self.assertIsInstance(parsed[0], hammer.JSONMapping)
+
+
 class ParseHelpTestCase(unittest2.TestCase):
     """Tests for parsing hammer help output"""
 
@@ -391,3 +512,70 @@ class ParseInfoTestCase(unittest2.TestCase):
                 ],
             }
         )
+
+    def test_parse_recorded_outputs(self):
+        """Can parse recorded host, content view and repository info"""
+        for entity in ('host', 'content_view', 'repository'):
+            path = os.path.join(
+                DATA_DIR, 'hammer_info_{0}.txt'.format(entity))
+            with io.open(path, encoding='utf-8') as handler:
+                output = handler.read().splitlines()
+            with io.open(path[:-4] + '.json', encoding='utf-8') as handler:
+                expected = json.load(handler)
+            self.assertEqual(hammer.parse_info(output), expected, entity)
+
+    def test_key_cache(self):
+        """Normalized keys are cached up to a limit"""
+        hammer._info_keys.clear()
+        output = [u'Parameters:'] + [
+            u'    param {0} => value'.format(index)
+            for index in range(hammer.INFO_KEYS_CACHE_SIZE + 10)
+        ]
+        parsed = hammer.parse_info(output)
+        self.assertEqual(parsed['parameters']['param-1'], u'value')
+        self.assertLessEqual(
+            len(hammer._info_keys), hammer.INFO_KEYS_CACHE_SIZE)
+
+
+class HammerCommandIndexTestCase(unittest2.TestCase):
+    """Tests for :class:`robottelo.cli.hammer.HammerCommandIndex`"""
+
+    def setUp(self):
+        self.index = hammer.HammerCommandIndex()
+
+    def test_lazy_load(self):
+        """The data file is read on the first lookup only"""
+        self.assertIsNone(self.index._commands)
+        self.assertIn(u'hammer repository synchronize', self.index)
+        commands = self.index._commands
+        self.assertIsNotNone(commands)
+        self.index.get(u'hammer organization')
+        self.assertIs(self.index._commands, commands)
+        self.index.clear()
+        self.assertIsNone(self.index._commands)
+
+    def test_paths(self):
+        """Commands are indexed by their full path"""
+        node = self.index[u'hammer repository synchronize']
+        self.assertEqual(node['name'], u'synchronize')
+        self.assertEqual(
+            self.index[u'hammer repository']['name'], u'repository')
+        self.assertIsNone(self.index.get(u'hammer repository unknown'))
+        self.assertEqual(
+            set(subcommand['name'] for subcommand
+                in self.index[u'hammer']['subcommands']),
+            set(path.split(u' ')[1] for path in self.index.commands
+                if path.count(u' ') == 1)
+        )
+
+    def test_options(self):
+        """Options are looked up by name"""
+        options = self.index.options(u'hammer organization create')
+        self.assertEqual(options[u'name']['value'], u'NAME')
+        self.assertEqual(
+            self.index.unknown_options(
+                u'hammer organization create', [u'label', u'nmae', u'name']),
+            [u'nmae']
+        )
+        with self.assertRaises(KeyError):
+            self.index.options(u'hammer organization unknown')
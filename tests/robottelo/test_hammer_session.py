@@ -0,0 +1,248 @@
+"""Tests for module ``robottelo.cli.hammer_session``."""
+import six
+import unittest2
+
+from robottelo.cli import hammer_session
+from robottelo.cli.base import Base
+from robottelo.cli.org import Org
+from robottelo.cli.user import User
+from robottelo.ssh import SSHCommandResult
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+@mock.patch('robottelo.cli.hammer_session.ssh.command')
+@mock.patch('robottelo.cli.hammer_session.settings')
+class HammerSessionsTestCase(unittest2.TestCase):
+    """Tests for :class:`robottelo.cli.hammer_session.HammerSessions`."""
+
+    def setUp(self):
+        self.sessions = hammer_session.HammerSessions(baseline_every=0)
+
+    def configure(self, settings):
+        """Set the settings used by the sessions."""
+        settings.locale = 'en_US'
+        settings.server.hostname = 'example.com'
+
+    def test_login(self, settings, command):
+        """A user is logged in on its own home directory"""
+        self.configure(settings)
+        command.return_value = SSHCommandResult()
+        home = self.sessions.login('admin', 'pass word')
+        self.assertTrue(home.startswith(self.sessions.root + u'/'))
+        cmd = command.call_args[0][0].decode('utf-8')
+        self.assertIn(u'HOME={0} hammer auth login basic'.format(home), cmd)
+        self.assertIn(u"--password 'pass word'", cmd)
+        self.assertIn(u':use_sessions: true', cmd)
+        self.assertEqual(self.sessions.stats()['logins']['count'], 1)
+        self.assertNotEqual(self.sessions.login('other', 'pass'), home)
+
+    def test_login_error(self, settings, command):
+        """A failed login raises HammerSessionError"""
+        self.configure(settings)
+        command.return_value = SSHCommandResult(
+            stderr=u'Unknown command login', return_code=64)
+        with self.assertRaises(hammer_session.HammerSessionError):
+            self.sessions.login('admin', 'pass')
+
+    def test_run(self, settings, command):
+        """Commands reuse the session of their user"""
+        self.configure(settings)
+        command.return_value = SSHCommandResult()
+        for _ in range(2):
+            result = self.sessions.run(
+                u'-v --output=csv org list', 'admin', 'pass', u'org list',
+                output_format='csv')
+            self.assertIs(result, command.return_value)
+        self.assertEqual(command.call_count, 3)
+        cmd = command.call_args[0][0].decode('utf-8')
+        home = self.sessions._home('example.com', 'admin', 'pass')
+        self.assertEqual(
+            cmd,
+            u'LANG=en_US HOME={0}  hammer -v --output=csv org list'.format(
+                home)
+        )
+        self.assertEqual(
+            self.sessions.stats()['commands'][u'org list']['session'][
+                'count'],
+            2
+        )
+
+    def test_run_expired(self, settings, command):
+        """Users are logged in again when their session expired"""
+        self.configure(settings)
+        expired = SSHCommandResult(
+            stderr=u'Session has expired', return_code=129)
+        ok = SSHCommandResult()
+        command.side_effect = [ok, expired, ok, ok]
+        result = self.sessions.run(u'-v org list', 'admin', 'pass', u'list')
+        self.assertIs(result, ok)
+        self.assertEqual(command.call_count, 4)
+        self.assertEqual(self.sessions.stats()['logins']['count'], 2)
+        self.assertEqual(self.sessions.stats()['relogins'], 1)
+
+    def test_run_other_password(self, settings, command):
+        """Commands run with another password do not use the session"""
+        self.configure(settings)
+        ok = SSHCommandResult()
+        invalid = SSHCommandResult(
+            stderr=u'Invalid username or password', return_code=129)
+        command.side_effect = [ok, ok, invalid]
+        self.sessions.run(u'-v org list', 'admin', 'pass', u'list')
+        self.assertIsNone(
+            self.sessions.run(u'-v org list', 'admin', 'wrong', u'list'))
+        self.assertEqual(command.call_count, 3)
+        self.assertIn(
+            u'--password wrong', command.call_args[0][0].decode('utf-8'))
+        self.assertNotEqual(
+            self.sessions._home('example.com', 'admin', 'pass'),
+            self.sessions._home('example.com', 'admin', 'wrong')
+        )
+        # The session of the right password is still used
+        command.side_effect = None
+        command.return_value = ok
+        self.sessions.run(u'-v org list', 'admin', 'pass', u'list')
+        self.assertIn(
+            self.sessions._home('example.com', 'admin', 'pass'),
+            command.call_args[0][0].decode('utf-8')
+        )
+
+    def test_run_auth_error(self, settings, command):
+        """Authentication errors are not taken for an expired session"""
+        self.configure(settings)
+        invalid = SSHCommandResult(
+            stderr=u'Invalid username or password', return_code=129)
+        command.side_effect = [SSHCommandResult(), invalid]
+        result = self.sessions.run(u'-v org list', 'admin', 'pass', u'list')
+        self.assertIs(result, invalid)
+        self.assertEqual(command.call_count, 2)
+        self.assertEqual(self.sessions.stats()['relogins'], 0)
+
+    def test_run_session_error_not_expired(self, settings, command):
+        """Only session expiry messages make the user log in again"""
+        self.configure(settings)
+        failed = SSHCommandResult(
+            stderr=u'Unable to authenticate user admin', return_code=129)
+        command.side_effect = [SSHCommandResult(), failed]
+        self.assertIs(
+            self.sessions.run(u'-v org list', 'admin', 'pass', u'list'),
+            failed
+        )
+        self.assertEqual(self.sessions.stats()['relogins'], 0)
+
+    def test_forget(self, settings, command):
+        """Forgotten users log in again"""
+        self.configure(settings)
+        command.return_value = SSHCommandResult()
+        self.sessions.run(u'-v org list', 'admin', 'pass', u'list')
+        self.sessions.run(u'-v org list', 'other', 'pass', u'list')
+        self.sessions.forget('admin')
+        self.sessions.run(u'-v org list', 'admin', 'pass', u'list')
+        self.sessions.run(u'-v org list', 'other', 'pass', u'list')
+        self.assertEqual(self.sessions.stats()['logins']['count'], 3)
+        self.sessions.forget()
+        self.sessions.run(u'-v org list', 'other', 'pass', u'list')
+        self.assertEqual(self.sessions.stats()['logins']['count'], 4)
+
+    @mock.patch('robottelo.cli.user.hammer_sessions')
+    @mock.patch('robottelo.cli.base.Base.execute')
+    def test_user_password_update(self, execute, sessions, settings, command):
+        """Updating a user password forgets the sessions"""
+        User.update({'id': 1, 'firstname': 'a'})
+        sessions.forget.assert_not_called()
+        User.update({'id': 1, 'password': 'new'})
+        sessions.forget.assert_called_once_with()
+
+    def test_run_not_supported(self, settings, command):
+        """Users which can't log in pass the credentials"""
+        self.configure(settings)
+        command.return_value = SSHCommandResult(return_code=1)
+        self.assertIsNone(
+            self.sessions.run(u'-v org list', 'admin', 'pass', u'list'))
+        self.assertIsNone(
+            self.sessions.run(u'-v org list', 'admin', 'pass', u'list'))
+        self.assertEqual(command.call_count, 1)
+
+    def test_run_baseline(self, settings, command):
+        """Every baseline_every commands pass the credentials"""
+        self.configure(settings)
+        command.return_value = SSHCommandResult()
+        self.sessions.baseline_every = 2
+        results = [
+            self.sessions.run(u'-v org list', 'admin', 'pass', u'list')
+            for _ in range(4)
+        ]
+        self.assertEqual(
+            [result is None for result in results],
+            [False, True, False, True]
+        )
+
+    def test_stats(self, settings, command):
+        """The time saved per command is reported"""
+        self.sessions.record(u'org list', 'session', 1.0)
+        self.sessions.record(u'org list', 'session', 2.0)
+        self.sessions.record(u'org list', 'credentials', 2.5)
+        self.sessions.record(u'org info', 'session', 1.0)
+        stats = self.sessions.stats()
+        self.assertEqual(
+            stats['commands'][u'org list']['saved_per_command'], 1.0)
+        self.assertIsNone(
+            stats['commands'][u'org info']['saved_per_command'])
+        self.assertEqual(stats['saved'], 2.0)
+
+
+class BaseExecuteTestCase(unittest2.TestCase):
+    """Tests for the sessions use of :meth:`robottelo.cli.base.Base.execute`.
+    """
+
+    def configure(self, settings):
+        """Set the settings used by execute"""
+        settings.hammer_sessions = True
+        settings.hammer_shell = False
+        settings.locale = 'en_US'
+        settings.performance = False
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+
+    @mock.patch('robottelo.cli.base.hammer_sessions')
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_session(self, settings, command, sessions):
+        """Commands run on the session without the credentials"""
+        self.configure(settings)
+        sessions.run.return_value = SSHCommandResult(stderr=u'')
+        Org.execute(
+            Org._construct_command({u'id': 1}, 'info'), output_format='csv')
+        sessions.run.assert_called_once_with(
+            u'-v --output=csv organization info --id="1"',
+            'admin',
+            'password',
+            u'organization info',
+            output_format='csv',
+            timeout=None,
+            time_hammer=False,
+        )
+        command.assert_not_called()
+
+    @mock.patch('robottelo.cli.base.hammer_sessions')
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_credentials(self, settings, command, sessions):
+        """Commands pass the credentials when not run on a session"""
+        self.configure(settings)
+        sessions.run.return_value = None
+        command.return_value = SSHCommandResult(stderr=u'')
+        Base.with_user('alice', 'secret').execute('some_cmd')
+        self.assertEqual(sessions.run.call_args[0][1:4],
+                         ('alice', 'secret', u'some_cmd'))
+        command.assert_called_once_with(
+            u'LANG=en_US  hammer -v -u alice -p secret  some_cmd'.encode(
+                'utf-8'),
+            output_format=None,
+            timeout=None,
+        )
+        self.assertEqual(
+            sessions.record.call_args[0][:2], (u'some_cmd', 'credentials'))
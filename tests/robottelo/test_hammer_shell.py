@@ -0,0 +1,289 @@
+"""Tests for module ``robottelo.cli.hammer_shell``."""
+import base64
+import json
+import six
+import socket
+
+from robottelo.cli import hammer_shell
+from robottelo.cli.base import Base, CLIReturnCodeError
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class FakeDriverChannel(object):
+    """A fake channel running the hammer driver.
+
+    Each command line written is answered with the response returned by
+    ``respond(args)``, ``args`` being the received arguments joined by
+    spaces, a ``(return_code, stdout, stderr)`` tuple or ``None`` to simulate
+    the driver dying.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.closed = False
+        self.exited = False
+        self.commands = []
+        self.lines = []
+        self.marker = None
+        self.cmd = None
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def exec_command(self, cmd):
+        self.cmd = cmd
+        self.marker = cmd.split()[-1].encode('ascii')
+        self._answer(u'--version')
+
+    def _answer(self, args):
+        response = self.respond(args)
+        if response is None:
+            self.exited = True
+            return
+        return_code, stdout, stderr = response
+        self.lines.append(b' '.join([
+            self.marker,
+            str(return_code).encode('ascii'),
+            base64.b64encode(stdout),
+            base64.b64encode(stderr),
+        ]) + b'\n')
+
+    def makefile(self, mode):
+        return self
+
+    def write(self, data):
+        args = json.loads(base64.b64decode(data).decode('utf-8'))
+        self.commands.append(args)
+        self._answer(u' '.join(args))
+
+    def flush(self):
+        pass
+
+    def readline(self):
+        return self.lines.pop(0) if self.lines else b''
+
+    def exit_status_ready(self):
+        return self.exited
+
+    def recv_exit_status(self):
+        return 1
+
+    def recv_stderr_ready(self):
+        return False
+
+    def close(self):
+        self.closed = True
+
+
+class IsSupportedTestCase(TestCase):
+    """Tests for :func:`robottelo.cli.hammer_shell.is_supported`."""
+
+    def test_supported(self):
+        """Quoted arguments are supported"""
+        for args in (
+                u'-v -u admin -p changeme org list',
+                u'org list --search="name=\\"a|b; c\\""',
+                u"org create --name='a $b | c'",
+                u'org info --name="a (b) * c"',
+                u'org info --name=a\\;b'):
+            self.assertTrue(hammer_shell.is_supported(args), args)
+
+    def test_unsupported(self):
+        """Arguments needing a real shell are not supported"""
+        for args in (
+                u'org list | grep foo',
+                u'org create --name="$NAME"',
+                u'org create --name=`hostname`',
+                u'org create --name="unbalanced',
+                u'org list > /tmp/orgs',
+                u'org list; rm foo'):
+            self.assertFalse(hammer_shell.is_supported(args), args)
+
+
+class HammerShellTestCase(TestCase):
+    """Tests for :class:`robottelo.cli.hammer_shell.HammerShell`."""
+
+    def setUp(self):
+        self.settings_patcher = mock.patch(
+            'robottelo.cli.hammer_shell.settings')
+        settings = self.settings_patcher.start()
+        settings.locale = 'en_US.UTF-8'
+        self.connect_patcher = mock.patch('robottelo.ssh._connect')
+        connect = self.connect_patcher.start()
+        self.channels = []
+        self.responses = {}
+
+        def open_session():
+            channel = FakeDriverChannel(self._respond)
+            self.channels.append(channel)
+            return channel
+
+        connect.return_value.get_transport.return_value.open_session = (
+            open_session)
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+        self.connect_patcher.stop()
+
+    def _respond(self, args):
+        return self.responses.get(args, (0, args.encode('utf-8'), b''))
+
+    def test_run(self):
+        """Commands are framed and run on the same driver"""
+        self.responses[u'org list'] = (
+            0, b'Id,Name\n1,"a b"\n', b'\x1b[33mwarning\x1b[0m')
+        self.responses[u'org info'] = (65, b'', b'not found')
+        shell = hammer_shell.HammerShell('example.com')
+        result = shell.run(u'org list', output_format='csv')
+        self.assertEqual(result.stdout, [{u'id': u'1', u'name': u'a b'}])
+        self.assertEqual(result.stderr, u'warning')
+        result = shell.run(u'org info')
+        self.assertEqual(result.return_code, 65)
+        self.assertEqual(result.stderr, u'not found')
+        self.assertEqual(len(self.channels), 1)
+        self.assertEqual(
+            self.channels[0].commands, [[u'org', u'list'], [u'org', u'info']])
+        self.assertTrue(
+            self.channels[0].cmd.startswith(u'LANG=en_US.UTF-8 ruby '))
+
+    def test_run_quoted_arguments(self):
+        """Arguments are split the way a shell would"""
+        shell = hammer_shell.HammerShell('example.com')
+        shell.run(
+            u'org create --name=\'a "b"\' --description="c \\"d\\" \'e\'"')
+        self.assertEqual(
+            self.channels[0].commands[0],
+            [u'org', u'create', u'--name=a "b"', u'--description=c "d" \'e\''])
+
+    def test_restart(self):
+        """The shell is restarted after dying"""
+        self.responses[u'die'] = None
+        shell = hammer_shell.HammerShell('example.com')
+        with self.assertRaises(hammer_shell.HammerShellError):
+            shell.run(u'die')
+        self.assertFalse(shell.alive)
+        self.assertTrue(self.channels[0].closed)
+        self.assertEqual(shell.run(u'ping').stdout, [u'ping'])
+        self.assertEqual(len(self.channels), 2)
+
+    def test_pool_died_running_command(self):
+        """Commands which may have run when the shell died raise
+        CLIReturnCodeError
+        """
+        self.responses[u'die'] = None
+        pool = hammer_shell.HammerShellPool()
+        with self.assertRaises(CLIReturnCodeError) as context:
+            pool.run(u'die', hostname='example.com')
+        self.assertEqual(context.exception.return_code, 255)
+        self.assertTrue(self.channels[0].closed)
+        self.assertEqual(
+            pool.run(u'ping', hostname='example.com').stdout, [u'ping'])
+
+    def test_pool_died_before_command(self):
+        """Commands not sent to the shell are run the usual way"""
+        pool = hammer_shell.HammerShellPool()
+        pool.run(u'ping', hostname='example.com')
+        self.channels[0].write = mock.Mock(
+            side_effect=socket.error('Socket is closed'))
+        self.assertIsNone(pool.run(u'ping', hostname='example.com'))
+        self.assertTrue(self.channels[0].closed)
+
+    def test_start_failure(self):
+        """An error is raised if hammer can't be run"""
+        self.responses[u'--version'] = (1, b'', b'no hammer_cli gem')
+        shell = hammer_shell.HammerShell('example.com')
+        with self.assertRaisesRegex(
+                hammer_shell.HammerShellError, 'no hammer_cli gem'):
+            shell.start()
+
+
+class HammerShellPoolTestCase(TestCase):
+    """Tests for :class:`robottelo.cli.hammer_shell.HammerShellPool`."""
+
+    def setUp(self):
+        self.settings_patcher = mock.patch(
+            'robottelo.cli.hammer_shell.settings')
+        settings = self.settings_patcher.start()
+        settings.server.hostname = 'example.com'
+        settings.hammer_shell_ruby = 'ruby'
+        self.shell_patcher = mock.patch(
+            'robottelo.cli.hammer_shell.HammerShell')
+        self.shell_class = self.shell_patcher.start()
+        self.shell_class.return_value.alive = False
+        self.pool = hammer_shell.HammerShellPool()
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+        self.shell_patcher.stop()
+
+    def test_reuse(self):
+        """Shells are reused by the following commands"""
+        shell = self.shell_class.return_value
+        self.assertIs(self.pool.run(u'ping'), shell.run.return_value)
+        shell.alive = True
+        self.pool.run(u'ping')
+        self.assertEqual(self.shell_class.call_count, 1)
+        self.assertEqual(shell.start.call_count, 1)
+
+    def test_unsupported_command(self):
+        """Commands needing a real shell are not run"""
+        self.assertIsNone(self.pool.run(u'org list | wc -l'))
+        self.assertFalse(self.shell_class.called)
+
+    def test_unsupported_host(self):
+        """Hosts where hammer can't be started are not tried again"""
+        shell = self.shell_class.return_value
+        shell.start.side_effect = hammer_shell.HammerShellError()
+        self.assertIsNone(self.pool.run(u'ping'))
+        self.assertIsNone(self.pool.run(u'ping'))
+        self.assertEqual(shell.start.call_count, 1)
+        self.assertFalse(shell.run.called)
+
+
+class BaseExecuteTestCase(TestCase):
+    """Tests :meth:`robottelo.cli.base.Base.execute` with the hammer shell."""
+
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.shell_pool')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute(self, settings, shell_pool, command):
+        """Commands are run by the shell pool"""
+        settings.hammer_sessions = False
+        settings.hammer_shell = True
+        settings.performance = False
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        response = Base.execute('org list', return_raw_response=True)
+        self.assertIs(response, shell_pool.run.return_value)
+        shell_pool.run.assert_called_once_with(
+            u'-v -u admin -p password  org list',
+            output_format=None,
+            timeout=None
+        )
+        self.assertFalse(command.called)
+
+    @mock.patch('robottelo.cli.base.ssh.command')
+    @mock.patch('robottelo.cli.base.shell_pool')
+    @mock.patch('robottelo.cli.base.settings')
+    def test_execute_fallback(self, settings, shell_pool, command):
+        """Commands not supported by the shell are run the usual way"""
+        settings.hammer_sessions = False
+        settings.hammer_shell = True
+        settings.locale = 'en_US'
+        settings.performance = False
+        settings.server.admin_username = 'admin'
+        settings.server.admin_password = 'password'
+        shell_pool.run.return_value = None
+        response = Base.execute('org list', return_raw_response=True)
+        self.assertIs(response, command.return_value)
+        command.assert_called_once_with(
+            u'LANG=en_US  hammer -v -u admin -p password  org list'.encode(
+                'utf-8'),
+            output_format=None,
+            timeout=None
+        )
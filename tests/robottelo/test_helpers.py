@@ -1,12 +1,18 @@
 """Tests for module ``robottelo.helpers``."""
 # (Too many public methods) pylint: disable=R0904
+import os
+import shutil
 import six
+import tempfile
 import unittest2
 from robottelo.helpers import (
     HostInfoError,
+    ServerFactsCache,
     escape_search,
     get_host_info,
     get_server_version,
+    server_fact,
+    server_facts,
     Storage
 )
 
@@ -18,6 +24,9 @@ else:
 
 class GetServerVersionTestCase(unittest2.TestCase):
     """Tests for method ``get_server_version``."""
+    def setUp(self):
+        server_facts.clear()
+
     @mock.patch('robottelo.helpers.ssh')
     def test_return_version(self, ssh):
         """get_server_version returns a proper version.
@@ -45,6 +54,8 @@ class GetServerVersionTestCase(unittest2.TestCase):
 
 class GetHostInfoTestCase(unittest2.TestCase):
     """Tests for method ``get_host_credentials``."""
+    def setUp(self):
+        server_facts.clear()
 
     @mock.patch('robottelo.helpers.ssh')
     def test_fedora_info(self, ssh):
@@ -133,3 +144,79 @@ class StorageTestCase(unittest2.TestCase):
         self.assertEqual(storage.key, 'value')
         self.assertEqual(storage.another_key, 'another value')
         self.assertEqual(storage.spare_argument, 'one more value')
+
+
+class ServerFactsCacheTestCase(unittest2.TestCase):
+    """Tests for class ``ServerFactsCache``."""
+    def setUp(self):
+        self.cache = ServerFactsCache(ttl=60)
+
+    def test_get_set(self):
+        """Values are keyed by hostname and query"""
+        self.assertEqual(self.cache.get('host1', 'os'), (False, None))
+        self.cache.set('host1', 'os', 'RHEL7')
+        self.cache.set('host2', 'os', None)
+        self.assertEqual(self.cache.get('host1', 'os'), (True, 'RHEL7'))
+        self.assertEqual(self.cache.get('host2', 'os'), (True, None))
+        self.assertEqual(self.cache.get('host1', 'sat'), (False, None))
+
+    @mock.patch('robottelo.helpers.time')
+    def test_ttl(self, time):
+        """Values expire after ttl seconds"""
+        time.time.return_value = 1000
+        self.cache.set('host1', 'os', 'RHEL7')
+        time.time.return_value = 1060
+        self.assertEqual(self.cache.get('host1', 'os'), (True, 'RHEL7'))
+        time.time.return_value = 1061
+        self.assertEqual(self.cache.get('host1', 'os'), (False, None))
+
+    def test_invalidate(self):
+        """Values can be invalidated by hostname and query"""
+        for hostname in ('host1', 'host2'):
+            for query in ('os', 'sat'):
+                self.cache.set(hostname, query, query)
+        self.cache.invalidate(hostname='host1', query='os')
+        self.assertFalse(self.cache.get('host1', 'os')[0])
+        self.assertTrue(self.cache.get('host1', 'sat')[0])
+        self.cache.invalidate(hostname='host2')
+        self.assertFalse(self.cache.get('host2', 'os')[0])
+        self.assertFalse(self.cache.get('host2', 'sat')[0])
+        self.cache.clear()
+        self.assertFalse(self.cache.get('host1', 'sat')[0])
+
+    def test_shared_cache_dir(self):
+        """Values are shared by caches using the same directory"""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.cache.cache_dir = os.path.join(cache_dir, 'facts')
+        other_cache = ServerFactsCache(
+            ttl=60, cache_dir=self.cache.cache_dir)
+        self.cache.set('host1', 'info', ('RHEL', 7, 2))
+        self.assertEqual(
+            other_cache.get('host1', 'info'), (True, ('RHEL', 7, 2)))
+        other_cache.invalidate(hostname='host1')
+        self.assertEqual(os.listdir(self.cache.cache_dir), [])
+        self.cache._values.clear()
+        self.assertFalse(self.cache.get('host1', 'info')[0])
+
+    @mock.patch('robottelo.helpers.server_facts', ServerFactsCache(ttl=60))
+    @mock.patch('robottelo.helpers.settings')
+    def test_server_fact(self, settings):
+        """Decorated functions are called once per hostname"""
+        settings.server.hostname = 'server'
+        settings.server_facts_cache_dir = None
+        calls = []
+
+        @server_fact
+        def fact(hostname=None):
+            calls.append(hostname)
+            return len(calls)
+
+        self.assertEqual(fact(), 1)
+        self.assertEqual(fact(), 1)
+        self.assertEqual(fact('host1'), 2)
+        self.assertEqual(fact(hostname='host1'), 2)
+        self.assertEqual(calls, [None, 'host1'])
+        fact.cache_clear()
+        self.assertEqual(fact(), 3)
+        self.assertEqual(fact.__wrapped__(), 4)
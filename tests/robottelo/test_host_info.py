@@ -3,6 +3,7 @@ import six
 from unittest2 import TestCase
 
 from robottelo import host_info
+from robottelo.helpers import server_facts
 from robottelo.ssh import SSHCommandResult
 
 if six.PY2:
@@ -18,6 +19,7 @@ class GetHostOsVersionTestCase(TestCase):
 
     def setUp(self):
         """Mocking ssh"""
+        server_facts.clear()
         self._patcher = mock.patch(
             'robottelo.host_info.ssh.command')
         self._command = self._patcher.start()
@@ -130,6 +132,7 @@ class GetHostSatVersionTestCase(TestCase):
 
     def setUp(self):
         """Mocking ssh"""
+        server_facts.clear()
         self._patcher = mock.patch(
             'robottelo.host_info.ssh.command')
         self._command = self._patcher.start()
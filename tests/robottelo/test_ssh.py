@@ -3,6 +3,7 @@
 import os
 import paramiko
 import six
+import socket
 
 from robottelo import ssh
 from unittest2 import TestCase
@@ -30,6 +31,53 @@ class MockStdout(object):
         return self.cmd
 
 
+class MockStreamChannel(object):
+    """A mock ``paramiko.Channel`` which returns the output in chunks."""
+    def __init__(self, stdout_chunks=(), stderr_chunks=(), ret=0):
+        self.stdout_chunks = list(stdout_chunks)
+        self.stderr_chunks = list(stderr_chunks)
+        self.ret = ret
+        self.cmd = None
+        self.closed = False
+
+    def exec_command(self, cmd):
+        self.cmd = cmd
+
+    def recv_ready(self):
+        return len(self.stdout_chunks) > 0
+
+    def recv(self, nbytes):
+        return self.stdout_chunks.pop(0)
+
+    def recv_stderr_ready(self):
+        return len(self.stderr_chunks) > 0
+
+    def recv_stderr(self, nbytes):
+        return self.stderr_chunks.pop(0)
+
+    def exit_status_ready(self):
+        return not self.stdout_chunks and not self.stderr_chunks
+
+    def recv_exit_status(self):
+        return self.ret
+
+    def close(self):
+        self.closed = True
+
+
+class MockTransport(object):
+    """A mock ``paramiko.Transport`` object."""
+    def __init__(self):
+        self.active = True
+        self.channel = MockStreamChannel()
+
+    def is_active(self):
+        return self.active
+
+    def open_session(self):
+        return self.channel
+
+
 class MockSSHClient(object):
     """A mock ``paramiko.SSHClient`` object."""
     def __init__(self):
@@ -49,6 +97,7 @@ class MockSSHClient(object):
         self.key_filename = None
         self.password = None
         self.ret_code = 0
+        self.transport = MockTransport()
 
     def set_missing_host_key_policy(self, policy):  # pylint:disable=W0613
         """A no-op stub method."""
@@ -77,6 +126,10 @@ class MockSSHClient(object):
     def close(self):
         """A no-op stub method."""
         self.close_ += 1
+        self.transport.active = False
+
+    def get_transport(self):
+        return self.transport
 
     def exec_command(self, cmd, *args, **kwargs):
         return (
@@ -286,3 +339,706 @@ class SSHTestCase(TestCase):
             ssh._call_paramiko_sshclient(),
             (paramiko.SSHClient, MockSSHClient)
         )
+
+
+class SSHCommandResultTestCase(TestCase):
+    """Tests for :class:`robottelo.ssh.SSHCommandResult`."""
+
+    def test_slots(self):
+        """Results don't have a ``__dict__``"""
+        result = ssh.SSHCommandResult()
+        self.assertFalse(hasattr(result, '__dict__'))
+        with self.assertRaises(AttributeError):
+            result.unknown = 1
+
+    @mock.patch('robottelo.ssh.hammer.parse_csv')
+    def test_lazy_parsing(self, parse_csv):
+        """The output is parsed once when first accessed"""
+        parse_csv.return_value = [{u'a': u'1'}]
+        result = ssh.SSHCommandResult.from_channel_output(
+            b'a\n1\n', b'', 0, 'csv')
+        self.assertEqual(result.return_code, 0)
+        self.assertFalse(parse_csv.called)
+        self.assertEqual(result.stdout, [{u'a': u'1'}])
+        self.assertEqual(result.stdout, [{u'a': u'1'}])
+        parse_csv.assert_called_once_with([u'a', u'1', u''])
+        self.assertEqual(result.raw_stdout, b'a\n1\n')
+
+    def test_failed_command_not_parsed(self):
+        """The output of failed commands is not parsed"""
+        result = ssh.SSHCommandResult.from_channel_output(
+            b'[ERROR] no\nerror', b'\x1b[31mfailed\x1b[0m', 1, 'json')
+        self.assertEqual(result.stdout, u'[ERROR] no\nerror')
+        self.assertEqual(result.stderr, u'failed')
+        self.assertEqual(result.raw_stderr, b'\x1b[31mfailed\x1b[0m')
+
+    def test_channel_output_cleanup(self):
+        """Rails traffic lines and color codes are removed"""
+        result = ssh.SSHCommandResult.from_channel_output(
+            b'[INFO] rails\n\x1b[32mok\x1b[0m\n""', b'', 0)
+        self.assertEqual(result.stdout, [u'ok', u''])
+
+    def test_set_output(self):
+        """The output can be replaced"""
+        result = ssh.SSHCommandResult(stdout=[u'a'], stderr=u'b')
+        result.stdout = [u'c']
+        result.stderr = None
+        self.assertEqual(
+            repr(result),
+            u'SSHCommandResult(stdout={0!r}, stderr=None, return_code=0, '
+            u'output_format=None)'.format([u'c'])
+        )
+
+
+class SSHConnectionPoolTestCase(TestCase):
+    """Tests for :class:`robottelo.ssh.SSHConnectionPool`."""
+
+    def setUp(self):
+        self.settings_patcher = mock.patch('robottelo.ssh.settings')
+        settings = self.settings_patcher.start()
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        self.client_patcher = mock.patch(
+            'robottelo.ssh._call_paramiko_sshclient', MockSSHClient)
+        self.client_patcher.start()
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+        self.client_patcher.stop()
+
+    def test_reuse_connection(self):
+        """A released connection is reused for the same key"""
+        pool = ssh.SSHConnectionPool()
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(first.connect_, 1)
+        self.assertEqual(first.close_, 0)
+        self.assertEqual(
+            pool.stats(),
+            {u'hits': 1, u'misses': 1, u'evictions': 0, u'idle': 1}
+        )
+
+    def test_connection_keyed_by_host_and_user(self):
+        """Different hosts or users do not share connections"""
+        pool = ssh.SSHConnectionPool()
+        with pool.connection() as first:
+            pass
+        with pool.connection(hostname='other.example.com') as second:
+            pass
+        with pool.connection(username='somebody') as third:
+            pass
+        self.assertIsNot(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual(pool.stats()[u'misses'], 3)
+        self.assertEqual(pool.stats()[u'idle'], 3)
+
+    def test_concurrent_callers_get_distinct_connections(self):
+        """A checked out connection is not handed to another caller"""
+        pool = ssh.SSHConnectionPool()
+        with pool.connection() as first:
+            with pool.connection() as second:
+                self.assertIsNot(first, second)
+        self.assertEqual(pool.stats()[u'idle'], 2)
+
+    def test_dead_connection_discarded(self):
+        """Connections failing the health check are not reused"""
+        pool = ssh.SSHConnectionPool()
+        with pool.connection() as first:
+            pass
+        first.transport.active = False
+        with pool.connection() as second:
+            pass
+        self.assertIsNot(first, second)
+        self.assertEqual(pool.stats()[u'evictions'], 1)
+        self.assertEqual(first.close_, 1)
+
+    def test_max_size_eviction(self):
+        """Least recently used idle connection is evicted when full"""
+        pool = ssh.SSHConnectionPool(max_size=1)
+        with pool.connection(hostname='a.example.com') as first:
+            pass
+        with pool.connection(hostname='b.example.com') as second:
+            pass
+        self.assertEqual(first.close_, 1)
+        self.assertEqual(second.close_, 0)
+        self.assertEqual(pool.stats()[u'idle'], 1)
+        self.assertEqual(pool.stats()[u'evictions'], 1)
+
+    def test_max_idle_time(self):
+        """Connections idle for too long are closed"""
+        pool = ssh.SSHConnectionPool(max_idle_time=60)
+        with mock.patch('robottelo.ssh.time.time', return_value=1000):
+            with pool.connection() as first:
+                pass
+        with mock.patch('robottelo.ssh.time.time', return_value=1100):
+            with pool.connection() as second:
+                pass
+        self.assertIsNot(first, second)
+        self.assertEqual(first.close_, 1)
+
+    def test_connection_closed_on_error(self):
+        """A connection is closed instead of reused if the caller fails"""
+        pool = ssh.SSHConnectionPool()
+        with self.assertRaises(ValueError):
+            with pool.connection() as connection:
+                raise ValueError()
+        self.assertEqual(connection.close_, 1)
+        self.assertEqual(pool.stats()[u'idle'], 0)
+
+    def test_clear(self):
+        """Clear closes all idle connections"""
+        pool = ssh.SSHConnectionPool()
+        with pool.connection() as connection:
+            pass
+        pool.clear()
+        self.assertEqual(connection.close_, 1)
+        self.assertEqual(pool.stats()[u'idle'], 0)
+
+    def test_command_uses_pool(self):
+        """``command`` reuses connections from the module pool"""
+        pool = ssh.SSHConnectionPool()
+        with mock.patch('robottelo.ssh.connection_pool', pool):
+            ssh.command('ls -la')
+            ssh.command('ls -la')
+        self.assertEqual(pool.stats()[u'hits'], 1)
+        self.assertEqual(pool.stats()[u'misses'], 1)
+
+
+class StreamCommandTestCase(TestCase):
+    """Tests for :func:`robottelo.ssh.stream_command`."""
+
+    def setUp(self):
+        self.settings_patcher = mock.patch('robottelo.ssh.settings')
+        settings = self.settings_patcher.start()
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        self.client = MockSSHClient()
+        self.client_patcher = mock.patch(
+            'robottelo.ssh._call_paramiko_sshclient',
+            return_value=self.client
+        )
+        self.client_patcher.start()
+        self.pool_patcher = mock.patch(
+            'robottelo.ssh.connection_pool', ssh.SSHConnectionPool())
+        self.pool = self.pool_patcher.start()
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+        self.client_patcher.stop()
+        self.pool_patcher.stop()
+
+    def test_stream_lines(self):
+        """Lines split across chunks are yielded as they are complete"""
+        channel = MockStreamChannel(
+            stdout_chunks=[
+                b'first line\nsec',
+                b'ond line\n\x1b[32mthird\x1b[0m line',
+                b'\n\xc3',
+                b'\xa5 last',
+            ],
+            stderr_chunks=[b'some \x1b[31mwarning\x1b[0m'],
+            ret=1,
+        )
+        self.client.transport.channel = channel
+        stream = ssh.stream_command('cat file')
+        self.assertIsNone(stream.return_code)
+        self.assertEqual(
+            list(stream),
+            [u'first line', u'second line', u'third line', u'\xe5 last']
+        )
+        self.assertEqual(channel.cmd, 'cat file')
+        self.assertEqual(stream.return_code, 1)
+        self.assertEqual(stream.stderr, u'some warning')
+        self.assertTrue(channel.closed)
+        self.assertEqual(self.pool.stats()[u'idle'], 1)
+
+    def test_stream_is_lazy(self):
+        """The command runs only when the iteration starts"""
+        channel = MockStreamChannel(stdout_chunks=[b'a\nb\n'])
+        self.client.transport.channel = channel
+        stream = ssh.stream_command('ls')
+        self.assertIsNone(channel.cmd)
+        self.assertEqual(next(iter(stream)), u'a')
+        self.assertEqual(channel.cmd, 'ls')
+        stream.close()
+        self.assertTrue(channel.closed)
+        self.assertIsNone(stream.return_code)
+
+    def test_stream_empty_output(self):
+        """An empty output yields nothing"""
+        self.client.transport.channel = MockStreamChannel()
+        stream = ssh.stream_command('true')
+        self.assertEqual(list(stream), [])
+        self.assertEqual(stream.return_code, 0)
+        self.assertEqual(stream.stderr, u'')
+
+
+class CommandManyTestCase(TestCase):
+    """Tests for :func:`robottelo.ssh.command_many`."""
+
+    def setUp(self):
+        self.settings_patcher = mock.patch('robottelo.ssh.settings')
+        settings = self.settings_patcher.start()
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        self.client_patcher = mock.patch(
+            'robottelo.ssh._call_paramiko_sshclient', MockSSHClient)
+        self.client_patcher.start()
+        self.pool_patcher = mock.patch(
+            'robottelo.ssh.connection_pool', ssh.SSHConnectionPool())
+        self.pool_patcher.start()
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+        self.client_patcher.stop()
+        self.pool_patcher.stop()
+
+    def test_same_command(self):
+        """The same command runs on all hosts keeping hostnames order"""
+        hostnames = ['host{0}.example.com'.format(i) for i in range(5)]
+        results = ssh.command_many('ls -la', hostnames, max_workers=2)
+        self.assertIsInstance(results, ssh.SSHMultiHostResult)
+        self.assertEqual(list(results), hostnames)
+        for result in results.values():
+            self.assertEqual(result.stdout, [u'ls -la'])
+        self.assertEqual(sorted(results.elapsed), sorted(hostnames))
+        self.assertEqual(results.succeeded, hostnames)
+        self.assertEqual(results.failed, [])
+        self.assertEqual(results.errors, {})
+
+    def test_command_map(self):
+        """Each host runs its own command"""
+        results = ssh.command_many(
+            {'a.example.com': 'echo a', 'b.example.com': 'echo b'},
+            ['b.example.com', 'a.example.com'],
+        )
+        self.assertEqual(list(results), ['b.example.com', 'a.example.com'])
+        self.assertEqual(results['a.example.com'].stdout, [u'echo a'])
+        self.assertEqual(results['b.example.com'].stdout, [u'echo b'])
+
+    def test_partial_failure(self):
+        """A host failing to connect does not affect the others"""
+        def connect(self, hostname, **kwargs):
+            if hostname == 'down.example.com':
+                raise socket.error('Connection refused')
+            self.hostname = hostname
+
+        with mock.patch.object(MockSSHClient, 'connect', connect):
+            results = ssh.command_many(
+                'ls', ['up.example.com', 'down.example.com'])
+        self.assertEqual(results.succeeded, ['up.example.com'])
+        self.assertEqual(results.failed, ['down.example.com'])
+        self.assertEqual(results['down.example.com'].return_code, -1)
+        self.assertIn(
+            'Connection refused', results['down.example.com'].stderr)
+        self.assertIsInstance(
+            results.errors['down.example.com'], socket.error)
+
+    def test_command_timeout(self):
+        """The command timeout is applied to the channel of each host"""
+        with mock.patch.object(
+                MockSSHClient, 'exec_command',
+                side_effect=socket.timeout('timed out')) as exec_command:
+            results = ssh.command_many(
+                'sleep 100', ['example.com'], command_timeout=5)
+        exec_command.assert_called_once_with('sleep 100', timeout=5)
+        self.assertEqual(results.failed, ['example.com'])
+        self.assertEqual(results['example.com'].stderr, u'timed out')
+
+    def test_no_hosts(self):
+        """No hosts means no results"""
+        self.assertEqual(ssh.command_many('ls', []), {})
+
+
+class SSHSessionTestCase(TestCase):
+    """Tests for :class:`robottelo.ssh.SSHSession`."""
+
+    def setUp(self):
+        self.settings_patcher = mock.patch('robottelo.ssh.settings')
+        settings = self.settings_patcher.start()
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        self.client_patcher = mock.patch(
+            'robottelo.ssh._call_paramiko_sshclient', MockSSHClient)
+        self.client_patcher.start()
+        self.pool_patcher = mock.patch(
+            'robottelo.ssh.connection_pool', ssh.SSHConnectionPool())
+        self.pool = self.pool_patcher.start()
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+        self.client_patcher.stop()
+        self.pool_patcher.stop()
+
+    def test_submit_shares_connection(self):
+        """All commands run on the same connection"""
+        with ssh.session() as ssh_session:
+            connection = ssh_session.connection
+            with mock.patch.object(
+                    connection, 'exec_command',
+                    wraps=connection.exec_command) as exec_command:
+                futures = [
+                    ssh_session.submit('echo {0}'.format(i))
+                    for i in range(20)
+                ]
+                results = [future.result() for future in futures]
+        self.assertEqual(
+            [result.stdout for result in results],
+            [[u'echo {0}'.format(i)] for i in range(20)]
+        )
+        self.assertEqual(exec_command.call_count, 20)
+        self.assertEqual(connection.connect_, 1)
+        self.assertEqual(
+            self.pool.stats(),
+            {u'hits': 0, u'misses': 1, u'evictions': 0, u'idle': 1}
+        )
+
+    def test_command(self):
+        """A command can be run waiting for its result"""
+        with ssh.session() as ssh_session:
+            result = ssh_session.command(
+                '{"a": 1}', output_format='json')
+        self.assertEqual(result.stdout, {u'a': u'1'})
+
+    def test_error_closes_connection(self):
+        """The connection is not reused if the session fails"""
+        with self.assertRaises(ValueError):
+            with ssh.session() as ssh_session:
+                connection = ssh_session.connection
+                raise ValueError()
+        self.assertEqual(connection.close_, 1)
+        self.assertEqual(self.pool.stats()[u'idle'], 0)
+
+
+class CommandBatchTestCase(TestCase):
+    """Tests for :func:`robottelo.ssh.command_batch`."""
+
+    def setUp(self):
+        self.settings_patcher = mock.patch('robottelo.ssh.settings')
+        settings = self.settings_patcher.start()
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        self.client_patcher = mock.patch(
+            'robottelo.ssh._call_paramiko_sshclient', MockSSHClient)
+        self.client_patcher.start()
+        self.pool_patcher = mock.patch(
+            'robottelo.ssh.connection_pool', ssh.SSHConnectionPool())
+        self.pool = self.pool_patcher.start()
+        self.uuid_patcher = mock.patch('robottelo.ssh.uuid.uuid4')
+        self.uuid_patcher.start().return_value.hex = 'abc'
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+        self.client_patcher.stop()
+        self.pool_patcher.stop()
+        self.uuid_patcher.stop()
+
+    def _mock_output(self, stdout, stderr):
+        """Make the next connection return ``stdout`` and ``stderr`` and
+        return a mock to check the script executed.
+        """
+        def exec_command(script):
+            return (
+                None, MockStdout(stdout, 0), MockStdout(stderr, 0))
+        return mock.patch.object(
+            MockSSHClient, 'exec_command', side_effect=exec_command)
+
+    def test_split_results(self):
+        """Each command gets its own output and return code"""
+        stdout = (
+            b'first\n'
+            b'\nROBOTTELO-BATCH-abc 0 0\n'
+            b'\nROBOTTELO-BATCH-abc 1 1\n'
+            b'{"a": 1}'
+            b'\nROBOTTELO-BATCH-abc 2 0\n'
+        )
+        stderr = (
+            b'\nROBOTTELO-BATCH-abc 0\n'
+            b'\x1b[31merror\x1b[0m\n'
+            b'\nROBOTTELO-BATCH-abc 1\n'
+            b'\nROBOTTELO-BATCH-abc 2\n'
+        )
+        with self._mock_output(stdout, stderr) as exec_command:
+            results = ssh.command_batch(['echo first', 'false', 'cat a'])
+        self.assertEqual(exec_command.call_count, 1)
+        script = exec_command.call_args[0][0]
+        for cmd in ('echo first', 'false', 'cat a'):
+            self.assertIn(u'(\n{0}\n)'.format(cmd), script)
+        self.assertNotIn(u'exit $batch_rc', script)
+        self.assertEqual(
+            [result.return_code for result in results], [0, 1, 0])
+        self.assertEqual(results[0].stdout, [u'first', u''])
+        self.assertEqual(results[1].stderr, u'error\n')
+        self.assertEqual(results[2].stdout, [u'{"a": 1}'])
+
+    def test_stop_on_failure(self):
+        """Results stop at the first failing command"""
+        stdout = (
+            b'\nROBOTTELO-BATCH-abc 0 0\n'
+            b'\nROBOTTELO-BATCH-abc 1 2\n'
+        )
+        stderr = (
+            b'\nROBOTTELO-BATCH-abc 0\n'
+            b'\nROBOTTELO-BATCH-abc 1\n'
+        )
+        with self._mock_output(stdout, stderr) as exec_command:
+            results = ssh.command_batch(
+                ['true', 'exit 2', 'true'], stop_on_failure=True)
+        self.assertIn(u'exit $batch_rc', exec_command.call_args[0][0])
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[-1].return_code, 2)
+
+    def test_output_format(self):
+        """The output format is applied to each result"""
+        stdout = b'a,b\n1,2\n\nROBOTTELO-BATCH-abc 0 0\n'
+        stderr = b'\nROBOTTELO-BATCH-abc 0\n'
+        with self._mock_output(stdout, stderr):
+            results = ssh.command_batch(['cat a.csv'], output_format='csv')
+        self.assertEqual(results[0].stdout, [{u'a': u'1', u'b': u'2'}])
+
+    def test_bytes_commands(self):
+        """Encoded commands are decoded into the script"""
+        stdout = b'\nROBOTTELO-BATCH-abc 0 0\n\nROBOTTELO-BATCH-abc 1 0\n'
+        stderr = b'\nROBOTTELO-BATCH-abc 0\n\nROBOTTELO-BATCH-abc 1\n'
+        with self._mock_output(stdout, stderr) as exec_command:
+            results = ssh.command_batch(
+                [u'echo caf\xe9'.encode('utf-8'), u'echo na\xefve'])
+        script = exec_command.call_args[0][0]
+        self.assertIsInstance(script, six.text_type)
+        self.assertIn(u'(\necho caf\xe9\n)', script)
+        self.assertIn(u'(\necho na\xefve\n)', script)
+        self.assertEqual(len(results), 2)
+
+    def test_no_commands(self):
+        """No connection is made when there are no commands"""
+        self.assertEqual(ssh.command_batch([]), [])
+        self.assertEqual(self.pool.stats()[u'misses'], 0)
+
+
+class MockSFTPFile(object):
+    """A mock ``paramiko.SFTPFile`` backed by a :class:`MockSFTPClient`."""
+    def __init__(self, sftp, path, mode):
+        self.sftp = sftp
+        self.path = path
+        self.mode = mode
+        self.pipelined = False
+        self.prefetched = None
+        self.buffer = six.BytesIO(
+            b'' if 'w' in mode else sftp.files[path])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if 'w' in self.mode:
+            self.sftp.files[self.path] = self.buffer.getvalue()
+
+    def set_pipelined(self, pipelined=True):
+        self.pipelined = pipelined
+
+    def prefetch(self, file_size=None):
+        self.prefetched = file_size
+
+    def stat(self):
+        return mock.Mock(st_size=len(self.sftp.files[self.path]))
+
+    def read(self, size):
+        return self.buffer.read(size)
+
+    def write(self, data):
+        self.buffer.write(data)
+
+
+class MockSFTPClient(object):
+    """A mock ``paramiko.SFTPClient`` storing the files in memory."""
+    files = {}
+
+    def __init__(self):
+        self.sock = mock.Mock(closed=False)
+        self.opened = []
+
+    @classmethod
+    def from_transport(cls, transport, window_size=None,
+                       max_packet_size=None):
+        return cls()
+
+    def open(self, path, mode='r', bufsize=-1):
+        remote = MockSFTPFile(self, path, mode)
+        self.opened.append(remote)
+        return remote
+
+    def close(self):
+        self.sock.closed = True
+
+
+class SFTPTransferEngineTestCase(TestCase):
+    """Tests for :class:`robottelo.ssh.SFTPTransferEngine`."""
+
+    def setUp(self):
+        self.settings_patcher = mock.patch('robottelo.ssh.settings')
+        settings = self.settings_patcher.start()
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        self.client_patcher = mock.patch(
+            'robottelo.ssh._call_paramiko_sshclient', MockSSHClient)
+        self.client_patcher.start()
+        self.sftp_patcher = mock.patch(
+            'robottelo.ssh.paramiko.SFTPClient', MockSFTPClient)
+        self.sftp_patcher.start()
+        MockSFTPClient.files = {}
+        self.engine = ssh.SFTPTransferEngine(buffer_size=4, dedupe_min_size=0)
+
+    def tearDown(self):
+        self.engine.clear()
+        self.settings_patcher.stop()
+        self.client_patcher.stop()
+        self.sftp_patcher.stop()
+
+    def test_upload(self):
+        """Uploads are pipelined and report their size"""
+        with self.engine.sftp() as (_, sftp):
+            pass
+        result = self.engine.upload(
+            six.BytesIO(b'0123456789'), '/tmp/file', dedupe=False)
+        self.assertEqual(MockSFTPClient.files['/tmp/file'], b'0123456789')
+        self.assertTrue(sftp.opened[0].pipelined)
+        self.assertEqual(result.size, 10)
+        self.assertFalse(result.skipped)
+        self.assertGreaterEqual(result.throughput, 0)
+
+    def test_download(self):
+        """Downloads are prefetched"""
+        MockSFTPClient.files['/tmp/file'] = b'0123456789'
+        local_file = six.BytesIO()
+        result = self.engine.download('/tmp/file', local_file)
+        self.assertEqual(local_file.getvalue(), b'0123456789')
+        self.assertEqual(result.size, 10)
+        with self.engine.sftp() as (_, sftp):
+            self.assertEqual(sftp.opened[0].prefetched, 10)
+
+    def test_sessions_reused(self):
+        """One connection and SFTP session serve consecutive transfers"""
+        for _ in range(3):
+            self.engine.upload(
+                six.BytesIO(b'data'), '/tmp/file', dedupe=False)
+        with self.engine.sftp() as (connection, sftp):
+            self.assertEqual(connection.connect_, 1)
+            self.assertEqual(len(sftp.opened), 3)
+
+    def test_dead_connection_replaced(self):
+        """A new connection is made if the kept one died"""
+        with self.engine.sftp() as (connection, _):
+            pass
+        connection.transport.active = False
+        with self.engine.sftp() as (new_connection, _):
+            self.assertIsNot(new_connection, connection)
+        self.assertEqual(connection.close_, 1)
+
+    def test_connect_outside_lock(self):
+        """Connecting to a host does not hold up the other hosts"""
+        connecting = []
+
+        def connect(hostname, *args):
+            connecting.append(self.engine._lock.acquire(False))
+            if connecting[-1]:
+                self.engine._lock.release()
+            client = MockSSHClient()
+            client.hostname = hostname
+            return client
+        with mock.patch('robottelo.ssh._connect', side_effect=connect):
+            with self.engine.sftp(hostname='slow.example.com') as (conn, _):
+                self.assertEqual(conn.hostname, 'slow.example.com')
+        self.assertEqual(connecting, [True])
+
+    def test_concurrent_connect_kept_once(self):
+        """The connection made by another thread meanwhile is kept"""
+        kept = MockSSHClient()
+        key = ('example.com', 'nobody', None)
+
+        def connect(*args):
+            self.engine._connections[key] = kept
+            return MockSSHClient()
+        with mock.patch('robottelo.ssh._connect', side_effect=connect):
+            client = self.engine._get_connection(key, None, 10)
+        self.assertIs(client, kept)
+        self.assertIs(self.engine._connections[key], kept)
+
+    def test_remote_sha256_quoted(self):
+        """The remote path is quoted in the sha256sum command"""
+        result = ssh.SSHCommandResult(stdout=[u'abc  /tmp/a file'])
+        with mock.patch(
+                'robottelo.ssh._run_command', return_value=result) as run:
+            digest = self.engine._remote_sha256(None, u'/tmp/a file;ls')
+        self.assertEqual(digest, u'abc')
+        self.assertEqual(
+            run.call_args[0][0], u"sha256sum '/tmp/a file;ls'")
+
+    def test_dedupe_skips_upload(self):
+        """Upload is skipped when the remote sha256 matches"""
+        content = six.BytesIO(b'0123456789')
+        digest = ssh._local_sha256(content, 4)
+        self.assertEqual(content.tell(), 0)
+        with mock.patch.object(
+                self.engine, '_remote_sha256', return_value=digest):
+            result = self.engine.upload(content, '/tmp/file')
+        self.assertTrue(result.skipped)
+        self.assertEqual(result.throughput, 0.0)
+        self.assertNotIn('/tmp/file', MockSFTPClient.files)
+
+    def test_dedupe_uploads_changed_file(self):
+        """Upload is done when the remote sha256 differs"""
+        with mock.patch.object(
+                self.engine, '_remote_sha256', return_value=None):
+            result = self.engine.upload(six.BytesIO(b'data'), '/tmp/file')
+        self.assertFalse(result.skipped)
+        self.assertEqual(MockSFTPClient.files['/tmp/file'], b'data')
+
+    def test_dedupe_min_size(self):
+        """Small files are not checked for dedupe"""
+        self.engine.dedupe_min_size = 5
+        with mock.patch.object(self.engine, '_remote_sha256') as sha256:
+            self.engine.upload(six.BytesIO(b'data'), '/tmp/file')
+        self.assertFalse(sha256.called)
+
+    def test_upload_many(self):
+        """Several files are uploaded in parallel keeping the order"""
+        files = [
+            (six.BytesIO(u'file{0}'.format(i).encode('ascii')),
+             '/tmp/file{0}'.format(i))
+            for i in range(10)
+        ]
+        results = self.engine.upload_many(files, dedupe=False, max_workers=3)
+        self.assertEqual(
+            [result.destination for result in results],
+            ['/tmp/file{0}'.format(i) for i in range(10)]
+        )
+        for i in range(10):
+            self.assertEqual(
+                MockSFTPClient.files['/tmp/file{0}'.format(i)],
+                u'file{0}'.format(i).encode('ascii')
+            )
+
+    def test_download_many(self):
+        """Several files are downloaded in parallel keeping the order"""
+        files = []
+        for i in range(5):
+            MockSFTPClient.files['/tmp/file{0}'.format(i)] = b'x' * i
+            files.append(('/tmp/file{0}'.format(i), six.BytesIO()))
+        results = self.engine.download_many(files)
+        self.assertEqual([result.size for result in results], list(range(5)))
+        self.assertEqual(self.engine.download_many([]), [])
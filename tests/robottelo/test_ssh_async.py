@@ -0,0 +1,175 @@
+"""Tests for module ``robottelo.ssh_async``."""
+import six
+
+from robottelo import ssh
+from unittest2 import TestCase, skipIf
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+try:
+    import asyncio
+    from robottelo import ssh_async
+except ImportError:
+    asyncio = ssh_async = None
+
+
+class FakeProcess(object):
+    """A fake ``asyncssh.SSHCompletedProcess``."""
+    def __init__(self, stdout, stderr=b'', exit_status=0):
+        self.stdout = stdout
+        self.stderr = stderr
+        self.exit_status = exit_status
+
+
+class FakeConnection(object):
+    """A fake ``asyncssh.SSHClientConnection`` echoing the commands after a
+    short delay and recording the maximum concurrent commands.
+    """
+    def __init__(self, loop):
+        self.loop = loop
+        self.running = 0
+        self.max_running = 0
+        self.closed = False
+
+    def run(self, cmd, encoding=None):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        future = self.loop.create_future()
+
+        def finish():
+            self.running -= 1
+            if cmd == 'fail':
+                future.set_exception(OSError('connection lost'))
+            else:
+                future.set_result(FakeProcess(cmd.encode('utf-8')))
+
+        self.loop.call_later(0.01, finish)
+        return future
+
+    def close(self):
+        self.closed = True
+
+
+@skipIf(ssh_async is None, 'Requires Python 3.5.3 or newer')
+class AsyncSSHBackendTestCase(TestCase):
+    """Tests for :class:`robottelo.ssh_async.AsyncSSHBackend`."""
+
+    def setUp(self):
+        self.settings_patcher = mock.patch('robottelo.ssh.settings')
+        settings = self.settings_patcher.start()
+        settings.server.hostname = 'example.com'
+        settings.server.ssh_username = 'nobody'
+        settings.server.ssh_key = None
+        settings.server.ssh_password = 'test_password'
+        self.loop = asyncio.new_event_loop()
+        self.connections = []
+        self.asyncssh_patcher = mock.patch('robottelo.ssh_async.asyncssh')
+        self.asyncssh = self.asyncssh_patcher.start()
+        self.asyncssh.connect.side_effect = self._connect
+
+    def tearDown(self):
+        self.settings_patcher.stop()
+        self.asyncssh_patcher.stop()
+        self.loop.close()
+
+    def _connect(self, hostname, **kwargs):
+        """Return a future resolved with a new :class:`FakeConnection`."""
+        connection = FakeConnection(self.loop)
+        self.connections.append(connection)
+        future = self.loop.create_future()
+        future.set_result(connection)
+        return future
+
+    def _gather(self, backend, cmds):
+        """Run ``cmds`` concurrently and return their results."""
+        futures = [backend.command(cmd, loop=self.loop) for cmd in cmds]
+        # gather takes the loop of the futures, it has no loop argument on
+        # Python 3.10 and newer
+        return self.loop.run_until_complete(
+            asyncio.gather(*futures, return_exceptions=True))
+
+    def test_command(self):
+        """The result has the same format as ``ssh.command``"""
+        backend = ssh_async.AsyncSSHBackend()
+        result = self.loop.run_until_complete(backend.command(
+            '[{"a": 1}]', output_format='json', loop=self.loop))
+        self.assertIsInstance(result, ssh.SSHCommandResult)
+        self.assertEqual(result.stdout, [{u'a': u'1'}])
+        self.assertEqual(result.return_code, 0)
+        self.asyncssh.connect.assert_called_once_with(
+            'example.com', username='nobody', password='test_password',
+            client_keys=None, known_hosts=None)
+
+    def test_channels_limit(self):
+        """Commands share connections without exceeding the channels"""
+        backend = ssh_async.AsyncSSHBackend(
+            max_channels=3, max_connections=2)
+        cmds = [u'echo {0}'.format(i) for i in range(20)]
+        results = self._gather(backend, cmds)
+        self.assertEqual(
+            [result.stdout for result in results],
+            [[cmd] for cmd in cmds]
+        )
+        self.assertEqual(len(self.connections), 2)
+        for connection in self.connections:
+            self.assertLessEqual(connection.max_running, 3)
+
+    def test_broken_connection(self):
+        """A connection failing to run a command is not reused"""
+        backend = ssh_async.AsyncSSHBackend(max_connections=1)
+        results = self._gather(backend, ['fail', 'echo'])
+        self.assertIsInstance(results[0], OSError)
+        self.assertTrue(self.connections[0].closed)
+        result = self._gather(backend, ['echo'])[0]
+        self.assertEqual(result.stdout, [u'echo'])
+        self.assertEqual(len(self.connections), 2)
+
+    def test_connection_error(self):
+        """Connection errors are raised by the command future"""
+        def connect(hostname, **kwargs):
+            future = self.loop.create_future()
+            future.set_exception(OSError('refused'))
+            return future
+
+        self.asyncssh.connect.side_effect = connect
+        backend = ssh_async.AsyncSSHBackend()
+        result = self._gather(backend, ['echo'])[0]
+        self.assertIsInstance(result, OSError)
+        self.assertEqual(backend._connections[
+            (self.loop, 'example.com', 'nobody', None)], [])
+
+    def test_fallback(self):
+        """Without asyncssh the command runs on a thread"""
+        backend = ssh_async.AsyncSSHBackend()
+        with mock.patch('robottelo.ssh_async.asyncssh', None):
+            with mock.patch('robottelo.ssh.command') as command:
+                command.return_value = ssh.SSHCommandResult(stdout=['ok'])
+                result = self._gather(backend, ['echo ok'])[0]
+        self.assertEqual(result.stdout, ['ok'])
+        self.assertEqual(command.call_args[0], ('echo ok',))
+        self.assertEqual(command.call_args[1]['hostname'], 'example.com')
+
+    def test_command_sync(self):
+        """Synchronous callers get the result directly"""
+        backend = ssh_async.AsyncSSHBackend()
+
+        def connect(hostname, **kwargs):
+            loop = backend._get_background_loop()
+            future = loop.create_future()
+            future.set_result(FakeConnection(loop))
+            return future
+
+        self.asyncssh.connect.side_effect = connect
+        result = backend.command_sync('echo sync')
+        self.assertEqual(result.stdout, [u'echo sync'])
+        backend._background_loop.call_soon_threadsafe(
+            backend._background_loop.stop)
+
+    def test_acommand(self):
+        """``ssh.acommand`` uses the module backend"""
+        with mock.patch.object(ssh_async.backend, 'command') as command:
+            ssh.acommand('ls', hostname='example.org')
+        command.assert_called_once_with('ls', hostname='example.org')
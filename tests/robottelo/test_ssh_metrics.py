@@ -0,0 +1,165 @@
+"""Tests for module ``robottelo.ssh_metrics``."""
+import csv
+import json
+import os
+import shutil
+import six
+import tempfile
+
+from robottelo import ssh
+from robottelo.ssh_metrics import SSHMetrics, command_family, Histogram
+from unittest2 import TestCase
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+
+class CommandFamilyTestCase(TestCase):
+    """Tests for :func:`robottelo.ssh_metrics.command_family`."""
+
+    def test_hammer(self):
+        """Hammer commands are grouped by base and sub commands"""
+        self.assertEqual(
+            command_family(
+                u'LANG=en_US.UTF-8  hammer -v -u admin -p changeme '
+                u'--output=csv host create --name "my host"'
+            ),
+            u'hammer host create'
+        )
+
+    def test_hammer_time(self):
+        """The time prefix is ignored"""
+        self.assertEqual(
+            command_family(
+                u'LANG=en_US.UTF-8 time -p hammer -v -u admin -p "a b" '
+                u'--output json organization list --per-page 10'
+            ),
+            u'hammer organization list'
+        )
+
+    def test_other_commands(self):
+        """Other commands are grouped by executable"""
+        self.assertEqual(command_family(u'/usr/bin/rpm -q satellite'), u'rpm')
+        self.assertEqual(command_family(u'echo "unbalanced'), u'echo')
+        self.assertEqual(command_family(u''), u'')
+
+
+class HistogramTestCase(TestCase):
+    """Tests for :class:`robottelo.ssh_metrics.Histogram`."""
+
+    def test_add(self):
+        """Values are aggregated and distributed on buckets"""
+        histogram = Histogram()
+        self.assertIsNone(histogram.mean)
+        for value in (0.001, 0.01, 0.4, 1000):
+            histogram.add(value)
+        data = histogram.to_dict()
+        self.assertEqual(data['count'], 4)
+        self.assertEqual(data['min'], 0.001)
+        self.assertEqual(data['max'], 1000)
+        self.assertAlmostEqual(data['mean'], 1000.411 / 4)
+        self.assertEqual(data['buckets']['0.005'], 1)
+        self.assertEqual(data['buckets']['0.01'], 1)
+        self.assertEqual(data['buckets']['0.5'], 1)
+        self.assertEqual(data['buckets']['+Inf'], 1)
+        self.assertEqual(sum(data['buckets'].values()), 4)
+
+
+class SSHMetricsTestCase(TestCase):
+    """Tests for :class:`robottelo.ssh_metrics.SSHMetrics`."""
+
+    def setUp(self):
+        self.metrics = SSHMetrics()
+        self.metrics.record_connect('host1', 0.2)
+        self.metrics.record_connect('host1', 0.4)
+        self.metrics.record_command('hammer -v host list', 1.5, 100, 0)
+        self.metrics.record_command('hammer -v host list', 0.5, 50, 10)
+        self.metrics.record_command('rpm -q foo', 0.1, 0, 20)
+
+    def test_to_dict(self):
+        """Metrics are grouped by hostname and command family"""
+        data = self.metrics.to_dict()
+        self.assertEqual(data['connections']['host1']['count'], 2)
+        self.assertAlmostEqual(data['connections']['host1']['mean'], 0.3)
+        hammer = data['commands']['hammer host list']
+        self.assertEqual(hammer['count'], 2)
+        self.assertEqual(hammer['total'], 2.0)
+        self.assertEqual(hammer['stdout_bytes'], 150)
+        self.assertEqual(hammer['stderr_bytes'], 10)
+        self.assertEqual(data['commands']['rpm']['stderr_bytes'], 20)
+
+    def test_listener(self):
+        """Listeners are called for each event"""
+        listener = mock.Mock()
+        self.metrics.add_listener(listener)
+        self.metrics.record_command('ls', 0.1, 1, 2)
+        listener.assert_called_once_with('command', {
+            'family': 'ls', 'elapsed': 0.1, 'stdout_bytes': 1,
+            'stderr_bytes': 2,
+        })
+        self.metrics.remove_listener(listener)
+        self.metrics.record_connect('host1', 0.1)
+        self.assertEqual(listener.call_count, 1)
+
+    def test_reset(self):
+        """Reset forgets everything"""
+        self.metrics.reset()
+        self.assertEqual(
+            self.metrics.to_dict(), {'connections': {}, 'commands': {}})
+
+    def test_dump(self):
+        """Metrics can be dumped as JSON and CSV"""
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        json_path = os.path.join(tmpdir, 'metrics.json')
+        self.metrics.dump(json_path)
+        with open(json_path) as handler:
+            self.assertEqual(json.load(handler), self.metrics.to_dict())
+        csv_path = os.path.join(tmpdir, 'metrics.csv')
+        self.metrics.dump(csv_path)
+        with open(csv_path) as handler:
+            rows = list(csv.reader(handler))
+        self.assertEqual(rows[0][:3], ['kind', 'name', 'count'])
+        self.assertEqual(
+            [row[:3] for row in rows[1:]],
+            [['connections', 'host1', '2'],
+             ['commands', 'hammer host list', '2'],
+             ['commands', 'rpm', '1']]
+        )
+
+
+class SSHInstrumentationTestCase(TestCase):
+    """Tests the metrics recorded by :mod:`robottelo.ssh`."""
+
+    def setUp(self):
+        self.metrics_patcher = mock.patch(
+            'robottelo.ssh.metrics', SSHMetrics())
+        self.metrics = self.metrics_patcher.start()
+        self.client_patcher = mock.patch(
+            'robottelo.ssh._call_paramiko_sshclient')
+        self.client = self.client_patcher.start().return_value
+        stdout = mock.Mock()
+        stdout.read.return_value = b'output'
+        stdout.channel.recv_exit_status.return_value = 0
+        stderr = mock.Mock()
+        stderr.read.return_value = b'err'
+        self.client.exec_command.return_value = (None, stdout, stderr)
+
+    def tearDown(self):
+        self.metrics_patcher.stop()
+        self.client_patcher.stop()
+
+    def test_connect_and_command(self):
+        """Connections and commands are recorded"""
+        with ssh.get_connection(
+                hostname='example.com', username='nobody',
+                password='secret') as connection:
+            ssh.execute_command('hammer -v ping', connection)
+            ssh._run_command('hammer -v ping', connection)
+        data = self.metrics.to_dict()
+        self.assertEqual(data['connections']['example.com']['count'], 1)
+        self.assertEqual(data['commands']['hammer ping']['count'], 2)
+        self.assertEqual(data['commands']['hammer ping']['stdout_bytes'], 12)
+        self.assertEqual(data['commands']['hammer ping']['stderr_bytes'], 6)
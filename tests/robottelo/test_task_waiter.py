@@ -0,0 +1,132 @@
+"""Tests for module ``robottelo.cli.task_waiter``."""
+import six
+import unittest2
+
+from concurrent.futures import Future
+from robottelo.cli.base import CLIReturnCodeError
+from robottelo.cli.repository import Repository
+from robottelo.cli.task_waiter import (
+    TaskFailedError,
+    TaskTimedOutError,
+    TaskWaiter,
+)
+
+if six.PY2:
+    import mock
+else:
+    from unittest import mock
+
+TASK_ID = u'0b6ef4b5-7b1c-4e3c-9a43-58e7d3e0f0a1'
+OTHER_TASK_ID = u'5c4a4b6e-2f1d-4d0e-8a1b-6f2e5d9c3b7a'
+
+
+def bulk_search(*tasks):
+    """Return a ``bulk_search`` response body with ``tasks``."""
+    return [
+        {'search_params': {'search_id': task['id']}, 'results': [task]}
+        for task in tasks
+    ]
+
+
+@mock.patch('robottelo.cli.task_waiter.settings')
+@mock.patch('robottelo.cli.task_waiter.requests.Session')
+class TaskWaiterTestCase(unittest2.TestCase):
+    """Tests for :class:`robottelo.cli.task_waiter.TaskWaiter`."""
+
+    def setUp(self):
+        self.waiter = TaskWaiter(min_interval=0.01, max_interval=0.01)
+
+    def responses(self, session, *bodies):
+        """Make the ``session`` posts return ``bodies``."""
+        responses = []
+        for body in bodies:
+            response = mock.Mock()
+            response.json.return_value = body
+            responses.append(response)
+        session.return_value.post.side_effect = (
+            responses + [responses[-1]] * 10)
+
+    def test_wait_many(self, session, settings):
+        """Pending tasks are polled together with one session"""
+        settings.server.get_url.return_value = 'https://example.com'
+        running = {'id': TASK_ID, 'state': 'running', 'result': 'pending'}
+        done = {'id': TASK_ID, 'state': 'stopped', 'result': 'success'}
+        other = {'id': OTHER_TASK_ID, 'state': 'stopped',
+                 'result': 'success'}
+        self.responses(
+            session, bulk_search(running, other), bulk_search(done, other))
+        # Hold the poller until both tasks are pending
+        with self.waiter._condition:
+            futures = [
+                self.waiter.wait(TASK_ID), self.waiter.wait(OTHER_TASK_ID)]
+        self.assertEqual(futures[0].result(timeout=5), done)
+        self.assertEqual(futures[1].result(timeout=5), other)
+        session.assert_called_once_with()
+        args, kwargs = session.return_value.post.call_args_list[0]
+        self.assertEqual(
+            args[0], 'https://example.com/foreman_tasks/api/tasks/bulk_search')
+        self.assertEqual(
+            sorted(search['task_id'] for search in kwargs['json']['searches']),
+            sorted([TASK_ID, OTHER_TASK_ID])
+        )
+
+    def test_task_failed(self, session, settings):
+        """Tasks which do not succeed raise TaskFailedError"""
+        task = {'id': TASK_ID, 'state': 'paused', 'result': 'error',
+                'humanized': {'errors': [u'Connection refused']}}
+        self.responses(session, bulk_search(task))
+        with self.assertRaises(TaskFailedError) as context:
+            self.waiter.wait(TASK_ID).result(timeout=5)
+        self.assertEqual(context.exception.task, task)
+        self.assertIn(u'Connection refused', str(context.exception))
+
+    def test_task_timed_out(self, session, settings):
+        """Tasks which do not finish in time raise TaskTimedOutError"""
+        task = {'id': TASK_ID, 'state': 'running', 'result': 'pending'}
+        self.responses(session, bulk_search(task))
+        with self.assertRaises(TaskTimedOutError):
+            self.waiter.wait(TASK_ID, timeout=0).result(timeout=5)
+
+    def test_poll_errors(self, session, settings):
+        """Pending tasks fail after max_errors failed polls"""
+        self.waiter.max_errors = 2
+        session.return_value.post.side_effect = IOError('unreachable')
+        with self.assertRaises(IOError):
+            self.waiter.wait(TASK_ID).result(timeout=5)
+        self.assertEqual(session.return_value.post.call_count, 2)
+
+
+@mock.patch('robottelo.cli.base.task_waiter')
+@mock.patch('robottelo.cli.base.Base.execute')
+class ExecuteAsyncTestCase(unittest2.TestCase):
+    """Tests for :meth:`robottelo.cli.base.Base.execute_async`."""
+
+    def test_task(self, execute, waiter):
+        """The future has the result of the task started"""
+        execute.return_value = [
+            u'Repository is being synchronized in task {0}'.format(TASK_ID)]
+        task_future = Future()
+        task_future.set_result({'id': TASK_ID, 'result': 'success'})
+        waiter.wait.return_value = task_future
+        future = Repository.synchronize_async({'id': 1})
+        self.assertEqual(future.result(timeout=5)['id'], TASK_ID)
+        command = execute.call_args[0][0]
+        self.assertIn(u' --async', command)
+        self.assertEqual(command.options, ((u'async', True), (u'id', u'1')))
+        self.assertEqual(waiter.wait.call_args[0][0], TASK_ID)
+
+    def test_no_task(self, execute, waiter):
+        """The future has the command output if there is no task id"""
+        execute.return_value = [u'Nothing to do']
+        future = Repository.execute_async(u'repository synchronize --id 1')
+        self.assertEqual(future.result(timeout=5), [u'Nothing to do'])
+        self.assertEqual(
+            execute.call_args[0][0], u'repository synchronize --id 1 --async')
+        waiter.wait.assert_not_called()
+
+    def test_command_error(self, execute, waiter):
+        """Command errors are raised by the future"""
+        execute.side_effect = CLIReturnCodeError(1, u'error', u'failed')
+        future = Repository.synchronize_async({'id': 1})
+        with self.assertRaises(CLIReturnCodeError):
+            future.result(timeout=5)